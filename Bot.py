@@ -1,21 +1,52 @@
 import os
+import signal
+import asyncio
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import logging
-from utils.logger import setup_logger
+from utils.structured_logging import bind_command_context, setup_async_logger
 from utils.database import db
+from utils import metrics
+from utils.loop_monitor import LoopMonitor
+from utils.dm_queue import dm_queue
+from utils import sharding, cache_policy, hot_reload
+from utils.cooldowns import CommandRateLimited, CooldownCommandTree, DuplicateCommand, cooldowns
 from models import Base
 
 # Setup logging
-logger = setup_logger()
+logger = setup_async_logger()
+command_logger = logging.getLogger('bot.commands')
 
 # Initialize bot with intents
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 
-# Create bot instance
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Member/message caching; see utils/cache_policy.py for MEMBER_CACHE, CHUNK_GUILDS_AT_STARTUP and MAX_MESSAGES
+cache_options = cache_policy.cache_options_from_env(intents)
+
+class DrainOnClose:
+    """Sends queued DMs before the connection closes, whether close() comes from SIGTERM or Ctrl+C"""
+
+    async def close(self):
+        await dm_queue.drain()
+        await super().close()
+
+class ModBot(DrainOnClose, commands.Bot):
+    pass
+
+class ShardedModBot(DrainOnClose, commands.AutoShardedBot):
+    pass
+
+# Create bot instance; SHARD_COUNT switches to AutoShardedBot (cluster.py sets it per worker)
+shard_options = sharding.shard_options_from_env()
+if shard_options is None:
+    bot = ModBot(command_prefix='!', intents=intents, tree_cls=CooldownCommandTree, **cache_options)
+else:
+    bot = ShardedModBot(
+        command_prefix='!', intents=intents, tree_cls=CooldownCommandTree, **cache_options, **shard_options
+    )
+loop_monitor = LoopMonitor(bot)
 
 # Load cogs
 initial_extensions = [
@@ -26,32 +57,75 @@ initial_extensions = [
     'cogs.warnings',
     'cogs.applications',
     'cogs.utility',
-    'cogs.tickets'  # Add the new tickets cog
+    'cogs.tickets',  # Add the new tickets cog
+    'cogs.audit',
+    'cogs.activity',
+    'cogs.antiraid',
+    'cogs.cooldowns',
+    'cogs.help'  # Last, so the help embeds are built with every other command registered
 ]
 
+@bot.event
+async def setup_hook():
+    # Runs once per process, unlike on_ready which fires again on every reconnect
+    loop_monitor.start()
+    metrics.instrument_http(bot.http)
+    metrics.instrument_engine(db.engine)
+    report_shard_health.start()
+    port = int(os.getenv("METRICS_PORT", "9100"))
+    if port:
+        try:
+            await metrics.start_metrics_server(
+                os.getenv("METRICS_HOST", "127.0.0.1"), port, health=lambda: sharding.shard_health(bot)
+            )
+        except OSError as e:
+            logger.error("Could not start metrics endpoint: %s", e)
+    # Close cleanly on SIGTERM (sent by cluster.py on restarts) so DMs go out and cogs flush their buffers
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(bot.close()))
+    except NotImplementedError:
+        pass
+
+@tasks.loop(seconds=15)
+async def report_shard_health():
+    sharding.update_shard_metrics(bot)
+
+@bot.event
+async def on_shard_ready(shard_id):
+    logger.info('Shard %s is ready', shard_id)
+
+@bot.event
+async def on_shard_disconnect(shard_id):
+    logger.warning('Shard %s disconnected', shard_id)
+
 @bot.event
 async def on_ready():
-    logger.info(f'Bot is ready! Logged in as {bot.user.name}')
+    logger.info('Bot is ready! Logged in as %s', bot.user.name)
     # Set status to Do Not Disturb and activity to "Listening to 1nfern0 <3"
     activity = discord.Activity(type=discord.ActivityType.listening, name="1nfern0 <3")
     await bot.change_presence(status=discord.Status.dnd, activity=activity)
 
+    # on_ready fires again after every reconnect; the setup below only needs to run once
+    if bot.extensions:
+        return
+
     # Create database tables
     try:
         logger.info("Verifying database connection and tables...")
         Base.metadata.create_all(db.engine)
         logger.info("Database tables created successfully")
     except Exception as e:
-        logger.error(f"Error creating database tables: {str(e)}")
+        logger.error("Error creating database tables: %s", e)
         logger.error("Database initialization failed, but bot will continue running")
 
     # Load all cogs
     for extension in initial_extensions:
         try:
             await bot.load_extension(extension)
-            logger.info(f'Loaded extension {extension}')
+            hot_reload.remember(extension)
+            logger.info('Loaded extension %s', extension)
         except Exception as e:
-            logger.error(f'Failed to load extension {extension}: {str(e)}')
+            logger.error('Failed to load extension %s: %s', extension, e)
 
     # Sync slash commands
     try:
@@ -59,24 +133,182 @@ async def on_ready():
         await bot.tree.sync()
         logger.info("Slash commands synced successfully")
     except Exception as e:
-        logger.error(f"Error syncing slash commands: {str(e)}")
+        logger.error("Error syncing slash commands: %s", e)
+
+    # Let the loop monitor map blocked stacks back to commands
+    loop_monitor.refresh_commands()
+
+def log_command(guild, user, command, latency, status):
+    command_logger.info('%s finished with %s', command, status, extra={
+        'guild': str(guild.id) if guild else None,
+        'user': str(user.id),
+        'command': command,
+        'latency_ms': round(latency * 1000, 2) if latency is not None else None,
+    })
+
+# Runs once per invocation before the command's own checks; raises when rate limited or repeated
+bot.add_check(cooldowns.check_context, call_once=True)
+
+@bot.before_invoke
+async def bind_log_context(ctx):
+    # Runs inside the command's own task, so every log line from the command picks this up
+    bind_command_context(ctx.guild, ctx.author, ctx.command.qualified_name)
+
+@bot.event
+async def on_command(ctx):
+    metrics.command_started(ctx)
+
+@bot.event
+async def on_command_completion(ctx):
+    latency = metrics.command_finished(ctx)
+    log_command(ctx.guild, ctx.author, ctx.command.qualified_name, latency, 'ok')
+
+@bot.event
+async def on_app_command_completion(interaction, command):
+    latency = metrics.app_command_finished(interaction, command)
+    log_command(interaction.guild, interaction.user, f'/{command.qualified_name}', latency, 'ok')
 
 @bot.event
 async def on_command_error(ctx, error):
-    if isinstance(error, commands.errors.MissingPermissions):
+    latency = metrics.command_finished(ctx, type(error).__name__)
+    log_command(ctx.guild, ctx.author, ctx.command.qualified_name if ctx.command else 'unknown', latency, type(error).__name__)
+    if not isinstance(error, (CommandRateLimited, DuplicateCommand)):
+        # The cooldown check ran before the command's own checks and arguments; don't charge for a failed use
+        cooldowns.refund_context(ctx)
+    if isinstance(error, DuplicateCommand):
+        return
+    elif isinstance(error, CommandRateLimited):
+        await ctx.send(f"⏳ {error}", delete_after=min(error.retry_after, 30))
+    elif isinstance(error, commands.errors.NoPrivateMessage):
+        await ctx.send("This command can only be used in a server.")
+    elif isinstance(error, commands.errors.MissingPermissions):
         await ctx.send("You don't have permission to use this command!")
     elif isinstance(error, commands.errors.MissingRequiredArgument):
         await ctx.send(f"Missing required argument: {error.param}")
     elif isinstance(error, commands.errors.CommandNotFound):
         await ctx.send("Command not found. Use !help to see available commands.")
     else:
-        logger.error(f'Unhandled error: {str(error)}')
+        logger.error('Unhandled error: %s', error)
         await ctx.send("An error occurred while executing the command.")
 
 @bot.command(name='ping')
 async def ping(ctx):
     """Check bot's latency"""
-    await ctx.send(f'Pong! Latency: {round(bot.latency * 1000)}ms')
+    p50, p99 = loop_monitor.percentiles(0.5, 0.99)
+    await ctx.send(
+        f'Pong! Latency: {round(bot.latency * 1000)}ms | '
+        f'Event loop lag p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms'
+    )
+
+@bot.command(name='shards')
+async def shards(ctx):
+    """Show latency and connection state for each shard in this process"""
+    health = sharding.shard_health(bot)
+    embed = discord.Embed(
+        title=f"Shards ({len(health['shards'])} of {health['shard_count']} in this process)",
+        color=discord.Color.blue()
+    )
+    if health['cluster'] is not None:
+        embed.description = f"Cluster {health['cluster']}"
+    current = ctx.guild.shard_id if ctx.guild else None
+    lines = []
+    for shard_id, shard in health['shards'].items():
+        latency = f"{shard['latency'] * 1000:.0f}ms" if shard['latency'] is not None else "n/a"
+        state = "🟢" if shard['connected'] else "🔴"
+        marker = " ← this server" if current is not None and int(shard_id) == current else ""
+        lines.append(f"{state} Shard {shard_id}: {latency}{marker}")
+    embed.add_field(name="Status", value="\n".join(lines[:25]) or "None", inline=False)
+    await ctx.send(embed=embed)
+
+@bot.command(name='reload')
+@commands.is_owner()
+async def reload(ctx, *extensions: str):
+    """Reload changed cogs in place
+    Usage: !reload (changed cogs only), !reload games tickets, or !reload all"""
+    if not extensions:
+        names = hot_reload.changed_extensions(bot, initial_extensions)
+    elif extensions == ('all',):
+        names = [name for name in initial_extensions if name in bot.extensions]
+    else:
+        names = [name if name.startswith('cogs.') else f'cogs.{name}' for name in extensions]
+        unknown = [name for name in names if name not in initial_extensions]
+        if unknown:
+            await ctx.send(f"❌ Unknown extension(s): {', '.join(unknown)}")
+            return
+    if not names:
+        await ctx.send("Nothing has changed since the last load.")
+        return
+
+    result = await hot_reload.reload_extensions(bot, names)
+    loop_monitor.refresh_commands()
+    help_cog = bot.get_cog('Help')
+    if help_cog is not None:
+        help_cog.invalidate()
+
+    embed = discord.Embed(
+        title=f"Reloaded in {result.duration * 1000:.0f}ms",
+        color=discord.Color.red() if result.failed else discord.Color.green()
+    )
+    embed.add_field(name="Reloaded", value="\n".join(result.reloaded) or "None", inline=True)
+    embed.add_field(
+        name="App commands",
+        value=f"{len(result.upserted)} updated, {len(result.deleted)} removed" if result.upserted or result.deleted else "Unchanged",
+        inline=True
+    )
+    if result.failed:
+        embed.add_field(
+            name="Failed",
+            value="\n".join(f"`{name}`: {error}" for name, error in result.failed.items())[:1024],
+            inline=False
+        )
+    await ctx.send(embed=embed)
+
+@bot.command(name='memory')
+@commands.is_owner()
+async def memory(ctx):
+    """Break down cached objects and process memory by cache type"""
+    report = cache_policy.memory_report(bot)
+    lines = [f"{'cache':<10}{'objects':>10}{'~MB':>9}"]
+    for name, (count, size) in report.items():
+        lines.append(f"{name:<10}{count:>10}{size / 1024 / 1024:>9.1f}")
+    embed = discord.Embed(title="Memory", color=discord.Color.blue())
+    embed.description = "```\n" + "\n".join(lines) + "\n```"
+    embed.add_field(name="Process RSS", value=f"{cache_policy.current_rss() / 1024 / 1024:.0f} MB", inline=True)
+    embed.add_field(
+        name="Chunked guilds",
+        value=f"{sum(1 for guild in bot.guilds if guild.chunked)}/{len(bot.guilds)}",
+        inline=True
+    )
+    embed.add_field(name="Message cache", value=str(bot._connection.max_messages or "off"), inline=True)
+    embed.set_footer(text="Sizes are shallow estimates from a sample of each cache")
+    await ctx.send(embed=embed)
+
+@bot.command(name='stats')
+async def stats(ctx):
+    """Show event loop lag and the commands that blocked it recently"""
+    p50, p95, p99 = loop_monitor.percentiles(0.5, 0.95, 0.99)
+    embed = discord.Embed(title="Bot Stats", color=discord.Color.blue())
+    embed.add_field(name="Gateway latency", value=f"{round(bot.latency * 1000)}ms", inline=True)
+    embed.add_field(
+        name="Event loop lag",
+        value=f"p50 {p50 * 1000:.1f}ms\np95 {p95 * 1000:.1f}ms\np99 {p99 * 1000:.1f}ms",
+        inline=True
+    )
+    offenders = loop_monitor.offenders.most_common(5)
+    embed.add_field(
+        name=f"Slow callbacks (>{loop_monitor.threshold * 1000:.0f}ms)",
+        value="\n".join(f"`{cog}.{command}`: {count}" for (cog, command), count in offenders) or "None",
+        inline=False
+    )
+    embed.add_field(name="DM queue", value=f"{dm_queue.depth()} waiting", inline=True)
+    if loop_monitor.slow_callbacks:
+        last = loop_monitor.slow_callbacks[-1]
+        embed.add_field(
+            name="Most recent",
+            value=f"`{last.cog}.{last.command}` blocked for {last.duration * 1000:.0f}ms",
+            inline=False
+        )
+    await ctx.send(embed=embed)
 
 if __name__ == "__main__":
     token = os.getenv("DISCORD_TOKEN")
@@ -86,6 +318,6 @@ if __name__ == "__main__":
 
     try:
         logger.info("Starting bot...")
-        bot.run(token)
+        bot.run(token, log_handler=None)
     except Exception as e:
-        logger.error(f"Failed to start bot: {str(e)}")
+        logger.error("Failed to start bot: %s", e)
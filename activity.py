@@ -0,0 +1,115 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+import asyncio
+import logging
+from typing import List
+from utils.activity import COMMANDS, JOINS, LEAVES, MESSAGES, activity
+from utils.embeds import create_error_embed
+
+logger = logging.getLogger(__name__)
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values: List[int]) -> str:
+    peak = max(values)
+    if not peak:
+        return SPARK_BLOCKS[0] * len(values)
+    return "".join(SPARK_BLOCKS[min(len(SPARK_BLOCKS) - 1, value * len(SPARK_BLOCKS) // peak)] for value in values)
+
+class Activity(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        try:
+            await asyncio.to_thread(activity.create_tables)
+        except Exception as e:
+            logger.error('Error creating activity table: %s', e)
+        self.flush_activity.start()
+        self.prune_activity.start()
+
+    async def cog_unload(self):
+        self.flush_activity.cancel()
+        self.prune_activity.cancel()
+        await activity.flush()
+
+    @tasks.loop(seconds=60)
+    async def flush_activity(self):
+        await activity.flush()
+
+    @tasks.loop(hours=24)
+    async def prune_activity(self):
+        try:
+            deleted = await asyncio.to_thread(activity.prune)
+            if deleted:
+                logger.info('Pruned %s old activity rollups', deleted)
+        except Exception as e:
+            logger.error('Error pruning activity rollups: %s', e)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or message.author.bot:
+            return
+        activity.incr(message.guild.id, MESSAGES, str(message.channel.id))
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        activity.incr(member.guild.id, JOINS)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        activity.incr(member.guild.id, LEAVES)
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx):
+        if ctx.guild is not None:
+            activity.incr(ctx.guild.id, COMMANDS, f"!{ctx.command.qualified_name}")
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        if interaction.guild is not None:
+            activity.incr(interaction.guild.id, COMMANDS, f"/{command.qualified_name}")
+
+    @app_commands.command(name="stats", description="Show server activity")
+    @app_commands.describe(days="How many days to look back (1-30)")
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def stats(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 30] = 7):
+        """Render server activity from the hourly rollups"""
+        try:
+            await interaction.response.defer()
+            summary = await activity.summary(interaction.guild_id, days)
+
+            embed = discord.Embed(
+                title=f"Server Activity — last {days} day{'s' if days != 1 else ''}",
+                color=discord.Color.blue()
+            )
+            embed.add_field(name="Messages", value=str(summary['messages']), inline=True)
+            embed.add_field(name="Joins", value=str(summary['joins']), inline=True)
+            embed.add_field(name="Leaves", value=str(summary['leaves']), inline=True)
+            embed.add_field(
+                name="Messages by hour (UTC)",
+                value=f"```\n{sparkline(summary['hourly'])}\n00    06    12    18   23\n```",
+                inline=False
+            )
+            embed.add_field(
+                name="Top channels",
+                value="\n".join(f"<#{channel_id}>: {count}" for channel_id, count in summary['channels']) or "No messages yet",
+                inline=True
+            )
+            embed.add_field(
+                name="Top commands",
+                value="\n".join(f"`{name}`: {count}" for name, count in summary['commands']) or "No commands yet",
+                inline=True
+            )
+            await interaction.followup.send(embed=embed)
+            logger.info('%s viewed activity stats for %s days', interaction.user, days)
+        except Exception as e:
+            logger.error('Error showing activity stats: %s', e)
+            await interaction.followup.send(
+                embed=create_error_embed("Error", "An error occurred while loading the activity stats."),
+                ephemeral=True
+            )
+
+async def setup(bot):
+    await bot.add_cog(Activity(bot))
@@ -0,0 +1,482 @@
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from utils.database import db
+from models import Base
+from utils.permissions import has_bot_manager_role
+from utils.audit_log import audit_log
+from utils.cache_policy import ensure_chunked, get_or_fetch_member
+from utils.raid import RaidThresholds, raid_detector
+
+logger = logging.getLogger(__name__)
+
+# Channel permission edits in flight at once while locking a guild down
+LOCKDOWN_CONCURRENCY = 5
+# Members waiting to be timed out, across all guilds
+TIMEOUT_QUEUE_SIZE = 5000
+QUIET_CHECK_SECONDS = 30
+# Past this many uncached joiners, one chunk of the guild beats a REST lookup per member
+CHUNK_JOINERS_AT = 50
+RAID_REASON = "Anti-raid: join burst detected"
+
+# Settings that !antiraid set can change, with their allowed range
+TUNABLE_SETTINGS = {
+    'join_threshold': (3, 500),
+    'flagged_threshold': (2, 500),
+    'window_seconds': (5, 120),
+    'min_account_age_days': (0, 365),
+    'similar_names': (2, 50),
+    'timeout_minutes': (1, 40320),
+    'quiet_minutes': (1, 1440),
+}
+
+class RaidSettings(Base):
+    __tablename__ = 'raid_settings'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False, unique=True)
+    enabled = Column(Boolean, nullable=False, default=False)
+    alert_channel_id = Column(String)
+    join_threshold = Column(Integer, nullable=False, default=15)
+    flagged_threshold = Column(Integer, nullable=False, default=6)
+    window_seconds = Column(Integer, nullable=False, default=10)
+    min_account_age_days = Column(Integer, nullable=False, default=7)
+    similar_names = Column(Integer, nullable=False, default=4)
+    timeout_minutes = Column(Integer, nullable=False, default=60)
+    # Raid mode ends by itself after this long without another burst
+    quiet_minutes = Column(Integer, nullable=False, default=10)
+    lockdown = Column(Boolean, nullable=False, default=True)
+    # Set while raid mode is active, so a restart can still undo what it changed
+    raid_started_by = Column(String)
+    raid_started_at = Column(DateTime)
+    previous_verification = Column(Integer)
+    locked_channel_ids = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in TUNABLE_SETTINGS}
+        data.update(enabled=self.enabled, lockdown=self.lockdown,
+                    alert_channel_id=int(self.alert_channel_id) if self.alert_channel_id else None)
+        return data
+
+def default_settings() -> dict:
+    data = {name: column.default.arg for name, column in RaidSettings.__table__.columns.items()
+            if name in TUNABLE_SETTINGS or name in ('enabled', 'lockdown')}
+    data['alert_channel_id'] = None
+    return data
+
+def thresholds_for(settings: dict) -> RaidThresholds:
+    return RaidThresholds(
+        join_threshold=settings['join_threshold'],
+        flagged_threshold=settings['flagged_threshold'],
+        window_seconds=settings['window_seconds'],
+        min_account_age_days=settings['min_account_age_days'],
+        similar_names=settings['similar_names'],
+    )
+
+def load_raid_settings() -> Dict[int, dict]:
+    session = db.get_session()
+    try:
+        return {int(row.guild_id): row.to_dict() for row in session.query(RaidSettings).all()}
+    finally:
+        session.close()
+
+def save_raid_settings(guild_id: int, **changes) -> dict:
+    session = db.get_session()
+    try:
+        row = session.query(RaidSettings).filter_by(guild_id=str(guild_id)).first()
+        if row is None:
+            row = RaidSettings(guild_id=str(guild_id), **default_settings())
+            session.add(row)
+        for name, value in changes.items():
+            setattr(row, name, str(value) if name == 'alert_channel_id' and value is not None else value)
+        session.commit()
+        return row.to_dict()
+    finally:
+        session.close()
+
+class RaidResponse:
+    """What raid mode changed in a guild, so ending it can put things back"""
+
+    def __init__(self, started_by: int):
+        self.started_by = started_by
+        self.started_at = discord.utils.utcnow()
+        self.previous_verification: Optional[discord.VerificationLevel] = None
+        self.locked_channels: List[int] = []
+        self.timeouts = 0
+
+    @classmethod
+    def from_row(cls, row: RaidSettings) -> 'RaidResponse':
+        response = cls(int(row.raid_started_by))
+        if row.raid_started_at is not None:
+            response.started_at = row.raid_started_at.replace(tzinfo=timezone.utc)
+        if row.previous_verification is not None:
+            response.previous_verification = discord.VerificationLevel(row.previous_verification)
+        if row.locked_channel_ids:
+            response.locked_channels = [int(channel_id) for channel_id in row.locked_channel_ids.split(',')]
+        return response
+
+def load_raid_responses() -> Dict[int, RaidResponse]:
+    session = db.get_session()
+    try:
+        rows = session.query(RaidSettings).filter(RaidSettings.raid_started_by.isnot(None)).all()
+        return {int(row.guild_id): RaidResponse.from_row(row) for row in rows}
+    finally:
+        session.close()
+
+def save_raid_response(guild_id: int, response: Optional[RaidResponse]):
+    """Store what raid mode has changed so far, or clear it with None once everything is put back"""
+    session = db.get_session()
+    try:
+        row = session.query(RaidSettings).filter_by(guild_id=str(guild_id)).first()
+        if row is None:
+            row = RaidSettings(guild_id=str(guild_id), **default_settings())
+            session.add(row)
+        if response is None:
+            row.raid_started_by = row.raid_started_at = row.previous_verification = row.locked_channel_ids = None
+        else:
+            row.raid_started_by = str(response.started_by)
+            row.raid_started_at = response.started_at.replace(tzinfo=None)
+            row.previous_verification = response.previous_verification.value if response.previous_verification is not None else None
+            row.locked_channel_ids = ','.join(str(channel_id) for channel_id in response.locked_channels) or None
+        session.commit()
+    finally:
+        session.close()
+
+class AntiRaid(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # guild_id -> settings dict, loaded once and updated on every change
+        self.settings: Dict[int, dict] = {}
+        self.responses: Dict[int, RaidResponse] = {}
+        self.timeout_queue: asyncio.Queue = asyncio.Queue(maxsize=TIMEOUT_QUEUE_SIZE)
+        self._queued: Set[Tuple[int, int]] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._responding: Set[asyncio.Task] = set()
+
+    async def cog_load(self):
+        try:
+            await asyncio.to_thread(Base.metadata.create_all, db.engine, tables=[RaidSettings.__table__])
+            self.settings = await asyncio.to_thread(load_raid_settings)
+            self.responses = await asyncio.to_thread(load_raid_responses)
+        except Exception as e:
+            logger.error('Error loading anti-raid settings: %s', e)
+        for guild_id, settings in self.settings.items():
+            raid_detector.configure(guild_id, thresholds_for(settings))
+        # Raids that were active when the bot stopped carry on, and end_quiet_raids undoes them as usual
+        for guild_id in self.responses:
+            raid_detector.start_raid(guild_id)
+        if self.responses:
+            logger.info('Resumed raid mode in %s guild(s)', len(self.responses))
+        self._worker = asyncio.create_task(self.run_timeouts())
+        self.end_quiet_raids.start()
+
+    async def cog_unload(self):
+        self.end_quiet_raids.cancel()
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def settings_for(self, guild_id: int) -> dict:
+        return self.settings.get(guild_id) or default_settings()
+
+    async def save_response(self, guild_id: int, response: Optional[RaidResponse]):
+        try:
+            await asyncio.to_thread(save_raid_response, guild_id, response)
+        except Exception as e:
+            logger.error('Error saving raid state for guild %s: %s', guild_id, e)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
+            return
+        settings = self.settings.get(member.guild.id)
+        # A raid started with !antiraid start still times out joiners while detection is off
+        if (settings is None or not settings['enabled']) and not raid_detector.in_raid(member.guild.id):
+            return
+        account_age = (discord.utils.utcnow() - member.created_at).total_seconds()
+        verdict = raid_detector.record_join(member.guild.id, member.id, member.name, account_age)
+        if verdict.triggered:
+            logger.warning('Join burst in guild %s: %s joins (%s flagged) in %ss',
+                           member.guild.id, verdict.joins, verdict.flagged_joins, settings['window_seconds'])
+            # The response makes many REST calls; don't hold up the gateway event
+            task = asyncio.create_task(
+                self.start_raid_mode(member.guild, self.bot.user.id, verdict.joins, verdict.flagged_joins)
+            )
+            self._responding.add(task)
+            task.add_done_callback(self._responding.discard)
+        elif member.guild.id in self.responses:
+            self.queue_timeout(member.guild.id, member.id)
+
+    def queue_timeout(self, guild_id: int, member_id: int) -> bool:
+        key = (guild_id, member_id)
+        if key in self._queued:
+            return False
+        try:
+            self.timeout_queue.put_nowait(key)
+        except asyncio.QueueFull:
+            logger.warning('Raid timeout queue is full; not timing out %s in guild %s', member_id, guild_id)
+            return False
+        self._queued.add(key)
+        return True
+
+    async def run_timeouts(self):
+        """Work through queued timeouts one at a time, using the Moderation cog's action"""
+        while True:
+            guild_id, member_id = await self.timeout_queue.get()
+            self._queued.discard((guild_id, member_id))
+            try:
+                guild = self.bot.get_guild(guild_id)
+                moderation = self.bot.get_cog('Moderation')
+                if guild is None or moderation is None:
+                    continue
+                member = await get_or_fetch_member(guild, member_id)
+                if member is None or member.is_timed_out():
+                    continue
+                minutes = self.settings_for(guild_id)['timeout_minutes']
+                await moderation.timeout_member(member, minutes, self.bot.user.id, RAID_REASON)
+                response = self.responses.get(guild_id)
+                if response is not None:
+                    response.timeouts += 1
+            except discord.Forbidden:
+                logger.warning('Missing permission to time out %s in guild %s', member_id, guild_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error('Error timing out raid member %s in guild %s: %s', member_id, guild_id, e)
+            finally:
+                self.timeout_queue.task_done()
+
+    async def lockdown(self, guild: discord.Guild, response: RaidResponse):
+        channels_cog = self.bot.get_cog('Channels')
+        if channels_cog is None:
+            logger.warning('Channels cog is not loaded; skipping raid lockdown in guild %s', guild.id)
+            return
+        # Only channels @everyone can currently speak in, so ending the raid unlocks exactly these
+        channels = [channel for channel in guild.text_channels
+                    if channel.permissions_for(guild.default_role).send_messages]
+        semaphore = asyncio.Semaphore(LOCKDOWN_CONCURRENCY)
+
+        async def lock(channel: discord.TextChannel):
+            async with semaphore:
+                try:
+                    await channels_cog.set_channel_locked(channel, True, self.bot.user.id, RAID_REASON)
+                    response.locked_channels.append(channel.id)
+                except discord.HTTPException as e:
+                    logger.warning('Could not lock channel %s during raid: %s', channel.id, e)
+
+        await asyncio.gather(*(lock(channel) for channel in channels))
+
+    async def start_raid_mode(self, guild: discord.Guild, started_by: int, joins: int = 0, flagged: int = 0):
+        if guild.id in self.responses:
+            return
+        settings = self.settings_for(guild.id)
+        response = self.responses[guild.id] = RaidResponse(started_by)
+        raid_detector.start_raid(guild.id)
+        # The burst window ends at the triggering join, however long the lockdown below takes
+        since = raid_detector.state(guild.id).raid_since - settings['window_seconds']
+        audit_log.record(guild.id, 'raid_start', started_by, guild.id, target_type='guild', reason=RAID_REASON,
+                         details=f'{joins} joins, {flagged} flagged in {settings["window_seconds"]}s')
+        if guild.verification_level < discord.VerificationLevel.high:
+            response.previous_verification = guild.verification_level
+        # Saved before anything changes, and again once the lockdown is done
+        await self.save_response(guild.id, response)
+        try:
+            if response.previous_verification is not None:
+                await guild.edit(verification_level=discord.VerificationLevel.high, reason=RAID_REASON)
+        except discord.HTTPException as e:
+            logger.warning('Could not raise verification level in guild %s: %s', guild.id, e)
+        if settings['lockdown']:
+            await self.lockdown(guild, response)
+            await self.save_response(guild.id, response)
+
+        # Everyone who arrived in the burst window, then every later join until the raid ends
+        joiners = raid_detector.joiners_since(guild.id, since)
+        if sum(1 for member_id in joiners if guild.get_member(member_id) is None) >= CHUNK_JOINERS_AT:
+            try:
+                await ensure_chunked(guild)
+            except (asyncio.TimeoutError, discord.ClientException) as e:
+                logger.warning('Could not chunk guild %s for raid timeouts: %s', guild.id, e)
+        queued = sum(self.queue_timeout(guild.id, member_id) for member_id in joiners)
+        logger.warning('Raid mode started in guild %s: %s channels locked, %s timeouts queued',
+                       guild.id, len(response.locked_channels), queued)
+        await self.alert(guild, discord.Embed(
+            title="🚨 Raid mode enabled",
+            description=(
+                f"{joins} members joined within {settings['window_seconds']}s ({flagged} flagged).\n"
+                f"Verification raised, {len(response.locked_channels)} channels locked, "
+                f"{queued} recent joiners being timed out.\n"
+                f"Raid mode ends after {settings['quiet_minutes']} quiet minutes, or with `!antiraid end`."
+            ),
+            color=discord.Color.red()
+        ))
+
+    async def end_raid_mode(self, guild: discord.Guild, ended_by: int) -> bool:
+        response = self.responses.pop(guild.id, None)
+        raid_detector.end_raid(guild.id)
+        if response is None:
+            return False
+        if response.previous_verification is not None:
+            try:
+                await guild.edit(verification_level=response.previous_verification, reason="Anti-raid: raid mode ended")
+            except discord.HTTPException as e:
+                logger.warning('Could not restore verification level in guild %s: %s', guild.id, e)
+        channels_cog = self.bot.get_cog('Channels')
+        unlocked = 0
+        for channel_id in response.locked_channels:
+            channel = guild.get_channel(channel_id)
+            if channel is None or channels_cog is None:
+                continue
+            try:
+                await channels_cog.set_channel_locked(channel, False, ended_by, "Anti-raid: raid mode ended")
+                unlocked += 1
+            except discord.HTTPException as e:
+                logger.warning('Could not unlock channel %s after raid: %s', channel_id, e)
+        await self.save_response(guild.id, None)
+        audit_log.record(guild.id, 'raid_end', ended_by, guild.id, target_type='guild',
+                         details=f'{response.timeouts} timeouts, {unlocked} channels unlocked')
+        logger.info('Raid mode ended in guild %s after %s timeouts', guild.id, response.timeouts)
+        await self.alert(guild, discord.Embed(
+            title="✅ Raid mode ended",
+            description=f"{response.timeouts} members timed out, {unlocked} channels unlocked.",
+            color=discord.Color.green()
+        ))
+        return True
+
+    async def alert(self, guild: discord.Guild, embed: discord.Embed):
+        channel_id = self.settings_for(guild.id)['alert_channel_id']
+        channel = guild.get_channel(channel_id) if channel_id else None
+        if channel is None:
+            return
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.warning('Could not send raid alert in guild %s: %s', guild.id, e)
+
+    @tasks.loop(seconds=QUIET_CHECK_SECONDS)
+    async def end_quiet_raids(self):
+        for guild_id in list(self.responses):
+            quiet_seconds = self.settings_for(guild_id)['quiet_minutes'] * 60
+            if guild_id not in raid_detector.quiet_raids(quiet_seconds):
+                continue
+            guild = self.bot.get_guild(guild_id)
+            if guild is not None:
+                await self.end_raid_mode(guild, self.bot.user.id)
+
+    async def update_settings(self, guild_id: int, **changes) -> dict:
+        settings = await asyncio.to_thread(save_raid_settings, guild_id, **changes)
+        self.settings[guild_id] = settings
+        raid_detector.configure(guild_id, thresholds_for(settings))
+        return settings
+
+    @commands.group(invoke_without_command=True)
+    @commands.has_permissions(manage_guild=True)
+    @has_bot_manager_role(require_full_perms=True)  # Only BotManager 1 can use this
+    async def antiraid(self, ctx):
+        """Show anti-raid status and settings
+        Subcommands: enable, disable, set, start, end"""
+        settings = self.settings_for(ctx.guild.id)
+        joins, flagged = raid_detector.window_counts(ctx.guild.id)
+        response = self.responses.get(ctx.guild.id)
+        alert_channel_id = settings['alert_channel_id']
+        embed = discord.Embed(
+            title="Anti-raid",
+            description="🚨 **Raid mode is active**" if response else ("Enabled" if settings['enabled'] else "Disabled"),
+            color=discord.Color.red() if response else discord.Color.blue()
+        )
+        embed.add_field(name="Settings", value="\n".join(f"`{name}`: {settings[name]}" for name in TUNABLE_SETTINGS), inline=True)
+        embed.add_field(
+            name="Right now",
+            value=(
+                f"Joins in window: {joins}\nFlagged: {flagged}\n"
+                f"Lockdown: {'on' if settings['lockdown'] else 'off'}\n"
+                f"Alerts: {f'<#{alert_channel_id}>' if alert_channel_id else 'none'}"
+            ),
+            inline=True
+        )
+        if response:
+            embed.add_field(
+                name="Raid mode",
+                value=f"Since {discord.utils.format_dt(response.started_at, 'R')}\n"
+                      f"{response.timeouts} timed out, {self.timeout_queue.qsize()} queued",
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    @antiraid.command(name="enable")
+    async def antiraid_enable(self, ctx, alert_channel: discord.TextChannel = None):
+        """Turn on join burst detection, optionally posting alerts to a channel
+        Usage: !antiraid enable #mod-alerts"""
+        try:
+            changes = {'enabled': True}
+            if alert_channel is not None:
+                changes['alert_channel_id'] = alert_channel.id
+            await self.update_settings(ctx.guild.id, **changes)
+            await ctx.send(f"✅ Anti-raid enabled{f' with alerts in {alert_channel.mention}' if alert_channel else ''}.")
+            logger.info('%s enabled anti-raid in guild %s', ctx.author, ctx.guild.id)
+        except Exception as e:
+            logger.error('Error enabling anti-raid: %s', e)
+            await ctx.send("❌ An error occurred while enabling anti-raid.")
+
+    @antiraid.command(name="disable")
+    async def antiraid_disable(self, ctx):
+        """Turn off join burst detection"""
+        try:
+            await self.update_settings(ctx.guild.id, enabled=False)
+            await ctx.send("✅ Anti-raid disabled. Use `!antiraid end` to lift an active raid mode.")
+            logger.info('%s disabled anti-raid in guild %s', ctx.author, ctx.guild.id)
+        except Exception as e:
+            logger.error('Error disabling anti-raid: %s', e)
+            await ctx.send("❌ An error occurred while disabling anti-raid.")
+
+    @antiraid.command(name="set")
+    async def antiraid_set(self, ctx, setting: str, value: str):
+        """Change a detection setting
+        Usage: !antiraid set join_threshold 20, or !antiraid set lockdown off"""
+        setting = setting.lower()
+        if setting == 'lockdown':
+            if value.lower() not in ('on', 'off'):
+                await ctx.send("❌ Lockdown must be `on` or `off`.")
+                return
+            new_value = value.lower() == 'on'
+        elif setting in TUNABLE_SETTINGS:
+            low, high = TUNABLE_SETTINGS[setting]
+            if not value.isdigit() or not low <= int(value) <= high:
+                await ctx.send(f"❌ `{setting}` must be a number from {low} to {high}.")
+                return
+            new_value = int(value)
+        else:
+            await ctx.send(f"❌ Setting must be one of: {', '.join(list(TUNABLE_SETTINGS) + ['lockdown'])}")
+            return
+        try:
+            await self.update_settings(ctx.guild.id, **{setting: new_value})
+            await ctx.send(f"✅ `{setting}` set to {value.lower()}.")
+            logger.info('%s set anti-raid %s to %s in guild %s', ctx.author, setting, new_value, ctx.guild.id)
+        except Exception as e:
+            logger.error('Error updating anti-raid settings: %s', e)
+            await ctx.send("❌ An error occurred while updating the anti-raid settings.")
+
+    @antiraid.command(name="start")
+    async def antiraid_start(self, ctx):
+        """Enter raid mode now, without waiting for a join burst"""
+        if ctx.guild.id in self.responses:
+            await ctx.send("⚠️ Raid mode is already active.")
+            return
+        await self.start_raid_mode(ctx.guild, ctx.author.id)
+        await ctx.send("🚨 Raid mode enabled.")
+        logger.info('%s started raid mode in guild %s', ctx.author, ctx.guild.id)
+
+    @antiraid.command(name="end")
+    async def antiraid_end(self, ctx):
+        """Leave raid mode and undo the lockdown"""
+        if await self.end_raid_mode(ctx.guild, ctx.author.id):
+            await ctx.send("✅ Raid mode ended.")
+            logger.info('%s ended raid mode in guild %s', ctx.author, ctx.guild.id)
+        else:
+            await ctx.send("⚠️ Raid mode isn't active.")
+
+async def setup(bot):
+    await bot.add_cog(AntiRaid(bot))
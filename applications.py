@@ -1,18 +1,182 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, text
+from sqlalchemy.exc import IntegrityError
 from utils.database import db
-from models import Guild, GuildSettings
+from utils.dm_queue import dm_queue
+from utils.cache_policy import get_or_fetch_member
+from utils.cooldowns import cooldowns
+from models import Base, Guild, GuildSettings
 from utils.embeds import create_embed, create_error_embed
 from utils.permissions import has_bot_manager_role
 
 logger = logging.getLogger(__name__)
 
+# Minimum time between two submissions from the same user in a guild
+APPLICATION_COOLDOWN = timedelta(hours=1)
+REVIEWER_ROLES = ("BotManager", "BotManager 2")
+# An unsubmitted form is dropped, and its /apply cooldown given back, after this many seconds
+FORM_TIMEOUT = 900
+STATUS_COLORS = {
+    'pending': discord.Color.blue(),
+    'approved': discord.Color.green(),
+    'denied': discord.Color.red(),
+}
+
+class Application(Base):
+    __tablename__ = 'applications'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    user_id = Column(String, nullable=False)
+    name = Column(String(50), nullable=False)
+    age = Column(String(3), nullable=False)
+    reason = Column(Text, nullable=False)
+    contribution = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default='pending')
+    reviewer_id = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    reviewed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index('ix_applications_guild_status_created', 'guild_id', 'status', 'created_at'),
+        Index('ix_applications_guild_user_created', 'guild_id', 'user_id', 'created_at'),
+    )
+
+# At most one pending application per user and guild, enforced by the database so concurrent submits can't both land
+PENDING_ONLY = text("status = 'pending'")
+one_pending_application = Index(
+    'uq_applications_guild_user_pending', Application.guild_id, Application.user_id,
+    unique=True, sqlite_where=PENDING_ONLY, postgresql_where=PENDING_ONLY
+)
+ALREADY_PENDING = "You already have a pending application. Please wait for the staff team to review it."
+
+def submission_block_reason(session, guild_id: int, user_id: int) -> Optional[str]:
+    """Why this user can't submit another application right now, or None if they can"""
+    latest = session.query(Application).filter_by(
+        guild_id=str(guild_id), user_id=str(user_id)
+    ).order_by(Application.created_at.desc()).first()
+    if latest is None:
+        return None
+    if latest.status == 'pending':
+        return ALREADY_PENDING
+    if datetime.utcnow() - latest.created_at < APPLICATION_COOLDOWN:
+        return "You submitted an application recently. Please try again later."
+    return None
+
+def build_application_embed(application: Application, applicant: Optional[discord.abc.User] = None) -> discord.Embed:
+    embed = discord.Embed(
+        title=f"Application #{application.id}",
+        description=f"Application from {applicant.mention if applicant else f'<@{application.user_id}>'}",
+        color=STATUS_COLORS.get(application.status, discord.Color.blue()),
+        timestamp=application.created_at
+    )
+    embed.add_field(name="Name", value=application.name, inline=True)
+    embed.add_field(name="Age", value=application.age, inline=True)
+    embed.add_field(name="Why they want to join", value=application.reason, inline=False)
+    embed.add_field(name="Potential contributions", value=application.contribution, inline=False)
+    if application.status != 'pending':
+        embed.add_field(name="Status", value=f"{application.status.title()} by <@{application.reviewer_id}>", inline=False)
+    embed.set_footer(text=f"User ID: {application.user_id}")
+    return embed
+
+class ApplicationReviewButton(discord.ui.DynamicItem[discord.ui.Button], template=r'application:(?P<action>approve|deny):(?P<id>[0-9]+)'):
+    """Approve/deny button that carries the application ID in its custom_id.
+
+    Registered once with ``bot.add_dynamic_items``, so buttons on any review
+    message keep working across restarts without a view per message.
+    """
+
+    def __init__(self, action: str, application_id: int):
+        super().__init__(
+            discord.ui.Button(
+                label=action.title(),
+                style=discord.ButtonStyle.success if action == 'approve' else discord.ButtonStyle.danger,
+                custom_id=f'application:{action}:{application_id}'
+            )
+        )
+        self.action = action
+        self.application_id = application_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['action'], int(match['id']))
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        member = interaction.user
+        if member.guild_permissions.administrator or any(role.name in REVIEWER_ROLES for role in member.roles):
+            return True
+        await interaction.response.send_message("You don't have permission to review applications!", ephemeral=True)
+        return False
+
+    async def callback(self, interaction: discord.Interaction):
+        status = 'approved' if self.action == 'approve' else 'denied'
+        try:
+            application = await asyncio.to_thread(
+                review_application, self.application_id, interaction.guild_id, interaction.user.id, status
+            )
+            if application is None:
+                await interaction.response.send_message("This application was already reviewed.", ephemeral=True)
+                return
+
+            await interaction.response.edit_message(embed=build_application_embed(application), view=None)
+            logger.info('%s %s application #%s in %s', interaction.user, status, application.id, interaction.guild.name)
+
+            applicant = await get_or_fetch_member(interaction.guild, int(application.user_id))
+            if applicant:
+                dm_queue.enqueue(
+                    applicant,
+                    embed=create_embed(
+                        f"Application {status.title()}",
+                        f"Your application to {interaction.guild.name} has been {status}.",
+                        STATUS_COLORS[status]
+                    )
+                )
+        except Exception as e:
+            logger.error('Error reviewing application: %s', e)
+            error_embed = create_error_embed("Error", "An error occurred while reviewing the application.")
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=error_embed, ephemeral=True)
+            else:
+                await interaction.response.send_message(embed=error_embed, ephemeral=True)
+
+def review_application(application_id: int, guild_id: int, reviewer_id: int, status: str) -> Optional[Application]:
+    """Move a pending application to ``status``; returns None if it isn't pending anymore"""
+    session = db.get_session()
+    try:
+        # A single conditional UPDATE, so two reviewers clicking at once can't both win
+        updated = session.query(Application).filter_by(
+            id=application_id, guild_id=str(guild_id), status='pending'
+        ).update({
+            Application.status: status,
+            Application.reviewer_id: str(reviewer_id),
+            Application.reviewed_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        session.commit()
+        if not updated:
+            return None
+        application = session.get(Application, application_id)
+        session.expunge(application)
+        return application
+    finally:
+        session.close()
+
+def review_view(application_id: int) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    view.add_item(ApplicationReviewButton('approve', application_id))
+    view.add_item(ApplicationReviewButton('deny', application_id))
+    return view
+
 class ApplicationModal(discord.ui.Modal, title='Server Application'):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, opened_with: discord.Interaction):
+        super().__init__(timeout=FORM_TIMEOUT)
+        # The /apply interaction; its cooldown is refunded unless an application gets filed
+        self.opened_with = opened_with
         self.add_item(discord.ui.TextInput(
             label='Name',
             placeholder='Your name',
@@ -46,7 +210,11 @@ class ApplicationModal(discord.ui.Modal, title='Server Application'):
             max_length=1000
         ))
 
+    async def on_timeout(self):
+        cooldowns.refund_interaction(self.opened_with)
+
     async def on_submit(self, interaction: discord.Interaction):
+        submitted = False
         try:
             # Get the application channel from database
             session = db.get_session()
@@ -73,20 +241,48 @@ class ApplicationModal(discord.ui.Modal, title='Server Application'):
                 )
                 return
 
-            # Create and send application embed
-            embed = discord.Embed(
-                title="New Application",
-                description=f"Application from {interaction.user.mention}",
-                color=discord.Color.blue(),
-                timestamp=datetime.utcnow()
+            block_reason = submission_block_reason(session, interaction.guild_id, interaction.user.id)
+            if block_reason:
+                await interaction.response.send_message(
+                    embed=create_error_embed("Error", block_reason),
+                    ephemeral=True
+                )
+                return
+
+            # Store the application, then post it to the reviewer queue
+            application = Application(
+                guild_id=str(interaction.guild_id),
+                user_id=str(interaction.user.id),
+                name=self.children[0].value,
+                age=self.children[1].value,
+                reason=self.children[2].value,
+                contribution=self.children[3].value,
+                status='pending',
+                created_at=datetime.utcnow()
             )
-            embed.add_field(name="Name", value=self.children[0].value, inline=True)
-            embed.add_field(name="Age", value=self.children[1].value, inline=True)
-            embed.add_field(name="Why they want to join", value=self.children[2].value, inline=False)
-            embed.add_field(name="Potential contributions", value=self.children[3].value, inline=False)
-            embed.set_footer(text=f"User ID: {interaction.user.id}")
+            session.add(application)
+            try:
+                session.commit()
+            except IntegrityError:
+                # Another submit from this user got in between the check above and this insert
+                session.rollback()
+                await interaction.response.send_message(
+                    embed=create_error_embed("Error", ALREADY_PENDING),
+                    ephemeral=True
+                )
+                return
 
-            await channel.send(embed=embed)
+            try:
+                await channel.send(
+                    embed=build_application_embed(application, interaction.user),
+                    view=review_view(application.id)
+                )
+            except discord.HTTPException:
+                # Reviewers never saw it, so don't leave a pending row blocking a retry
+                session.delete(application)
+                session.commit()
+                raise
+            submitted = True
             await interaction.response.send_message(
                 embed=create_embed(
                     "Application Submitted",
@@ -95,32 +291,62 @@ class ApplicationModal(discord.ui.Modal, title='Server Application'):
                 ),
                 ephemeral=True
             )
-            logger.info(f'Application submitted by {interaction.user} in {interaction.guild.name}')
+            logger.info('Application submitted by %s in %s', interaction.user, interaction.guild.name)
         except Exception as e:
-            logger.error(f'Error processing application: {str(e)}')
-            await interaction.response.send_message(
-                embed=create_error_embed(
-                    "Error",
-                    "An error occurred while submitting your application. Please try again later."
-                ),
-                ephemeral=True
+            logger.error('Error processing application: %s', e)
+            error_embed = create_error_embed(
+                "Error",
+                "An error occurred while submitting your application. Please try again later."
             )
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=error_embed, ephemeral=True)
+            else:
+                await interaction.response.send_message(embed=error_embed, ephemeral=True)
         finally:
             session.close()
+            if not submitted:
+                cooldowns.refund_interaction(self.opened_with)
 
 class Applications(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        try:
+            await asyncio.to_thread(Base.metadata.create_all, db.engine, tables=[Application.__table__])
+            # create_all skips the indexes of a table that already exists
+            await asyncio.to_thread(one_pending_application.create, db.engine, checkfirst=True)
+        except Exception as e:
+            logger.error('Error creating applications table: %s', e)
+        self.bot.add_dynamic_items(ApplicationReviewButton)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(ApplicationReviewButton)
+
     @app_commands.command(name="apply", description="Submit a server application")
     async def apply(self, interaction: discord.Interaction):
         """Open the application form"""
+        opened = False
         try:
-            modal = ApplicationModal()
+            # Turn away duplicates before they fill in the whole form
+            session = db.get_session()
+            try:
+                block_reason = submission_block_reason(session, interaction.guild_id, interaction.user.id)
+            finally:
+                session.close()
+            if block_reason:
+                await interaction.response.send_message(
+                    embed=create_error_embed("Error", block_reason),
+                    ephemeral=True
+                )
+                return
+
+            modal = ApplicationModal(interaction)
             await interaction.response.send_modal(modal)
-            logger.info(f'{interaction.user} opened application form')
+            opened = True
+            logger.info('%s opened application form', interaction.user)
         except Exception as e:
-            logger.error(f'Error opening application form: {str(e)}')
+            logger.error('Error opening application form: %s', e)
             await interaction.response.send_message(
                 embed=create_error_embed(
                     "Error",
@@ -128,6 +354,9 @@ class Applications(commands.Cog):
                 ),
                 ephemeral=True
             )
+        finally:
+            if not opened:
+                cooldowns.refund_interaction(interaction)
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
@@ -156,9 +385,9 @@ class Applications(commands.Cog):
                     discord.Color.green()
                 )
             )
-            logger.info(f'{ctx.author} set application channel to {channel.name}')
+            logger.info('%s set application channel to %s', ctx.author, channel.name)
         except Exception as e:
-            logger.error(f'Error setting application channel: {str(e)}')
+            logger.error('Error setting application channel: %s', e)
             await ctx.send(
                 embed=create_error_embed(
                     "Error",
@@ -168,5 +397,74 @@ class Applications(commands.Cog):
         finally:
             session.close()
 
+    @commands.command(name="applications")
+    @commands.has_permissions(manage_channels=True)
+    @has_bot_manager_role()
+    async def list_applications(self, ctx, status: str = "pending", member: discord.Member = None):
+        """List applications in the reviewer queue
+        Usage: !applications [pending|approved|denied] [@member]"""
+        status = status.lower()
+        if status not in STATUS_COLORS:
+            await ctx.send("❌ Status must be one of: pending, approved, denied")
+            return
+        try:
+            session = db.get_session()
+            query = session.query(Application).filter_by(guild_id=str(ctx.guild.id), status=status)
+            if member:
+                query = query.filter_by(user_id=str(member.id))
+            # Oldest first, so the queue is worked in submission order
+            applications = query.order_by(Application.created_at.asc()).limit(15).all()
+
+            embed = discord.Embed(
+                title=f"{status.title()} Applications",
+                color=STATUS_COLORS[status]
+            )
+            if applications:
+                embed.description = "\n".join(
+                    f"**#{a.id}** <@{a.user_id}> — {a.name} ({a.created_at:%Y-%m-%d %H:%M})"
+                    for a in applications
+                )
+            else:
+                embed.description = "No applications found."
+            await ctx.send(embed=embed)
+            logger.info('%s listed %s applications', ctx.author, status)
+        except Exception as e:
+            logger.error('Error listing applications: %s', e)
+            await ctx.send(
+                embed=create_error_embed(
+                    "Error",
+                    "An error occurred while listing applications."
+                )
+            )
+        finally:
+            session.close()
+
+    @commands.command(name="application")
+    @commands.has_permissions(manage_channels=True)
+    @has_bot_manager_role()
+    async def show_application(self, ctx, application_id: int):
+        """Show a single application, with review buttons if it is still pending"""
+        try:
+            session = db.get_session()
+            application = session.query(Application).filter_by(
+                id=application_id, guild_id=str(ctx.guild.id)
+            ).first()
+            if not application:
+                await ctx.send(embed=create_error_embed("Error", f"Application #{application_id} not found."))
+                return
+
+            view = review_view(application.id) if application.status == 'pending' else None
+            await ctx.send(embed=build_application_embed(application), view=view)
+        except Exception as e:
+            logger.error('Error showing application: %s', e)
+            await ctx.send(
+                embed=create_error_embed(
+                    "Error",
+                    "An error occurred while loading the application."
+                )
+            )
+        finally:
+            session.close()
+
 async def setup(bot):
     await bot.add_cog(Applications(bot))
@@ -0,0 +1,113 @@
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import io
+import logging
+from datetime import datetime
+from typing import List
+from utils.audit_log import ACTIONS, ModerationAction, audit_log
+from utils.embeds import create_error_embed
+from utils.permissions import has_bot_manager_role
+
+logger = logging.getLogger(__name__)
+
+TARGET_MENTIONS = {
+    'member': '<@{}>',
+    'channel': '<#{}>',
+    'role': '<@&{}>',
+}
+
+def build_log_embed(title: str, rows: List[ModerationAction]) -> discord.Embed:
+    embed = discord.Embed(title=title, color=discord.Color.orange())
+    if not rows:
+        embed.description = "No moderation actions found."
+        return embed
+    lines = []
+    for row in rows:
+        target = TARGET_MENTIONS.get(row.target_type, '{}').format(row.target_id)
+        line = f"**#{row.id}** {row.created_at:%Y-%m-%d %H:%M} `{row.action}` {target} by <@{row.moderator_id}>"
+        if row.details:
+            line += f" ({row.details})"
+        if row.reason:
+            line += f" — {row.reason}"
+        lines.append(line[:300])
+    embed.description = "\n".join(lines)[:4096]
+    return embed
+
+class Audit(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        try:
+            await asyncio.to_thread(audit_log.create_tables)
+        except Exception as e:
+            logger.error('Error creating moderation audit table: %s', e)
+        self.flush_audit_log.start()
+
+    async def cog_unload(self):
+        # Also runs when the bot closes, so buffered actions are written on shutdown
+        self.flush_audit_log.cancel()
+        await audit_log.flush()
+
+    @tasks.loop(seconds=15)
+    async def flush_audit_log(self):
+        await audit_log.flush()
+
+    async def _send_log(self, ctx, title: str, **filters):
+        try:
+            rows = await audit_log.search(ctx.guild.id, **filters)
+            await ctx.send(embed=build_log_embed(title, rows))
+            logger.info('%s viewed moderation log: %s', ctx.author, title)
+        except Exception as e:
+            logger.error('Error reading moderation log: %s', e)
+            await ctx.send(embed=create_error_embed("Error", "An error occurred while reading the moderation log."))
+
+    @commands.group(invoke_without_command=True)
+    @commands.has_permissions(manage_messages=True)
+    @has_bot_manager_role()
+    async def modlog(self, ctx):
+        """Show recent moderation actions
+        Usage: !modlog [target|moderator|action|export]"""
+        await self._send_log(ctx, "Recent Moderation Actions")
+
+    @modlog.command(name="target")
+    async def modlog_target(self, ctx, user: discord.User):
+        """Moderation actions taken against a user"""
+        await self._send_log(ctx, f"Moderation Actions Against {user}", target_id=user.id)
+
+    @modlog.command(name="moderator")
+    async def modlog_moderator(self, ctx, moderator: discord.User):
+        """Moderation actions taken by a moderator"""
+        await self._send_log(ctx, f"Moderation Actions By {moderator}", moderator_id=moderator.id)
+
+    @modlog.command(name="action")
+    async def modlog_action(self, ctx, action: str):
+        """Moderation actions of one type"""
+        action = action.lower()
+        if action not in ACTIONS:
+            await ctx.send(f"❌ Action must be one of: {', '.join(ACTIONS)}")
+            return
+        await self._send_log(ctx, f"Recent {action} Actions", action=action)
+
+    @modlog.command(name="export")
+    @has_bot_manager_role(require_full_perms=True)  # Only BotManager 1 can export the full log
+    async def modlog_export(self, ctx, action: str = None):
+        """Export the moderation log as a CSV file
+        Usage: !modlog export [action]"""
+        if action is not None:
+            action = action.lower()
+            if action not in ACTIONS:
+                await ctx.send(f"❌ Action must be one of: {', '.join(ACTIONS)}")
+                return
+        try:
+            data = await audit_log.export_csv(ctx.guild.id, action)
+            filename = f"modlog-{ctx.guild.id}-{datetime.utcnow():%Y%m%d-%H%M}.csv"
+            await ctx.send(file=discord.File(io.BytesIO(data), filename=filename))
+            logger.info('%s exported the moderation log', ctx.author)
+        except Exception as e:
+            logger.error('Error exporting moderation log: %s', e)
+            await ctx.send(embed=create_error_embed("Error", "An error occurred while exporting the moderation log."))
+
+async def setup(bot):
+    await bot.add_cog(Audit(bot))
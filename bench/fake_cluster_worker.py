@@ -0,0 +1,81 @@
+"""Stand-in for ``Bot.py`` when trying out cluster.py without a Discord connection.
+
+Reads the same environment cluster.py hands a real worker, pretends its shards
+connect one by one, and serves /metrics and /health through the bot's own
+metrics server so the launcher's health checks, supervision and rolling
+restarts can be exercised locally:
+
+    python cluster.py --shards 8 --clusters 3 --worker-cmd "python bench/fake_cluster_worker.py"
+    kill -HUP <launcher pid>    # rolling restart
+    kill -USR1 <launcher pid>   # per-shard health report
+
+FAKE_CRASH_AFTER=<seconds> makes the worker exit with an error to test supervision.
+"""
+import asyncio
+import logging
+import os
+import random
+import signal
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils import metrics, sharding
+
+logger = logging.getLogger('fake_worker')
+
+
+class FakeShard:
+    def __init__(self):
+        self.latency = float('inf')
+        self.connected = False
+
+    def is_closed(self) -> bool:
+        return not self.connected
+
+
+class FakeShardedBot:
+    """Just the attributes ``sharding.shard_health`` reads"""
+
+    def __init__(self, shard_count: int, shard_ids):
+        self.shard_count = shard_count
+        self.shards = {shard_id: FakeShard() for shard_id in shard_ids}
+        self.guilds = []
+
+    def is_ready(self) -> bool:
+        return all(shard.connected for shard in self.shards.values())
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s worker {os.getenv('CLUSTER_ID')} %(message)s")
+    options = sharding.shard_options_from_env() or {}
+    shard_count = options.get('shard_count', 1)
+    bot = FakeShardedBot(shard_count, options.get('shard_ids', range(shard_count)))
+    await metrics.start_metrics_server('127.0.0.1', int(os.getenv('METRICS_PORT', '9100')),
+                                       health=lambda: sharding.shard_health(bot))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(signal.SIGINT, stop.set)
+
+    # Shards identify one after another, as they would against the real gateway
+    for shard_id, shard in bot.shards.items():
+        await asyncio.sleep(0.2)
+        shard.connected = True
+        shard.latency = random.uniform(0.03, 0.12)
+        bot.guilds.extend(object() for _ in range(random.randint(50, 150)))
+        sharding.update_shard_metrics(bot)
+        logger.info('Shard %s ready', shard_id)
+
+    crash_after = os.getenv('FAKE_CRASH_AFTER')
+    try:
+        await asyncio.wait_for(stop.wait(), float(crash_after) if crash_after else None)
+    except asyncio.TimeoutError:
+        logger.error('Simulated crash')
+        sys.exit(1)
+    logger.info('Shutting down')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
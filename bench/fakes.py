@@ -0,0 +1,313 @@
+"""In-memory stand-ins for the discord.py objects the cogs touch.
+
+Every coroutine that would hit Discord goes through ``StubHTTP`` instead,
+which counts calls per route and can add a simulated round-trip latency.
+Only the attributes and methods the cogs actually use are modelled.
+"""
+import asyncio
+import itertools
+import random
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import discord
+
+_ids = itertools.count(1_000_000_000_000_000)
+
+
+def next_id() -> int:
+    return next(_ids)
+
+
+class StubHTTP:
+    """Replaces the REST layer: records each call and optionally sleeps"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, forbidden_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.forbidden_rate = forbidden_rate
+        self.calls: Counter = Counter()
+
+    async def call(self, route: str, can_be_forbidden: bool = False):
+        self.calls[route] += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if can_be_forbidden and self.forbidden_rate and random.random() < self.forbidden_rate:
+            raise discord.Forbidden(_FakeResponse(403), 'Cannot send messages to this user')
+
+
+class _FakeResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = 'Forbidden'
+
+
+class FakePermissions:
+    def __init__(self, **overrides):
+        self._overrides = overrides
+
+    def __getattr__(self, name):
+        return self._overrides.get(name, True)
+
+
+class FakeRole:
+    def __init__(self, guild: 'FakeGuild', name: str, position: int = 1):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.position = position
+        self.mention = f'<@&{self.id}>'
+
+    def __ge__(self, other):
+        return self.position >= other.position
+
+    def __lt__(self, other):
+        return self.position < other.position
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeMember:
+    def __init__(self, guild: 'FakeGuild', name: str, bot: bool = False, http: Optional[StubHTTP] = None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.mention = f'<@{self.id}>'
+        self.roles: List[FakeRole] = [guild.default_role] if guild.default_role else []
+        self.guild_permissions = FakePermissions()
+        self.created_at = datetime.now(timezone.utc)
+        self.joined_at = self.created_at
+        self._http = http or guild.http
+
+    @property
+    def top_role(self) -> FakeRole:
+        return max(self.roles, key=lambda role: role.position)
+
+    def __str__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return getattr(other, 'id', None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    async def send(self, content=None, **kwargs):
+        await self._http.call('POST /channels/{dm}/messages', can_be_forbidden=True)
+
+    async def kick(self, reason=None):
+        await self._http.call('DELETE /guilds/{guild_id}/members/{user_id}')
+
+    async def ban(self, reason=None, **kwargs):
+        await self._http.call('PUT /guilds/{guild_id}/bans/{user_id}')
+
+    async def timeout(self, duration, reason=None):
+        await self._http.call('PATCH /guilds/{guild_id}/members/{user_id}')
+
+    async def add_roles(self, *roles, reason=None):
+        await self._http.call('PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}')
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        await self._http.call('DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}')
+        self.roles = [role for role in self.roles if role not in roles]
+
+
+class FakeMessage:
+    def __init__(self, channel: 'FakeTextChannel', content=None, embed=None, view=None, author=None):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.author = author
+        self.reactions: List[str] = []
+
+    async def add_reaction(self, emoji):
+        await self.channel.guild.http.call('PUT /channels/{channel_id}/messages/{message_id}/reactions')
+        self.reactions.append(emoji)
+
+    async def edit(self, **kwargs):
+        await self.channel.guild.http.call('PATCH /channels/{channel_id}/messages/{message_id}')
+
+
+class FakeTextChannel:
+    def __init__(self, guild: 'FakeGuild', name: str, category: Optional['FakeCategory'] = None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.mention = f'<#{self.id}>'
+        self.overwrites: Dict = {}
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.http.call('POST /channels/{channel_id}/messages')
+        self.sent += 1
+        return FakeMessage(self, content, kwargs.get('embed'), kwargs.get('view'))
+
+    async def set_permissions(self, target, **overwrite):
+        await self.guild.http.call('PUT /channels/{channel_id}/permissions/{overwrite_id}')
+        self.overwrites[target] = overwrite
+
+    def permissions_for(self, target):
+        return FakePermissions()
+
+    async def edit(self, **kwargs):
+        await self.guild.http.call('PATCH /channels/{channel_id}')
+
+    async def delete(self, reason=None):
+        await self.guild.http.call('DELETE /channels/{channel_id}')
+        self.guild._remove_channel(self)
+
+
+class FakeCategory:
+    def __init__(self, guild: 'FakeGuild', name: str):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.channels: List[FakeTextChannel] = []
+
+    async def create_text_channel(self, name: str, **kwargs):
+        await self.guild.http.call('POST /guilds/{guild_id}/channels')
+        channel = FakeTextChannel(self.guild, name, category=self)
+        self.channels.append(channel)
+        self.guild._add_channel(channel)
+        return channel
+
+
+class FakeGuild:
+    def __init__(self, name: str, http: StubHTTP, member_count: int = 100):
+        self.id = next_id()
+        self.name = name
+        self.http = http
+        self.default_role = None
+        self.default_role = FakeRole(self, '@everyone', position=0)
+        self.roles: List[FakeRole] = [self.default_role]
+        self.categories: List[FakeCategory] = []
+        self._channels: Dict[int, FakeTextChannel] = {}
+        self.me = FakeMember(self, 'Bot', bot=True)
+        self.me.roles.append(self._add_role('Bot', position=50))
+        self.members: List[FakeMember] = [FakeMember(self, f'user{i}') for i in range(member_count)]
+
+    @property
+    def channels(self) -> List[FakeTextChannel]:
+        return list(self._channels.values())
+
+    @property
+    def text_channels(self) -> List[FakeTextChannel]:
+        return self.channels
+
+    def _add_role(self, name: str, position: int = 1) -> FakeRole:
+        role = FakeRole(self, name, position)
+        self.roles.append(role)
+        return role
+
+    def _add_channel(self, channel: FakeTextChannel):
+        self._channels[channel.id] = channel
+
+    def _remove_channel(self, channel: FakeTextChannel):
+        self._channels.pop(channel.id, None)
+        if channel.category is not None and channel in channel.category.channels:
+            channel.category.channels.remove(channel)
+
+    def add_category(self, name: str) -> FakeCategory:
+        category = FakeCategory(self, name)
+        self.categories.append(category)
+        return category
+
+    def add_text_channel(self, name: str) -> FakeTextChannel:
+        channel = FakeTextChannel(self, name)
+        self._add_channel(channel)
+        return channel
+
+    def get_channel(self, channel_id: int) -> Optional[FakeTextChannel]:
+        return self._channels.get(channel_id)
+
+    def get_member(self, user_id: int) -> Optional[FakeMember]:
+        return next((member for member in self.members if member.id == user_id), None)
+
+    async def create_text_channel(self, name: str, **kwargs):
+        await self.http.call('POST /guilds/{guild_id}/channels')
+        channel = FakeTextChannel(self, name)
+        self._add_channel(channel)
+        return channel
+
+    async def create_role(self, name: str, **kwargs):
+        await self.http.call('POST /guilds/{guild_id}/roles')
+        return self._add_role(name)
+
+    async def create_category(self, name: str, **kwargs):
+        await self.http.call('POST /guilds/{guild_id}/channels')
+        return self.add_category(name)
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, route: str):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        self._done = True
+        await self._interaction.guild.http.call(route)
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond('POST /interactions/{id}/{token}/callback')
+
+    async def edit_message(self, **kwargs):
+        await self._respond('POST /interactions/{id}/{token}/callback')
+
+    async def send_modal(self, modal):
+        await self._respond('POST /interactions/{id}/{token}/callback')
+
+    async def defer(self, **kwargs):
+        await self._respond('POST /interactions/{id}/{token}/callback')
+
+
+class FakeInteraction:
+    def __init__(self, guild: FakeGuild, user: FakeMember, channel: Optional[FakeTextChannel] = None):
+        self.id = next_id()
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id if channel else None
+        self.command = None
+        self.extras: Dict = {}
+        self.created_at = datetime.now(timezone.utc)
+        self.response = FakeInteractionResponse(self)
+
+    async def edit_original_response(self, **kwargs):
+        await self.guild.http.call('PATCH /webhooks/{application_id}/{token}/messages/@original')
+
+
+class FakeContext:
+    """Enough of ``commands.Context`` to call prefix command callbacks directly"""
+
+    def __init__(self, guild: FakeGuild, author: FakeMember, channel: FakeTextChannel, command=None):
+        self.guild = guild
+        self.author = author
+        self.channel = channel
+        self.command = command
+        self.message = FakeMessage(channel, author=author)
+        self.me = guild.me
+
+    @property
+    def permissions(self) -> FakePermissions:
+        return self.channel.permissions_for(self.author)
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
@@ -0,0 +1,234 @@
+"""Offline load test: drive the cogs with fake guilds and interactions.
+
+Each scenario is fired open-loop at a fixed arrival rate for a fixed duration.
+Handlers run against the real cog code, a local SQLite database and the
+``StubHTTP`` REST stand-in from ``bench/fakes.py``, so no Discord connection is
+needed. Reports throughput, p50/p99 latency, REST calls per op and memory.
+
+Usage:
+    python bench/loadtest.py --scenarios warn,ticket --rate 200 --duration 10
+    python bench/loadtest.py --rest-latency 0.05 --rest-jitter 0.02
+"""
+import argparse
+import asyncio
+import importlib
+import itertools
+import logging
+import os
+import resource
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import discord
+from discord.ext import commands
+from fakes import FakeContext, FakeGuild, FakeInteraction, StubHTTP
+
+SCENARIOS = ('warn', 'ticket', 'application', 'tictactoe', 'moderation')
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoadTestEnv:
+    """A bot with every cog loaded and a set of fake guilds to aim them at"""
+
+    def __init__(self, http: StubHTTP, guild_count: int, members_per_guild: int):
+        self.http = http
+        self.guilds = [FakeGuild(f'guild{i}', http, members_per_guild) for i in range(guild_count)]
+        self.bot = None
+        self.cogs: Dict[str, commands.Cog] = {}
+        self.modules: Dict[str, object] = {}
+        self._members = itertools.cycle(
+            [(guild, member) for guild in self.guilds for member in guild.members]
+        )
+
+    async def setup(self):
+        from utils.database import db
+        from models import Base, Guild, GuildSettings
+
+        Base.metadata.create_all(db.engine)
+        self.bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
+        for name in ('warnings', 'tickets', 'applications', 'games', 'moderation'):
+            module = importlib.import_module(f'cogs.{name}')
+            await module.setup(self.bot)
+            self.modules[name] = module
+        for cog in self.bot.cogs.values():
+            self.cogs[cog.qualified_name] = cog
+
+        session = db.get_session()
+        try:
+            for guild in self.guilds:
+                guild.add_category('Tickets')
+                applications = guild.add_text_channel('applications')
+                record = Guild(guild_id=str(guild.id))
+                record.settings = GuildSettings(application_channel_id=str(applications.id))
+                session.add(record)
+            session.commit()
+        finally:
+            session.close()
+
+    async def teardown(self):
+        for name in list(self.bot.cogs):
+            await self.bot.remove_cog(name)
+
+    def next_member(self):
+        return next(self._members)
+
+    # Scenarios: one call is one operation
+
+    async def warn(self):
+        guild, member = self.next_member()
+        moderator = guild.members[0]
+        cog = self.cogs['Warnings']
+        await cog.warn.callback(cog, FakeInteraction(guild, moderator), member, 'load test')
+
+    async def ticket(self):
+        guild, member = self.next_member()
+        cog = self.cogs['Tickets']
+        await cog.create_ticket.callback(cog, FakeInteraction(guild, member), 'load test')
+
+    async def application(self):
+        guild, member = self.next_member()
+        interaction = FakeInteraction(guild, member)
+        modal = self.modules['applications'].ApplicationModal(interaction)
+        for child, value in zip(modal.children, ('Tester', '21', 'Load testing', 'Benchmarks')):
+            child._value = value
+        await modal.on_submit(interaction)
+
+    async def tictactoe(self):
+        """A full game: X takes the top row in five moves"""
+        guild, player1 = self.next_member()
+        player2 = guild.members[-1] if guild.members[-1] != player1 else guild.members[0]
+        view = self.modules['games'].TicTacToe(player1, player2)
+        for cell in (0, 3, 1, 4, 2):
+            player = view.current_player
+            await view.buttons[cell].callback(FakeInteraction(guild, player))
+        view.stop()
+
+    async def moderation(self):
+        guild, member = self.next_member()
+        ctx = FakeContext(guild, guild.members[0], guild.channels[0])
+        cog = self.cogs['Moderation']
+        action = member.id % 3
+        if action == 0:
+            await cog.kick.callback(cog, ctx, member, reason='load test')
+        elif action == 1:
+            await cog.ban.callback(cog, ctx, member, reason='load test')
+        else:
+            await cog.timeout.callback(cog, ctx, member, 5, reason='load test')
+
+
+async def run_scenario(name: str, operation: Callable[[], Awaitable[None]], rate: float, duration: float,
+                       concurrency: int, http: StubHTTP) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    limiter = asyncio.Semaphore(concurrency)
+    calls_before = sum(http.calls.values())
+
+    async def timed():
+        nonlocal errors
+        async with limiter:
+            started = perf_counter()
+            try:
+                await operation()
+            except Exception:
+                errors += 1
+            latencies.append(perf_counter() - started)
+
+    tracemalloc.start()
+    tasks = []
+    started = perf_counter()
+    for i in itertools.count():
+        due = started + i / rate
+        now = perf_counter()
+        if due - started >= duration:
+            break
+        if due > now:
+            await asyncio.sleep(due - now)
+        tasks.append(asyncio.create_task(timed()))
+    await asyncio.gather(*tasks)
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ops = len(latencies)
+    return {
+        'scenario': name,
+        'ops': ops,
+        'errors': errors,
+        'throughput': ops / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies, default=0.0) * 1000,
+        'rest_per_op': (sum(http.calls.values()) - calls_before) / ops if ops else 0.0,
+        'peak_alloc_mb': peak / 1024 / 1024,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def print_report(results: List[Dict[str, float]]):
+    header = f"{'scenario':<12}{'ops':>8}{'err':>6}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'rest/op':>9}{'peak MB':>9}{'rss MB':>9}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<12}{r['ops']:>8}{r['errors']:>6}{r['throughput']:>10.1f}{r['p50_ms']:>10.2f}"
+            f"{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}{r['rest_per_op']:>9.1f}{r['peak_alloc_mb']:>9.1f}{r['rss_mb']:>9.1f}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--rate', type=float, default=100.0, help='operations started per second, per scenario')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds to generate load for, per scenario')
+    # Several handlers hold a DB session across awaits; more operations in flight than the
+    # connection pool allows blocks the loop inside pool checkout and the run deadlocks
+    parser.add_argument('--concurrency', type=int, default=10, help='max operations in flight (keep below the DB pool size)')
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--members', type=int, default=200, help='members per guild')
+    parser.add_argument('--rest-latency', type=float, default=0.0, help='simulated seconds per REST call')
+    parser.add_argument('--rest-jitter', type=float, default=0.0, help='extra random seconds per REST call')
+    parser.add_argument('--dm-forbidden-rate', type=float, default=0.0, help='fraction of DMs that raise Forbidden')
+    parser.add_argument('--database-url', default=None, help='defaults to a throwaway SQLite file')
+    parser.add_argument('--log-level', default='WARNING')
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # utils.database reads DATABASE_URL when it is first imported
+        os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{os.path.join(tmp, "loadtest.db")}'
+        http = StubHTTP(args.rest_latency, args.rest_jitter, args.dm_forbidden_rate)
+        env = LoadTestEnv(http, args.guilds, args.members)
+        await env.setup()
+        try:
+            results = []
+            for name in scenarios:
+                results.append(await run_scenario(
+                    name, getattr(env, name), args.rate, args.duration, args.concurrency, http
+                ))
+        finally:
+            await env.teardown()
+    print_report(results)
+    return results
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
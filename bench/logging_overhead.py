@@ -0,0 +1,88 @@
+"""Per-command logging overhead: synchronous handlers vs the queue-backed pipeline.
+
+Measures the time the calling (event loop) thread spends on one command's log
+line. "sync" mirrors the previous setup: an eagerly formatted f-string written to
+console and file handlers on the calling thread. "async" is
+utils.structured_logging: a lazy %-style call that only enqueues the record.
+
+Usage: python bench/logging_overhead.py [iterations]
+"""
+import io
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+class FakeUser:
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+def _reset_root():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def bench_sync(iterations: int, log_dir: str) -> float:
+    _reset_root()
+    console = logging.StreamHandler(io.StringIO())
+    file_handler = logging.FileHandler(os.path.join(log_dir, 'sync.log'))
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    for handler in (console, file_handler):
+        handler.setFormatter(formatter)
+        logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+    logger = logging.getLogger('cogs.moderation')
+    author, member = FakeUser('moderator#0001'), FakeUser('member#0002')
+    start = time.perf_counter()
+    for i in range(iterations):
+        logger.info(f'{author} kicked {member} for reason: {i}')
+    elapsed = time.perf_counter() - start
+    _reset_root()
+    return elapsed / iterations
+
+
+def bench_async(iterations: int, log_dir: str) -> float:
+    _reset_root()
+    os.environ['LOG_FILE'] = os.path.join(log_dir, 'async.log')
+    from utils import structured_logging
+    structured_logging.setup_async_logger()
+    # Keep the console quiet so the listener thread's output doesn't skew the numbers
+    for handler in structured_logging._listener.handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setStream(io.StringIO())
+
+    logger = logging.getLogger('cogs.moderation')
+    author, member = FakeUser('moderator#0001'), FakeUser('member#0002')
+    start = time.perf_counter()
+    for i in range(iterations):
+        logger.info('%s kicked %s for reason: %s', author, member, i)
+    elapsed = time.perf_counter() - start
+    structured_logging.stop_async_logger()
+    _reset_root()
+    return elapsed / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as log_dir:
+        sync = bench_sync(iterations, log_dir)
+        async_ = bench_async(iterations, log_dir)
+    print(f'sync handlers : {sync * 1e6:8.2f} us per log call')
+    print(f'queue pipeline: {async_ * 1e6:8.2f} us per log call')
+    print(f'speedup       : {sync / async_:8.2f}x on the calling thread')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""Hot-path benchmark suite with JSON baselines and regression checks.
+
+Runs offline against a throwaway SQLite database and the fakes in ``bench/fakes.py``;
+an existing DATABASE_URL is ignored unless passed explicitly with ``--database-url``.
+
+Usage:
+    python bench/suite.py run [--only warn_insert_count,check_winner] [--output bench/baselines/latest.json]
+    python bench/suite.py compare bench/baselines/main.json [--current latest.json] [--threshold 0.15]
+
+``compare`` runs the suite (or loads ``--current``) and exits with status 1 if
+any benchmark's median is slower than the baseline by more than the threshold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import discord
+from discord.ext import commands
+from fakes import FakeContext, FakeInteraction, StubHTTP
+from loadtest import LoadTestEnv
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'latest.json')
+
+# name -> (iterations, factory); the factory prepares state and returns the timed coroutine function
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, iterations: int = 500):
+    def register(factory: Callable[[LoadTestEnv], Awaitable[Callable[[], Awaitable[None]]]]):
+        BENCHMARKS[name] = (iterations, factory)
+        return factory
+    return register
+
+
+@benchmark('warn_insert_count', iterations=300)
+async def bench_warn(env: LoadTestEnv):
+    cog = env.cogs['Warnings']
+    guild = env.guilds[0]
+    moderator, member = guild.members[0], guild.members[1]
+
+    async def run():
+        await cog.warn.callback(cog, FakeInteraction(guild, moderator), member, 'benchmark')
+    return run
+
+
+@benchmark('settings_lookup', iterations=2000)
+async def bench_settings(env: LoadTestEnv):
+    from utils.database import db
+    from models import Guild
+    guild_id = str(env.guilds[0].id)
+
+    async def run():
+        session = db.get_session()
+        try:
+            guild = session.query(Guild).filter_by(guild_id=guild_id).first()
+            guild.settings.application_channel_id
+        finally:
+            session.close()
+    return run
+
+
+@benchmark('ticket_duplicate_check', iterations=2000)
+async def bench_ticket_duplicate(env: LoadTestEnv):
+    cog = env.cogs['Tickets']
+    guild = env.guilds[0]
+    category = guild.categories[0]
+    # A busy ticket category; the author's own ticket is last so the scan is worst-case
+    for i in range(200):
+        await category.create_text_channel(f'ticket-other{i}')
+    member = guild.members[2]
+    await category.create_text_channel(f'ticket-{member.name.lower()}')
+
+    async def run():
+        await cog.create_ticket.callback(cog, FakeInteraction(guild, member), 'benchmark')
+    return run
+
+
+@benchmark('permission_checks', iterations=5000)
+async def bench_permission_checks(env: LoadTestEnv):
+    cog = env.cogs['Moderation']
+    guild = env.guilds[0]
+    manager_role = guild._add_role('BotManager', position=10)
+    author = guild.members[0]
+    author.roles.append(manager_role)
+    ctx = FakeContext(guild, author, guild.channels[0], command=cog.kick)
+    ctx.bot = env.bot
+    checks = cog.kick.checks
+
+    async def run():
+        for check in checks:
+            result = check(ctx)
+            if asyncio.iscoroutine(result):
+                await result
+    return run
+
+
+@benchmark('check_winner', iterations=20000)
+async def bench_check_winner(env: LoadTestEnv):
+    games = env.modules['games']
+    guild = env.guilds[0]
+    view = games.TicTacToe(guild.members[0], guild.members[1])
+    rng = random.Random(1)
+    boards = []
+    for _ in range(256):
+        cells = rng.sample(range(9), rng.randint(0, 9))
+        boards.append((
+            sum(1 << c for c in cells[0::2]),
+            sum(1 << c for c in cells[1::2]),
+        ))
+    index = 0
+
+    async def run():
+        nonlocal index
+        view.x_bits, view.o_bits = boards[index & 255]
+        index += 1
+        view.check_winner()
+    return run
+
+
+@benchmark('help_embed', iterations=2000)
+async def bench_help(env: LoadTestEnv):
+    import importlib
+    help_module = importlib.import_module('cogs.help')
+    guild = env.guilds[0]
+    channel = guild.channels[0]
+    ctx = FakeContext(guild, guild.members[0], channel)
+    ctx.bot = env.bot
+
+    help_module.Help(env.bot)  # installs CustomHelpCommand with its cache
+    help_command = env.bot.help_command
+    help_command.context = ctx
+    help_command.get_destination = lambda: channel
+    mapping = help_command.get_bot_mapping()
+
+    async def run():
+        await help_command.send_bot_help(mapping)
+    return run
+
+
+@benchmark('startup_to_ready', iterations=20)
+async def bench_startup(env: LoadTestEnv):
+    async def run():
+        fresh = LoadTestEnv(StubHTTP(), guild_count=1, members_per_guild=1)
+        await fresh.setup()
+        await fresh.teardown()
+    return run
+
+
+async def run_benchmark(env: LoadTestEnv, name: str, scale: float = 1.0) -> Dict[str, float]:
+    iterations, factory = BENCHMARKS[name]
+    iterations = max(5, int(iterations * scale))
+    run = await factory(env)
+    for _ in range(max(1, iterations // 10)):
+        await run()
+
+    timings: List[float] = []
+    for _ in range(iterations):
+        started = perf_counter()
+        await run()
+        timings.append(perf_counter() - started)
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'median_us': statistics.median(timings) * 1e6,
+        'p95_us': timings[min(len(timings) - 1, int(0.95 * len(timings)))] * 1e6,
+        'min_us': timings[0] * 1e6,
+        'ops_per_sec': 1 / statistics.mean(timings),
+    }
+
+
+async def run_suite(only: Optional[List[str]] = None, scale: float = 1.0,
+                    database_url: Optional[str] = None) -> dict:
+    names = only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    results, errors = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # utils.database reads DATABASE_URL when it is first imported
+        os.environ['DATABASE_URL'] = database_url or f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        env = LoadTestEnv(StubHTTP(), guild_count=2, members_per_guild=50)
+        await env.setup()
+        try:
+            for name in names:
+                try:
+                    results[name] = await run_benchmark(env, name, scale)
+                    print(f"{name:<24}{results[name]['median_us']:>12.1f} us median{results[name]['p95_us']:>12.1f} us p95")
+                except Exception as e:
+                    errors[name] = f'{type(e).__name__}: {e}'
+                    print(f'{name:<24} FAILED {errors[name]}')
+        finally:
+            await env.teardown()
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'discord.py': discord.__version__,
+            'machine': platform.machine(),
+            'scale': scale,
+        },
+        'results': results,
+        'errors': errors,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, only: Optional[List[str]] = None) -> List[str]:
+    """Names of benchmarks whose median got slower than ``threshold`` allows.
+
+    A baseline benchmark missing from ``current`` counts as a regression too,
+    unless ``only`` was given and leaves it out on purpose.
+    """
+    regressions = []
+    print(f"{'benchmark':<24}{'baseline us':>14}{'current us':>14}{'change':>10}")
+    for name, base in sorted(baseline['results'].items()):
+        now = current['results'].get(name)
+        if now is None:
+            if only is not None and name not in only:
+                print(f'{name:<24}{base["median_us"]:>14.1f}{"skipped":>14}')
+                continue
+            if name not in current.get('errors', {}):
+                regressions.append(name)
+                print(f'{name:<24}{base["median_us"]:>14.1f}{"missing":>14}  REGRESSION')
+            continue
+        change = now['median_us'] / base['median_us'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f'{name:<24}{base["median_us"]:>14.1f}{now["median_us"]:>14.1f}{change:>+10.1%}{flag}')
+    for name in current.get('errors', {}):
+        regressions.append(name)
+        print(f'{name:<24} FAILED {current["errors"][name]}')
+    return regressions
+
+
+def write_json(path: str, data: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='mode', required=True)
+
+    run_parser = sub.add_parser('run', help='run the suite and write a JSON result')
+    run_parser.add_argument('--only', help='comma-separated benchmark names')
+    run_parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    run_parser.add_argument('--scale', type=float, default=1.0, help='multiply iteration counts')
+    run_parser.add_argument('--database-url', default=None, help='defaults to a throwaway SQLite file')
+
+    compare_parser = sub.add_parser('compare', help='compare against a baseline JSON file')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('--current', help='result JSON to compare instead of running the suite')
+    compare_parser.add_argument('--threshold', type=float, default=0.15, help='allowed slowdown, e.g. 0.15 = 15%%')
+    compare_parser.add_argument('--only', help='comma-separated benchmark names')
+    compare_parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    compare_parser.add_argument('--scale', type=float, default=1.0)
+    compare_parser.add_argument('--database-url', default=None, help='defaults to a throwaway SQLite file')
+
+    args = parser.parse_args(argv)
+    only = [name.strip() for name in args.only.split(',')] if args.only else None
+
+    if args.mode == 'run':
+        write_json(args.output, asyncio.run(run_suite(only, args.scale, args.database_url)))
+        print(f'Wrote {args.output}')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = asyncio.run(run_suite(only or list(baseline['results']), args.scale, args.database_url))
+        write_json(args.output, current)
+
+    regressions = compare(baseline, current, args.threshold, only)
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    print('No regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
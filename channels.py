@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 import logging
 from utils.permissions import has_bot_manager_role
+from utils.audit_log import audit_log
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +10,12 @@ class Channels(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def set_channel_locked(self, channel: discord.TextChannel, locked: bool, moderator_id: int, reason=None):
+        """Stop or allow @everyone sending in a channel and log it; shared by !lock/!unlock and the anti-raid cog"""
+        await channel.set_permissions(channel.guild.default_role, send_messages=not locked, reason=reason)
+        audit_log.record(channel.guild.id, 'lock' if locked else 'unlock', moderator_id, channel.id,
+                         target_type='channel', reason=reason)
+
     @commands.command()
     @commands.has_permissions(manage_roles=True)
     async def setup_bot_role(self, ctx, role_number: int = 1):
@@ -17,28 +24,28 @@ class Channels(commands.Cog):
             # Validate role number
             if role_number not in [1, 2]:
                 await ctx.send("❌ Role number must be either 1 or 2!")
-                logger.warning(f"{ctx.author} attempted to create invalid BotManager role number: {role_number}")
+                logger.warning("%s attempted to create invalid BotManager role number: %s", ctx.author, role_number)
                 return
 
             role_name = f"BotManager {role_number}" if role_number > 1 else "BotManager"
-            logger.info(f"Attempting to create {role_name} role in guild {ctx.guild.name}...")
+            logger.info("Attempting to create %s role in guild %s...", role_name, ctx.guild.name)
 
             # Check if role already exists
             existing_role = discord.utils.get(ctx.guild.roles, name=role_name)
             if existing_role:
                 await ctx.send(f"⚠️ {role_name} role already exists!")
-                logger.info(f"{role_name} role already exists in guild {ctx.guild.name}")
+                logger.info("%s role already exists in guild %s", role_name, ctx.guild.name)
                 return
 
             # Verify bot's role hierarchy
             if not ctx.guild.me.guild_permissions.manage_roles:
                 await ctx.send("❌ I don't have permission to manage roles!")
-                logger.error(f"Bot lacks manage_roles permission in guild {ctx.guild.name}")
+                logger.error("Bot lacks manage_roles permission in guild %s", ctx.guild.name)
                 return
 
             if ctx.guild.me.top_role.position <= 1:
                 await ctx.send("❌ Please move my role higher in the hierarchy to manage roles!")
-                logger.error(f"Bot's role position too low in guild {ctx.guild.name}")
+                logger.error("Bot's role position too low in guild %s", ctx.guild.name)
                 return
 
             # Create new role
@@ -64,15 +71,15 @@ class Channels(commands.Cog):
                 f"• Manage roles below its position\n\n"
                 f"Assign this role to users who should manage bot features."
             )
-            logger.info(f'{ctx.author} created {role_name} role successfully in guild {ctx.guild.name}')
+            logger.info('%s created %s role successfully in guild %s', ctx.author, role_name, ctx.guild.name)
 
         except discord.Forbidden:
             error_msg = f"Missing permissions to create {role_name} role"
-            logger.error(f"{error_msg} in guild {ctx.guild.name}")
+            logger.error("%s in guild %s", error_msg, ctx.guild.name)
             await ctx.send(f"❌ {error_msg}!")
         except Exception as e:
             error_msg = f'Error creating {role_name} role: {str(e)}'
-            logger.error(f"{error_msg} in guild {ctx.guild.name}")
+            logger.error("%s in guild %s", error_msg, ctx.guild.name)
             await ctx.send(f"❌ An error occurred while creating the role: {str(e)}")
 
     @commands.command()
@@ -103,17 +110,21 @@ class Channels(commands.Cog):
                     continue
 
             await channel.set_permissions(role, **overwrite)
+            audit_log.record(
+                ctx.guild.id, 'set_permissions', ctx.author.id, channel.id, target_type='channel',
+                details=f"role {role.id}: " + ", ".join(f"{k}={v}" for k, v in overwrite.items())
+            )
 
             # Create permission summary
             perm_list = [f"{k}: {v}" for k, v in overwrite.items()]
             summary = "\n".join(perm_list)
 
             await ctx.send(f"✅ Updated permissions for {role.mention} in {channel.mention}:\n```\n{summary}\n```")
-            logger.info(f'{ctx.author} updated permissions for {role.name} in channel {channel.name}')
+            logger.info('%s updated permissions for %s in channel %s', ctx.author, role.name, channel.name)
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to modify channel permissions!")
         except Exception as e:
-            logger.error(f'Error setting channel permissions: {str(e)}')
+            logger.error('Error setting channel permissions: %s', e)
             await ctx.send("❌ An error occurred while setting permissions.")
 
     @commands.command()
@@ -135,11 +146,11 @@ class Channels(commands.Cog):
 
             formatted_perms = "\n".join(permission_list)
             await ctx.send(f"📋 Permissions for {role.mention} in {channel.mention}:\n```\n{formatted_perms}\n```")
-            logger.info(f'{ctx.author} viewed permissions for {role.name} in channel {channel.name}')
+            logger.info('%s viewed permissions for %s in channel %s', ctx.author, role.name, channel.name)
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to view channel permissions!")
         except Exception as e:
-            logger.error(f'Error viewing channel permissions: {str(e)}')
+            logger.error('Error viewing channel permissions: %s', e)
             await ctx.send("❌ An error occurred while viewing permissions.")
 
     @commands.command()
@@ -149,13 +160,13 @@ class Channels(commands.Cog):
         """Lock a text channel"""
         channel = channel or ctx.channel
         try:
-            await channel.set_permissions(ctx.guild.default_role, send_messages=False)
+            await self.set_channel_locked(channel, True, ctx.author.id)
             await ctx.send(f'🔒 Channel {channel.mention} has been locked.')
-            logger.info(f'{ctx.author} locked channel {channel.name}')
+            logger.info('%s locked channel %s', ctx.author, channel.name)
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to lock this channel!")
         except Exception as e:
-            logger.error(f'Error locking channel: {str(e)}')
+            logger.error('Error locking channel: %s', e)
             await ctx.send("❌ An error occurred while locking the channel.")
 
     @commands.command()
@@ -165,13 +176,13 @@ class Channels(commands.Cog):
         """Unlock a text channel"""
         channel = channel or ctx.channel
         try:
-            await channel.set_permissions(ctx.guild.default_role, send_messages=True)
+            await self.set_channel_locked(channel, False, ctx.author.id)
             await ctx.send(f'🔓 Channel {channel.mention} has been unlocked.')
-            logger.info(f'{ctx.author} unlocked channel {channel.name}')
+            logger.info('%s unlocked channel %s', ctx.author, channel.name)
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to unlock this channel!")
         except Exception as e:
-            logger.error(f'Error unlocking channel: {str(e)}')
+            logger.error('Error unlocking channel: %s', e)
             await ctx.send("❌ An error occurred while unlocking the channel.")
 
     @commands.command()
@@ -188,11 +199,11 @@ class Channels(commands.Cog):
                 return
 
             await ctx.send(f'Channel {channel.mention} has been created!')
-            logger.info(f'{ctx.author} created channel {channel_name} of type {channel_type}')
+            logger.info('%s created channel %s of type %s', ctx.author, channel_name, channel_type)
         except discord.Forbidden:
             await ctx.send("I don't have permission to create channels!")
         except Exception as e:
-            logger.error(f'Error creating channel: {e}')
+            logger.error('Error creating channel: %s', e)
             await ctx.send("An error occurred while creating the channel.")
 
     @commands.command()
@@ -202,11 +213,11 @@ class Channels(commands.Cog):
         try:
             await channel.delete()
             await ctx.send(f'Channel {channel.name} has been deleted!')
-            logger.info(f'{ctx.author} deleted channel {channel.name}')
+            logger.info('%s deleted channel %s', ctx.author, channel.name)
         except discord.Forbidden:
             await ctx.send("I don't have permission to delete this channel!")
         except Exception as e:
-            logger.error(f'Error deleting channel: {e}')
+            logger.error('Error deleting channel: %s', e)
             await ctx.send("An error occurred while deleting the channel.")
 
 
@@ -0,0 +1,248 @@
+"""Run the bot as several worker processes, each owning a contiguous range of shards.
+
+Every worker is a normal ``Bot.py`` process started with SHARD_COUNT,
+SHARD_IDS, CLUSTER_ID and its own METRICS_PORT, so it runs as an
+AutoShardedBot over just its slice and serves /metrics and /health.
+
+Usage:
+    python cluster.py --shards 16 --clusters 4
+    python cluster.py --shards auto              # ask Discord for the recommended shard count
+    python cluster.py --shards 8 --worker-cmd "python bench/fake_cluster_worker.py"
+
+Signals:
+    SIGHUP           rolling restart, one worker at a time, waiting for each to report healthy
+    SIGUSR1          log per-shard health for every worker
+    SIGINT/SIGTERM   stop all workers gracefully
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shlex
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from utils.sharding import format_shard_ids, split_shards
+
+logger = logging.getLogger('cluster')
+
+GATEWAY_BOT_URL = 'https://discord.com/api/v10/gateway/bot'
+
+
+class Worker:
+    def __init__(self, cluster_id: int, shard_ids: List[int], port: int):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.port = port
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at = 0.0
+        self.crashes = 0
+        self.restarting = False
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def __str__(self):
+        return f'cluster {self.cluster_id} (shards {format_shard_ids(self.shard_ids)})'
+
+
+class ClusterLauncher:
+    def __init__(self, shard_count: int, clusters: int, command: List[str], base_port: int,
+                 db_connections: int, health_timeout: float, stop_timeout: float):
+        self.shard_count = shard_count
+        self.command = command
+        self.health_timeout = health_timeout
+        self.stop_timeout = stop_timeout
+        self.workers = [
+            Worker(cluster_id, shard_ids, base_port + cluster_id)
+            for cluster_id, shard_ids in enumerate(split_shards(shard_count, clusters))
+        ]
+        # Share one connection budget across all workers instead of a full pool each
+        self.db_pool_size = max(1, db_connections // len(self.workers))
+        self._stopping = asyncio.Event()
+        self._restart_lock = asyncio.Lock()
+
+    def worker_env(self, worker: Worker) -> Dict[str, str]:
+        env = dict(os.environ)
+        env.update({
+            'SHARD_COUNT': str(self.shard_count),
+            'SHARD_IDS': format_shard_ids(worker.shard_ids),
+            'CLUSTER_ID': str(worker.cluster_id),
+            'METRICS_PORT': str(worker.port),
+            'DB_POOL_SIZE': str(self.db_pool_size),
+            'DB_MAX_OVERFLOW': '0',
+        })
+        return env
+
+    async def start_worker(self, worker: Worker):
+        worker.process = await asyncio.create_subprocess_exec(*self.command, env=self.worker_env(worker))
+        worker.started_at = time.monotonic()
+        logger.info('Started %s as pid %s on port %s', worker, worker.process.pid, worker.port)
+
+    async def stop_worker(self, worker: Worker):
+        if not worker.running:
+            return
+        worker.process.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(worker.process.wait(), self.stop_timeout)
+        except asyncio.TimeoutError:
+            logger.warning('%s did not exit within %ss, killing it', worker, self.stop_timeout)
+            worker.process.kill()
+            await worker.process.wait()
+        logger.info('Stopped %s', worker)
+
+    async def health(self, worker: Worker) -> Optional[dict]:
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as session:
+                async with session.get(f'http://127.0.0.1:{worker.port}/health') as response:
+                    return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError):
+            return None
+
+    async def wait_healthy(self, worker: Worker) -> bool:
+        """Wait until every shard of the worker is connected and it reports ready"""
+        deadline = time.monotonic() + self.health_timeout
+        while time.monotonic() < deadline and worker.running:
+            report = await self.health(worker)
+            if report and report.get('ready') and all(s['connected'] for s in report['shards'].values()):
+                return True
+            await asyncio.sleep(1)
+        return False
+
+    async def start_all(self):
+        # One worker at a time: identifies are rate limited per bot, not per process.
+        # Holding the restart lock keeps a SIGHUP from racing the initial start.
+        async with self._restart_lock:
+            for worker in self.workers:
+                if self._stopping.is_set():
+                    return
+                worker.restarting = True
+                try:
+                    await self.start_worker(worker)
+                    healthy = await self.wait_healthy(worker)
+                finally:
+                    worker.restarting = False
+                if not healthy:
+                    logger.warning('%s was not healthy within %ss, continuing', worker, self.health_timeout)
+
+    async def rolling_restart(self):
+        async with self._restart_lock:
+            logger.info('Rolling restart of %s workers', len(self.workers))
+            for worker in self.workers:
+                if self._stopping.is_set():
+                    return
+                worker.restarting = True
+                try:
+                    await self.stop_worker(worker)
+                    await self.start_worker(worker)
+                    healthy = await self.wait_healthy(worker)
+                finally:
+                    worker.restarting = False
+                if not healthy:
+                    logger.error('%s did not come back healthy; stopping the rolling restart', worker)
+                    return
+            logger.info('Rolling restart finished')
+
+    async def report(self):
+        for worker in self.workers:
+            report = await self.health(worker) if worker.running else None
+            if report is None:
+                logger.info('%s: %s', worker, 'unreachable' if worker.running else 'not running')
+                continue
+            shards = ', '.join(
+                f"{shard_id}={'%.0fms' % (s['latency'] * 1000) if s['latency'] is not None else 'n/a'}"
+                f"{'' if s['connected'] else ' (down)'}"
+                for shard_id, s in report['shards'].items()
+            )
+            logger.info('%s: ready=%s guilds=%s shards: %s', worker, report['ready'], report['guilds'], shards)
+
+    async def supervise(self):
+        """Restart workers that exit on their own, backing off if they keep crashing"""
+        while not self._stopping.is_set():
+            for worker in self.workers:
+                if worker.process is None or worker.running or worker.restarting:
+                    continue
+                # A worker that stayed up for ten minutes starts its backoff over
+                if time.monotonic() - worker.started_at > 600:
+                    worker.crashes = 0
+                worker.crashes += 1
+                delay = min(60, 2 ** worker.crashes)
+                logger.error('%s exited with %s; restarting in %ss', worker, worker.process.returncode, delay)
+                worker.restarting = True
+                asyncio.create_task(self._restart_after(worker, delay))
+            try:
+                await asyncio.wait_for(self._stopping.wait(), 1)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _restart_after(self, worker: Worker, delay: float):
+        try:
+            await asyncio.sleep(delay)
+            if not self._stopping.is_set():
+                await self.start_worker(worker)
+        finally:
+            worker.restarting = False
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGINT, self.stop)
+        loop.add_signal_handler(signal.SIGTERM, self.stop)
+        loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.create_task(self.rolling_restart()))
+        loop.add_signal_handler(signal.SIGUSR1, lambda: asyncio.create_task(self.report()))
+
+        logger.info('Launching %s shards across %s workers (DB pool %s per worker)',
+                    self.shard_count, len(self.workers), self.db_pool_size)
+        starter = asyncio.create_task(self.start_all())
+        await self.supervise()
+        starter.cancel()
+        await asyncio.gather(*(self.stop_worker(worker) for worker in self.workers))
+
+
+async def recommended_shards(token: str) -> int:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_BOT_URL, headers={'Authorization': f'Bot {token}'}) as response:
+            response.raise_for_status()
+            return (await response.json())['shards']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shards', default='auto', help='total shard count, or "auto" to ask Discord')
+    parser.add_argument('--clusters', type=int, default=os.cpu_count() or 1, help='worker processes (default: CPU count)')
+    parser.add_argument('--base-port', type=int, default=9100, help='worker N serves /metrics and /health on base+N')
+    parser.add_argument('--db-connections', type=int, default=40, help='database connections shared by all workers')
+    parser.add_argument('--health-timeout', type=float, default=120.0, help='seconds to wait for a worker to be ready')
+    parser.add_argument('--stop-timeout', type=float, default=30.0, help='seconds to wait for a worker to exit')
+    parser.add_argument('--worker-cmd', default=f'{shlex.quote(sys.executable)} Bot.py', help='command that runs one worker')
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    if args.shards == 'auto':
+        token = os.getenv('DISCORD_TOKEN')
+        if not token:
+            raise SystemExit('DISCORD_TOKEN is needed to look up the recommended shard count')
+        shard_count = await recommended_shards(token)
+    else:
+        shard_count = int(args.shards)
+
+    launcher = ClusterLauncher(
+        shard_count, args.clusters, shlex.split(args.worker_cmd), args.base_port,
+        args.db_connections, args.health_timeout, args.stop_timeout
+    )
+    await launcher.run()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+import discord
+from discord.ext import commands
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+from utils.database import db
+from models import Base
+from utils.permissions import has_bot_manager_role
+from utils.cooldowns import (
+    ALLOWED, COOLDOWN_DECISIONS, DUPLICATE, LIMITED, PREFIX, REFUNDED, SCOPES, SLASH, Rule, cooldowns
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_RATE = 100
+MAX_PER_SECONDS = 86400
+
+class CommandCooldown(Base):
+    __tablename__ = 'command_cooldowns'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    command = Column(String(64), nullable=False)
+    scope = Column(String(8), nullable=False)
+    # 0 turns the built-in limit off for this guild
+    rate = Column(Integer, nullable=False)
+    per = Column(Float, nullable=False)
+    updated_by = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('guild_id', 'command', 'scope', name='uq_command_cooldowns_guild_command_scope'),
+    )
+
+def load_overrides() -> Dict[int, Dict[Tuple[str, str], Rule]]:
+    session = db.get_session()
+    try:
+        overrides: Dict[int, Dict[Tuple[str, str], Rule]] = {}
+        for row in session.query(CommandCooldown).all():
+            overrides.setdefault(int(row.guild_id), {})[(row.command, row.scope)] = Rule(row.rate, row.per)
+        return overrides
+    finally:
+        session.close()
+
+def save_override(guild_id: int, command: str, scope: str, rate: int, per: float, author_id: int):
+    session = db.get_session()
+    try:
+        row = session.query(CommandCooldown).filter_by(guild_id=str(guild_id), command=command, scope=scope).first()
+        if row is None:
+            row = CommandCooldown(guild_id=str(guild_id), command=command, scope=scope)
+            session.add(row)
+        row.rate = rate
+        row.per = per
+        row.updated_by = str(author_id)
+        session.commit()
+    finally:
+        session.close()
+
+def delete_override(guild_id: int, command: str, scope: str) -> bool:
+    session = db.get_session()
+    try:
+        deleted = session.query(CommandCooldown).filter_by(guild_id=str(guild_id), command=command, scope=scope).delete()
+        session.commit()
+        return deleted > 0
+    finally:
+        session.close()
+
+class Cooldowns(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        try:
+            await asyncio.to_thread(Base.metadata.create_all, db.engine, tables=[CommandCooldown.__table__])
+            cooldowns.overrides = await asyncio.to_thread(load_overrides)
+        except Exception as e:
+            logger.error('Error loading command cooldowns: %s', e)
+
+    def command_names(self, name: str) -> List[str]:
+        """Cooldown keys (``!name`` or ``/name``) a command name could mean; a bare name matches both kinds"""
+        name = name.lower()
+        kinds = [name[0]] if name[:1] in (PREFIX, SLASH) else [PREFIX, SLASH]
+        name = name.lstrip(PREFIX + SLASH)
+        matches = []
+        if PREFIX in kinds and self.bot.get_command(name) is not None:
+            matches.append(PREFIX + self.bot.get_command(name).qualified_name)
+        if SLASH in kinds and self.bot.tree.get_command(name) is not None:
+            matches.append(SLASH + self.bot.tree.get_command(name).qualified_name)
+        return matches
+
+    async def _parse_command(self, ctx, command: str) -> Optional[str]:
+        names = self.command_names(command)
+        if not names:
+            await ctx.send(f"❌ There's no command called `{command}`.")
+            return None
+        if len(names) > 1:
+            await ctx.send(f"❌ `{command}` could be {' or '.join(f'`{name}`' for name in names)}; include the prefix.")
+            return None
+        return names[0]
+
+    async def _parse_target(self, ctx, command: str, scope: str) -> Optional[Tuple[str, str]]:
+        name = await self._parse_command(ctx, command)
+        if name is None:
+            return None
+        if scope.lower() not in SCOPES:
+            await ctx.send(f"❌ Scope must be one of: {', '.join(SCOPES)}")
+            return None
+        return name, scope.lower()
+
+    @commands.group(invoke_without_command=True)
+    @commands.has_permissions(manage_guild=True)
+    @has_bot_manager_role(require_full_perms=True)  # Only BotManager 1 can use this
+    async def cooldown(self, ctx):
+        """Show the command cooldowns in effect in this server
+        Subcommands: set, off, reset, clear"""
+        guild_rules = cooldowns.overrides.get(ctx.guild.id, {})
+        keys = sorted(set(cooldowns.rules) | set(guild_rules))
+        lines = []
+        for command, scope in keys:
+            rule = cooldowns.rule_for(ctx.guild.id, command, scope)
+            marker = " *(server)*" if (command, scope) in guild_rules else ""
+            lines.append(f"`{command}` per {scope}: {rule!r}{marker}")
+        names = {command for command, _ in keys}
+        embed = discord.Embed(title="Command Cooldowns", color=discord.Color.blue())
+        embed.description = "\n".join(lines)[:4096] or "No cooldowns configured."
+        embed.add_field(
+            name="Since startup",
+            value=(
+                f"Allowed: {sum(COOLDOWN_DECISIONS.get(command, ALLOWED) for command in names):.0f}\n"
+                f"Limited: {sum(COOLDOWN_DECISIONS.get(command, LIMITED) for command in names):.0f}\n"
+                f"Duplicates dropped: {sum(COOLDOWN_DECISIONS.get(command, DUPLICATE) for command in names):.0f}\n"
+                f"Refunded: {sum(COOLDOWN_DECISIONS.get(command, REFUNDED) for command in names):.0f}\n"
+                f"Tracked buckets: {cooldowns.tracked()}"
+            ),
+            inline=False
+        )
+        embed.set_footer(text="Counters cover every server this bot process serves")
+        await ctx.send(embed=embed)
+
+    @cooldown.command(name="set")
+    async def cooldown_set(self, ctx, command: str, scope: str, rate: int, per_seconds: float):
+        """Limit a command in this server
+        Usage: !cooldown set tictactoe user 1 60 (once a minute per user); use /stats or !stats when both exist"""
+        target = await self._parse_target(ctx, command, scope)
+        if target is None:
+            return
+        if not 1 <= rate <= MAX_RATE or not 1 <= per_seconds <= MAX_PER_SECONDS:
+            await ctx.send(f"❌ Rate must be 1-{MAX_RATE} and the period 1-{MAX_PER_SECONDS} seconds.")
+            return
+        name, scope = target
+        try:
+            await asyncio.to_thread(save_override, ctx.guild.id, name, scope, rate, per_seconds, ctx.author.id)
+            rule = Rule(rate, per_seconds)
+            cooldowns.set_override(ctx.guild.id, name, scope, rule)
+            await ctx.send(f"✅ `{name}` is now limited to {rule!r} per {scope}.")
+            logger.info('%s set %s cooldown for %s to %r in guild %s', ctx.author, scope, name, rule, ctx.guild.id)
+        except Exception as e:
+            logger.error('Error saving command cooldown: %s', e)
+            await ctx.send("❌ An error occurred while saving the cooldown.")
+
+    @cooldown.command(name="off")
+    async def cooldown_off(self, ctx, command: str, scope: str):
+        """Turn a built-in cooldown off in this server"""
+        target = await self._parse_target(ctx, command, scope)
+        if target is None:
+            return
+        name, scope = target
+        try:
+            await asyncio.to_thread(save_override, ctx.guild.id, name, scope, 0, 0, ctx.author.id)
+            cooldowns.set_override(ctx.guild.id, name, scope, Rule(0, 0))
+            await ctx.send(f"✅ `{name}` has no {scope} cooldown in this server.")
+            logger.info('%s turned off the %s cooldown for %s in guild %s', ctx.author, scope, name, ctx.guild.id)
+        except Exception as e:
+            logger.error('Error saving command cooldown: %s', e)
+            await ctx.send("❌ An error occurred while saving the cooldown.")
+
+    @cooldown.command(name="reset")
+    async def cooldown_reset(self, ctx, command: str, scope: str):
+        """Go back to the built-in cooldown for a command"""
+        target = await self._parse_target(ctx, command, scope)
+        if target is None:
+            return
+        name, scope = target
+        try:
+            deleted = await asyncio.to_thread(delete_override, ctx.guild.id, name, scope)
+            cooldowns.set_override(ctx.guild.id, name, scope, None)
+            if deleted:
+                await ctx.send(f"✅ `{name}` uses the default {scope} cooldown again.")
+            else:
+                await ctx.send(f"⚠️ `{name}` has no {scope} cooldown set for this server.")
+        except Exception as e:
+            logger.error('Error removing command cooldown: %s', e)
+            await ctx.send("❌ An error occurred while removing the cooldown.")
+
+    @cooldown.command(name="clear")
+    async def cooldown_clear(self, ctx, command: str, member: discord.Member = None):
+        """Let a member (or this server) use a command again right away"""
+        name = await self._parse_command(ctx, command)
+        if name is None:
+            return
+        if member is not None:
+            cooldowns.reset(name, ctx.guild.id, member.id)
+            await ctx.send(f"✅ Cleared {member.mention}'s cooldown on `{name}`.")
+        else:
+            cooldowns.reset(name, ctx.guild.id)
+            await ctx.send(f"✅ Cleared this server's cooldown on `{name}`.")
+
+async def setup(bot):
+    await bot.add_cog(Cooldowns(bot))
@@ -1,22 +1,288 @@
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
+import asyncio
 import random
 import logging
-from typing import Dict, List, Tuple
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from utils.game_sessions import GameSession, GameSessionManager
+from utils.game_results import GameResultRecorder
 
 logger = logging.getLogger(__name__)
 
+# Cell ``i`` of the board is bit ``i`` (row-major), so a 3x3 board fits in 9 bits
+# per player and every line is a single precomputed mask.
+FULL_BOARD = 0b111111111
+WIN_MASKS = tuple(
+    [0b111 << (3 * row) for row in range(3)] +
+    [0b1001001 << col for col in range(3)] +
+    [0b100010001, 0b001010100]
+)
+
+
+def _has_line(bits: int) -> bool:
+    return any(bits & mask == mask for mask in WIN_MASKS)
+
+
+def _solve(x_bits: int, o_bits: int, table: Dict[Tuple[int, int], Tuple[int, int]]) -> int:
+    """Negamax over every reachable position, scored for the side to move.
+
+    Faster wins score higher so the bot never drags out a won game.
+    """
+    key = (x_bits, o_bits)
+    if key in table:
+        return table[key][0]
+
+    occupied = x_bits | o_bits
+    empty = 9 - bin(occupied).count('1')
+    x_to_move = bin(x_bits).count('1') == bin(o_bits).count('1')
+    last_mover = o_bits if x_to_move else x_bits
+
+    if _has_line(last_mover):
+        table[key] = (-(1 + empty), -1)
+        return table[key][0]
+    if occupied == FULL_BOARD:
+        table[key] = (0, -1)
+        return 0
+
+    best_score, best_move = -10, -1
+    for cell in range(9):
+        bit = 1 << cell
+        if occupied & bit:
+            continue
+        if x_to_move:
+            score = -_solve(x_bits | bit, o_bits, table)
+        else:
+            score = -_solve(x_bits, o_bits | bit, table)
+        if score > best_score:
+            best_score, best_move = score, cell
+
+    table[key] = (best_score, best_move)
+    return best_score
+
+
+# Perfect-play table for every reachable position (~5.5k entries), built once at
+# import so a bot move is a single dict lookup.
+SOLVER_TABLE: Dict[Tuple[int, int], Tuple[int, int]] = {}
+_solve(0, 0, SOLVER_TABLE)
+
+
+class GridGame:
+    """Bitboard engine for k-in-a-row games on a ``width`` x ``height`` grid.
+
+    Cells are laid out column-major with ``height + 1`` bits per column; the spare
+    top bit of every column stays empty so shifted boards never wrap into the next
+    column. With ``gravity`` set, pieces drop to the lowest free cell (Connect Four).
+    """
+
+    __slots__ = ('width', 'height', 'k', 'gravity', 'stride', 'bits', 'heights', 'moves')
+
+    def __init__(self, width: int, height: int, k: int, gravity: bool = False):
+        self.width = width
+        self.height = height
+        self.k = k
+        self.gravity = gravity
+        self.stride = height + 1
+        self.bits = [0, 0]
+        self.heights = [0] * width
+        self.moves: List[int] = []
+
+    @property
+    def turn(self) -> int:
+        return len(self.moves) & 1
+
+    def copy(self) -> 'GridGame':
+        clone = GridGame(self.width, self.height, self.k, self.gravity)
+        clone.bits = list(self.bits)
+        clone.heights = list(self.heights)
+        clone.moves = list(self.moves)
+        return clone
+
+    def cell(self, col: int, row: int) -> int:
+        return col * self.stride + row
+
+    def is_full(self) -> bool:
+        return len(self.moves) == self.width * self.height
+
+    def owner(self, cell: int) -> Optional[int]:
+        bit = 1 << cell
+        if self.bits[0] & bit:
+            return 0
+        if self.bits[1] & bit:
+            return 1
+        return None
+
+    def drop_cell(self, col: int) -> Optional[int]:
+        """Cell a piece dropped into ``col`` would land on, or None if it is full"""
+        if self.heights[col] >= self.height:
+            return None
+        return self.cell(col, self.heights[col])
+
+    def legal_moves(self) -> List[int]:
+        if self.gravity:
+            cells = [self.drop_cell(col) for col in range(self.width)]
+            return [cell for cell in cells if cell is not None]
+        occupied = self.bits[0] | self.bits[1]
+        return [
+            self.cell(col, row)
+            for col in range(self.width)
+            for row in range(self.height)
+            if not occupied & (1 << self.cell(col, row))
+        ]
+
+    def play(self, cell: int) -> bool:
+        """Place the current player's piece on ``cell``; returns True if it wins"""
+        player = self.turn
+        self.bits[player] |= 1 << cell
+        self.heights[cell // self.stride] += 1
+        self.moves.append(cell)
+        return self.has_won(player)
+
+    def undo(self):
+        cell = self.moves.pop()
+        self.bits[self.turn] &= ~(1 << cell)
+        self.heights[cell // self.stride] -= 1
+
+    def has_won(self, player: int) -> bool:
+        """Shift-based run check: O(4k) big-int ops, independent of board size"""
+        bits = self.bits[player]
+        for shift in (1, self.stride - 1, self.stride, self.stride + 1):
+            run = bits
+            for i in range(1, self.k):
+                run &= bits >> (i * shift)
+                if not run:
+                    break
+            if run:
+                return True
+        return False
+
+
+@lru_cache(maxsize=None)
+def _windows(width: int, height: int, k: int) -> Tuple[int, ...]:
+    """Every k-long line on the grid as a bitmask, for the bot's evaluation"""
+    stride = height + 1
+    masks = []
+    for col in range(width):
+        for row in range(height):
+            for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                end_col, end_row = col + dc * (k - 1), row + dr * (k - 1)
+                if not (0 <= end_col < width and 0 <= end_row < height):
+                    continue
+                mask = 0
+                for i in range(k):
+                    mask |= 1 << ((col + dc * i) * stride + row + dr * i)
+                masks.append(mask)
+    return tuple(masks)
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+WIN_SCORE = 1_000_000
+
+
+def _evaluate(game: GridGame) -> int:
+    """Score open windows for the side to move; longer partial lines weigh more"""
+    mine, theirs = game.bits[game.turn], game.bits[1 - game.turn]
+    score = 0
+    for mask in _windows(game.width, game.height, game.k):
+        if mask & theirs == 0:
+            score += 4 ** bin(mask & mine).count('1') - 1
+        elif mask & mine == 0:
+            score -= 4 ** bin(mask & theirs).count('1') - 1
+    return score
+
+
+def _ordered_moves(game: GridGame) -> List[int]:
+    center_col, center_row = (game.width - 1) / 2, (game.height - 1) / 2
+    return sorted(
+        game.legal_moves(),
+        key=lambda cell: abs(cell // game.stride - center_col) + abs(cell % game.stride - center_row)
+    )
+
+
+def _negamax(game: GridGame, depth: int, alpha: int, beta: int, deadline: float) -> int:
+    if time.monotonic() > deadline:
+        raise _SearchTimeout
+    if depth == 0 or game.is_full():
+        return _evaluate(game)
+
+    best = -WIN_SCORE * 2
+    for cell in _ordered_moves(game):
+        if game.play(cell):
+            score = WIN_SCORE + depth
+        else:
+            score = -_negamax(game, depth - 1, -beta, -alpha, deadline)
+        game.undo()
+        if score > best:
+            best = score
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+    return best
+
+
+def search_best_move(game: GridGame, time_limit: float) -> int:
+    """Iterative-deepening alpha-beta that returns the best move found in ``time_limit`` seconds.
+
+    Blocking and CPU-bound; callers on the event loop should run it with
+    ``asyncio.to_thread`` on a copy of the game.
+    """
+    deadline = time.monotonic() + time_limit
+    start = len(game.moves)
+    moves = _ordered_moves(game)
+    best_move = moves[0]
+    remaining = game.width * game.height - len(game.moves)
+
+    for depth in range(1, remaining + 1):
+        try:
+            alpha, depth_best = -WIN_SCORE * 2, moves[0]
+            for cell in moves:
+                if game.play(cell):
+                    score = WIN_SCORE + depth
+                else:
+                    score = -_negamax(game, depth - 1, -WIN_SCORE * 2, -alpha, deadline)
+                game.undo()
+                if score > alpha:
+                    alpha, depth_best = score, cell
+        except _SearchTimeout:
+            # Unwind whatever the interrupted search left on the board
+            while len(game.moves) > start:
+                game.undo()
+            break
+        best_move = depth_best
+        # Search the previous best line first at the next depth
+        moves.remove(best_move)
+        moves.insert(0, best_move)
+        if alpha >= WIN_SCORE:
+            break
+
+    return best_move
+
+
 class TicTacToeButton(discord.ui.Button['TicTacToe']):
     def __init__(self, x: int, y: int):
         super().__init__(style=discord.ButtonStyle.secondary, label='\u200b', row=y)
         self.x = x
         self.y = y
+        self.cell = y * 3 + x
+
+    def mark(self, mark: int):
+        if mark == TicTacToe.X:
+            self.style = discord.ButtonStyle.danger
+            self.label = 'X'
+        else:
+            self.style = discord.ButtonStyle.success
+            self.label = 'O'
+        self.disabled = True
 
     async def callback(self, interaction: discord.Interaction):
         assert self.view is not None
         view: TicTacToe = self.view
-        state = view.board[self.y][self.x]
-        if state in (view.X, view.O):
+        if view.is_occupied(self.cell):
             return
 
         if view.current_player != interaction.user:
@@ -27,28 +293,26 @@ class TicTacToeButton(discord.ui.Button['TicTacToe']):
             await interaction.response.send_message('You are not part of this game!', ephemeral=True)
             return
 
-        # Place the mark
-        if view.current_player == view.player1:
-            self.style = discord.ButtonStyle.danger
-            self.label = 'X'
-            view.board[self.y][self.x] = view.X
-            view.current_player = view.player2
-        else:
-            self.style = discord.ButtonStyle.success
-            self.label = 'O'
-            view.board[self.y][self.x] = view.O
-            view.current_player = view.player1
+        if view.session is not None:
+            view.session.touch()
 
-        self.disabled = True
-        
-        # Check for winner
+        # Place the mark, then let the bot answer straight from the solver table
+        self.mark(view.play(self.cell))
         winner = view.check_winner()
+        if winner is None and view.vs_bot:
+            cell = view.best_move()
+            view.buttons[cell].mark(view.play(cell))
+            winner = view.check_winner()
+
         if winner is not None:
             if winner == view.X:
+                view.outcome = 0
                 content = f'Game Over! {view.player1.mention} won!'
             elif winner == view.O:
+                view.outcome = 1
                 content = f'Game Over! {view.player2.mention} won!'
             else:
+                view.outcome = -1
                 content = "Game Over! It's a tie!"
 
             for child in view.children:
@@ -64,95 +328,368 @@ class TicTacToe(discord.ui.View):
     O = 1
     Tie = 2
 
-    def __init__(self, player1: discord.Member, player2: discord.Member):
-        super().__init__()
+    def __init__(self, player1: discord.Member, player2: discord.Member, vs_bot: bool = False,
+                 timeout: Optional[float] = 180):
+        super().__init__(timeout=timeout)
         self.player1 = player1
         self.player2 = player2
+        self.vs_bot = vs_bot
+        self.session: Optional[GameSession] = None
+        # Index of the winning player, -1 for a tie, None while the game is running
+        self.outcome: Optional[int] = None
         self.current_player = player1
-        self.board = [[0, 0, 0] for _ in range(3)]
-        
+        self.x_bits = 0
+        self.o_bits = 0
+        self.buttons: List[TicTacToeButton] = [None] * 9
+
         # Add the buttons to the view
         for x in range(3):
             for y in range(3):
-                self.add_item(TicTacToeButton(x, y))
+                button = TicTacToeButton(x, y)
+                self.buttons[button.cell] = button
+                self.add_item(button)
 
-    def check_winner(self) -> int:
-        # Check rows
-        for row in self.board:
-            value = sum(row)
-            if value == 3:
-                return self.O
-            elif value == -3:
-                return self.X
-
-        # Check columns
-        for line in range(3):
-            value = self.board[0][line] + self.board[1][line] + self.board[2][line]
-            if value == 3:
-                return self.O
-            elif value == -3:
-                return self.X
-
-        # Check diagonals
-        diag = self.board[0][0] + self.board[1][1] + self.board[2][2]
-        if diag == 3:
-            return self.O
-        elif diag == -3:
-            return self.X
+    def is_occupied(self, cell: int) -> bool:
+        return bool((self.x_bits | self.o_bits) & (1 << cell))
 
-        diag = self.board[0][2] + self.board[1][1] + self.board[2][0]
-        if diag == 3:
-            return self.O
-        elif diag == -3:
+    def play(self, cell: int) -> int:
+        """Place the current player's mark on ``cell`` and pass the turn"""
+        if self.current_player == self.player1:
+            self.x_bits |= 1 << cell
+            self.current_player = self.player2
             return self.X
+        self.o_bits |= 1 << cell
+        self.current_player = self.player1
+        return self.O
 
-        # Check if board is full
-        if all(i != 0 for row in self.board for i in row):
+    def best_move(self) -> int:
+        return SOLVER_TABLE[(self.x_bits, self.o_bits)][1]
+
+    def check_winner(self) -> int:
+        if _has_line(self.x_bits):
+            return self.X
+        if _has_line(self.o_bits):
+            return self.O
+        if self.x_bits | self.o_bits == FULL_BOARD:
             return self.Tie
+        return None
+
+BOT_THINK_SECONDS = 1.5
+GAME_IDLE_TIMEOUT = 300
+PIECE_EMOJI = ('🔴', '🟡')
+EMPTY_EMOJI = '⚫'
+COLUMN_EMOJI = ('1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣', '8️⃣', '9️⃣')
+
+
+class GridMoveButton(discord.ui.Button['GridGameView']):
+    def __init__(self, move: int, label: str, row: int):
+        super().__init__(style=discord.ButtonStyle.secondary, label=label, row=row)
+        self.move = move
+
+    async def callback(self, interaction: discord.Interaction):
+        assert self.view is not None
+        await self.view.handle_move(interaction, self)
+
+class GridGameView(discord.ui.View):
+    """Discord front-end for a GridGame.
+
+    Gravity games get one button per column and render the board as text; other
+    boards get one button per cell, like TicTacToe.
+    """
+
+    def __init__(self, game: GridGame, player1: discord.Member, player2: discord.Member, vs_bot: bool = False,
+                 timeout: Optional[float] = 180):
+        super().__init__(timeout=timeout)
+        self.game = game
+        self.player1 = player1
+        self.player2 = player2
+        self.vs_bot = vs_bot
+        self.session: Optional[GameSession] = None
+        # Index of the winning player, -1 for a tie, None while the game is running
+        self.outcome: Optional[int] = None
+        self.move_buttons: Dict[int, GridMoveButton] = {}
+
+        if game.gravity:
+            for col in range(game.width):
+                button = GridMoveButton(col, str(col + 1), row=col // 5)
+                self.move_buttons[col] = button
+                self.add_item(button)
+        else:
+            for row in range(game.height):
+                for col in range(game.width):
+                    button = GridMoveButton(game.cell(col, row), '\u200b', row=row)
+                    self.move_buttons[button.move] = button
+                    self.add_item(button)
+
+    @property
+    def current_player(self) -> discord.Member:
+        return (self.player1, self.player2)[self.game.turn]
+
+    def render(self, status: str) -> str:
+        content = f'{self.player1.mention} {PIECE_EMOJI[0]} vs {self.player2.mention} {PIECE_EMOJI[1]}\n'
+        if self.game.gravity:
+            for row in reversed(range(self.game.height)):
+                content += ''.join(
+                    EMPTY_EMOJI if owner is None else PIECE_EMOJI[owner]
+                    for owner in (self.game.owner(self.game.cell(col, row)) for col in range(self.game.width))
+                ) + '\n'
+            content += ''.join(COLUMN_EMOJI[:self.game.width]) + '\n'
+        return content + status
 
+    def _apply(self, cell: int) -> Optional[str]:
+        """Play ``cell`` and update the buttons; returns the game-over message if the game ended"""
+        player = self.game.turn
+        won = self.game.play(cell)
+
+        if self.game.gravity:
+            col = cell // self.game.stride
+            if self.game.drop_cell(col) is None:
+                self.move_buttons[col].disabled = True
+        else:
+            button = self.move_buttons[cell]
+            button.style = discord.ButtonStyle.danger if player == 0 else discord.ButtonStyle.success
+            button.label = 'X' if player == 0 else 'O'
+            button.disabled = True
+
+        if won:
+            self.outcome = player
+            return f'Game Over! {(self.player1, self.player2)[player].mention} won!'
+        if self.game.is_full():
+            self.outcome = -1
+            return "Game Over! It's a tie!"
         return None
 
+    def _finish(self):
+        for child in self.children:
+            child.disabled = True
+        self.stop()
+
+    async def handle_move(self, interaction: discord.Interaction, button: GridMoveButton):
+        if self.current_player != interaction.user:
+            await interaction.response.send_message('It is not your turn!', ephemeral=True)
+            return
+
+        if interaction.user not in (self.player1, self.player2):
+            await interaction.response.send_message('You are not part of this game!', ephemeral=True)
+            return
+
+        cell = self.game.drop_cell(button.move) if self.game.gravity else button.move
+        if cell is None or self.game.owner(cell) is not None:
+            return
+        if self.session is not None:
+            self.session.touch()
+
+        result = self._apply(cell)
+        if result is not None:
+            self._finish()
+            await interaction.response.edit_message(content=self.render(result), view=self)
+            return
+        if not self.vs_bot:
+            await interaction.response.edit_message(
+                content=self.render(f"It's {self.current_player.mention}'s turn!"), view=self
+            )
+            return
+
+        # Acknowledge the move now and search in a worker thread so the event loop stays free
+        await interaction.response.edit_message(
+            content=self.render(f'{self.player2.mention} is thinking...'), view=self
+        )
+        cell = await asyncio.to_thread(search_best_move, self.game.copy(), BOT_THINK_SECONDS)
+        # The game may have timed out or been evicted while the search ran
+        if self.is_finished():
+            return
+        result = self._apply(cell)
+        if result is not None:
+            self._finish()
+        await interaction.edit_original_response(
+            content=self.render(result or f"It's {self.current_player.mention}'s turn!"), view=self
+        )
+
 class Games(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_games: Dict[int, TicTacToe] = {}
+        self.sessions = GameSessionManager(per_channel_limit=1, global_limit=5000, idle_timeout=GAME_IDLE_TIMEOUT)
+        self.results = GameResultRecorder(batch_size=50, leaderboard_size=10)
+        # Top-N embeds per guild, dropped whenever a flush changes that guild's ratings
+        self._leaderboard_embeds: Dict[int, discord.Embed] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.sweep_sessions.start()
+
+    async def cog_load(self):
+        try:
+            await asyncio.to_thread(GameResultRecorder.create_tables)
+        except Exception as e:
+            logger.error('Error creating game result tables: %s', e)
+        self.flush_results.start()
+
+    async def cog_unload(self):
+        self.sweep_sessions.cancel()
+        self.flush_results.cancel()
+        await self._flush_results()
+
+    async def _flush_results(self):
+        for guild_id in await self.results.flush():
+            self._leaderboard_embeds.pop(int(guild_id), None)
+
+    @tasks.loop(seconds=30)
+    async def flush_results(self):
+        await self._flush_results()
+
+    def _record(self, *args, **kwargs):
+        # One background flush at a time; a full buffer while one runs waits for the next
+        if self.results.record(*args, **kwargs) and not self._flush_tasks:
+            task = asyncio.create_task(self._flush_results())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    @tasks.loop(seconds=60)
+    async def sweep_sessions(self):
+        evicted = self.sessions.sweep()
+        if evicted:
+            logger.info('Evicted %s idle games, %s still running', evicted, len(self.sessions))
 
     @commands.command(name='flip', aliases=['coin'])
     async def flip_coin(self, ctx):
         """Flip a coin - returns heads or tails"""
         result = random.choice(['Heads 🪙', 'Tails 🪙'])
         await ctx.send(f'The coin shows: **{result}**')
-        logger.info(f'{ctx.author} flipped a coin, got {result}')
+        logger.info('%s flipped a coin, got %s', ctx.author, result)
+        if ctx.guild is not None:
+            self._record(ctx.guild.id, 'flip', ctx.author.id, outcome=result.split()[0].lower())
 
-    @commands.command(name='tictactoe', aliases=['ttt'])
-    async def tic_tac_toe(self, ctx, opponent: discord.Member):
-        """Start a game of Tic Tac Toe with another player"""
-        if opponent.bot:
-            await ctx.send("You can't play against bots!")
-            return
+    async def _resolve_opponent(self, ctx, opponent: Optional[discord.Member]) -> Optional[Tuple[discord.Member, bool]]:
+        """Return ``(opponent, vs_bot)``, or None after telling the author why they can't play"""
+        vs_bot = opponent is None or opponent == ctx.guild.me
+        if vs_bot:
+            opponent = ctx.guild.me
+        elif opponent.bot:
+            await ctx.send("You can't play against other bots!")
+            return None
         if opponent == ctx.author:
             await ctx.send("You can't play against yourself!")
-            return
+            return None
+
+        if self.sessions.channel_full(ctx.channel.id):
+            await ctx.send("There's already a game in progress in this channel!")
+            return None
+        return opponent, vs_bot
 
-        # Check if either player is in an active game
-        if ctx.channel.id in self.active_games:
+    async def _run_game(self, ctx, kind: str, view: discord.ui.View, content: str):
+        session = self.sessions.open(
+            kind, ctx.guild.id, ctx.channel.id, (view.player1.id, view.player2.id), view
+        )
+        if session is None:
             await ctx.send("There's already a game in progress in this channel!")
             return
+        view.session = session
 
-        view = TicTacToe(ctx.author, opponent)
-        self.active_games[ctx.channel.id] = view
-        
-        await ctx.send(
+        try:
+            await ctx.send(content, view=view)
+            # Wait for the game to finish, time out or be evicted, then clean up
+            await view.wait()
+        finally:
+            self.sessions.close(session)
+            view.session = None
+
+        if view.outcome is not None:
+            players = (view.player1, view.player2)
+            self._record(
+                ctx.guild.id,
+                kind,
+                view.player1.id,
+                view.player2.id,
+                winner_id=players[view.outcome].id if view.outcome >= 0 else None,
+                outcome='win' if view.outcome >= 0 else 'tie',
+                rated=not view.vs_bot
+            )
+
+    @app_commands.command(name="leaderboard", description="Show the top game players in this server")
+    async def leaderboard(self, interaction: discord.Interaction):
+        """Show the server's top players by rating"""
+        try:
+            embed = self._leaderboard_embeds.get(interaction.guild_id)
+            if embed is None:
+                rows = await self.results.top_players(interaction.guild_id)
+                embed = discord.Embed(title="🏆 Game Leaderboard", color=discord.Color.gold())
+                if rows:
+                    embed.description = "\n".join(
+                        f"**{rank}.** <@{user_id}> — {round(rating)} ({wins}W/{losses}L/{ties}T)"
+                        for rank, (user_id, rating, wins, losses, ties) in enumerate(rows, start=1)
+                    )
+                else:
+                    embed.description = "No rated games have been played yet."
+                embed.set_footer(text="Ratings update every 30 seconds")
+                self._leaderboard_embeds[interaction.guild_id] = embed
+
+            await interaction.response.send_message(embed=embed)
+            logger.info('%s viewed the leaderboard in %s', interaction.user, interaction.guild.name)
+        except Exception as e:
+            logger.error('Error showing leaderboard: %s', e)
+            await interaction.response.send_message("❌ An error occurred while loading the leaderboard.", ephemeral=True)
+
+    @commands.command(name='gamestats')
+    async def game_stats(self, ctx):
+        """Show how many games are running and how sessions ended"""
+        stats = self.sessions.stats()
+        summary = "\n".join(f"{name}: {value}" for name, value in stats.items())
+        await ctx.send(f"🎮 Game sessions:\n```\n{summary}\n```")
+
+    @commands.command(name='tictactoe', aliases=['ttt'])
+    @commands.guild_only()
+    async def tic_tac_toe(self, ctx, opponent: Optional[discord.Member] = None):
+        """Start a game of Tic Tac Toe with another player, or with the bot if no opponent is given"""
+        resolved = await self._resolve_opponent(ctx, opponent)
+        if resolved is None:
+            return
+        opponent, vs_bot = resolved
+
+        view = TicTacToe(ctx.author, opponent, vs_bot=vs_bot, timeout=GAME_IDLE_TIMEOUT)
+        logger.info('%s started a tic-tac-toe game with %s', ctx.author, opponent)
+        await self._run_game(
+            ctx,
+            'tictactoe',
+            view,
             f'Tic Tac Toe: {ctx.author.mention} vs {opponent.mention}\n'
-            f"It's {ctx.author.mention}'s turn!",
-            view=view
+            f"It's {ctx.author.mention}'s turn!"
         )
-        logger.info(f'{ctx.author} started a tic-tac-toe game with {opponent}')
 
-        # Wait for the game to finish and clean up
-        await view.wait()
-        if ctx.channel.id in self.active_games:
-            del self.active_games[ctx.channel.id]
+    @commands.command(name='connectfour', aliases=['c4'])
+    @commands.guild_only()
+    async def connect_four(self, ctx, opponent: Optional[discord.Member] = None):
+        """Start a game of Connect Four with another player, or with the bot if no opponent is given"""
+        resolved = await self._resolve_opponent(ctx, opponent)
+        if resolved is None:
+            return
+        opponent, vs_bot = resolved
+
+        view = GridGameView(GridGame(7, 6, 4, gravity=True), ctx.author, opponent, vs_bot=vs_bot,
+                            timeout=GAME_IDLE_TIMEOUT)
+        logger.info('%s started a connect four game with %s', ctx.author, opponent)
+        await self._run_game(ctx, 'connectfour', view, view.render(f"It's {ctx.author.mention}'s turn!"))
+
+    @commands.command(name='grid', aliases=['kinarow'])
+    @commands.guild_only()
+    async def grid_game(self, ctx, size: int, k: int, opponent: Optional[discord.Member] = None):
+        """Start a k-in-a-row game on a size x size board
+        Usage: !grid 5 4 @player (size 3-5, k between 3 and size)"""
+        if not 3 <= size <= 5 or not 3 <= k <= size:
+            await ctx.send("Board size must be between 3 and 5, and k between 3 and the board size!")
+            return
+
+        resolved = await self._resolve_opponent(ctx, opponent)
+        if resolved is None:
+            return
+        opponent, vs_bot = resolved
+
+        view = GridGameView(GridGame(size, size, k), ctx.author, opponent, vs_bot=vs_bot,
+                            timeout=GAME_IDLE_TIMEOUT)
+        logger.info('%s started a %sx%s %s-in-a-row game with %s', ctx.author, size, size, k, opponent)
+        await self._run_game(
+            ctx,
+            'grid',
+            view,
+            f'{k} in a row ({size}x{size}): ' + view.render(f"It's {ctx.author.mention}'s turn!")
+        )
 
 async def setup(bot):
     await bot.add_cog(Games(bot))
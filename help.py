@@ -1,5 +1,54 @@
-rom discord.ext import commands
+from discord.ext import commands
 import discord
+import inspect
+from typing import Dict, List, Optional, Tuple
+
+# Permission tiers, lowest first. A command is listed for a tier if every one of
+# its checks can pass for someone at that tier.
+EVERYONE, BOT_MANAGER_2, BOT_MANAGER_1, ADMIN = range(4)
+TIER_NAMES = ("Everyone", "BotManager 2", "BotManager 1", "Admin")
+
+# What the roles created by !setup_bot_role are allowed to do
+TIER_PERMISSIONS = {
+    BOT_MANAGER_2: {'manage_messages', 'manage_channels', 'manage_roles'},
+    BOT_MANAGER_1: {'manage_messages', 'manage_channels', 'manage_roles', 'kick_members', 'ban_members'},
+}
+
+COGS_PER_PAGE = 6
+# Well under Discord's 25 fields per embed
+COMMANDS_PER_PAGE = 20
+
+
+def check_tier(predicate) -> int:
+    """Lowest tier a single command check lets through"""
+    name = getattr(predicate, '__qualname__', '')
+    if name.startswith('has_bot_manager_role'):
+        nonlocals = inspect.getclosurevars(predicate).nonlocals
+        return BOT_MANAGER_1 if nonlocals.get('require_full_perms') else BOT_MANAGER_2
+    if name.startswith(('has_permissions', 'has_guild_permissions')):
+        perms = {perm for perm, value in inspect.getclosurevars(predicate).nonlocals.get('perms', {}).items() if value}
+        for tier in (BOT_MANAGER_2, BOT_MANAGER_1):
+            if perms <= TIER_PERMISSIONS[tier]:
+                return tier
+        return ADMIN
+    # has_admin_permissions, is_owner and anything we can't see into
+    return ADMIN
+
+
+def command_tier(command: commands.Command) -> int:
+    return max((check_tier(check) for check in command.checks), default=EVERYONE)
+
+
+def member_tier(member) -> int:
+    if getattr(member, 'guild_permissions', None) and member.guild_permissions.administrator:
+        return ADMIN
+    role_names = {role.name for role in getattr(member, 'roles', ())}
+    if "BotManager" in role_names:
+        return BOT_MANAGER_1
+    if "BotManager 2" in role_names:
+        return BOT_MANAGER_2
+    return EVERYONE
+
 
 class Help(commands.Cog):
     def __init__(self, bot):
@@ -7,23 +56,138 @@ class Help(commands.Cog):
         self._original_help_command = bot.help_command
         bot.help_command = CustomHelpCommand()
         bot.help_command.cog = self
+        self._cache_key: Optional[Tuple] = None
+        self._pages: Dict[int, List[discord.Embed]] = {}
+        self._cog_pages: Dict[Tuple[str, int], List[discord.Embed]] = {}
 
     def cog_unload(self):
         self.bot.help_command = self._original_help_command
 
+    async def cog_load(self):
+        # Loaded after the other extensions, so this prebuilds every tier up front
+        self.ensure_cache()
+
+    def invalidate(self):
+        self._cache_key = None
+
+    def ensure_cache(self):
+        """Rebuild the help embeds if any cog was added, removed or reloaded since the last build"""
+        key = tuple((name, id(cog)) for name, cog in self.bot.cogs.items() if cog is not self)
+        if key == self._cache_key:
+            return
+
+        by_cog: Dict[str, List[Tuple[int, commands.Command]]] = {}
+        for command in self.bot.commands:
+            if command.hidden:
+                continue
+            cog_name = command.cog.qualified_name if command.cog else "General"
+            by_cog.setdefault(cog_name, []).append((command_tier(command), command))
+
+        self._pages = {}
+        self._cog_pages = {}
+        for tier in range(len(TIER_NAMES)):
+            fields = []
+            for cog_name in sorted(by_cog):
+                names = sorted(c.name for t, c in by_cog[cog_name] if t <= tier)
+                if not names:
+                    continue
+                value = ", ".join(f"`{name}`" for name in names)
+                fields.append((cog_name, value))
+                visible = [c for t, c in sorted(by_cog[cog_name], key=lambda item: item[1].name) if t <= tier]
+                self._cog_pages[(cog_name, tier)] = self._build_cog_pages(cog_name, visible)
+            self._pages[tier] = self._build_pages(fields, tier)
+
+        self._cache_key = key
+
+    @staticmethod
+    def _build_pages(fields: List[Tuple[str, str]], tier: int) -> List[discord.Embed]:
+        chunks = [fields[i:i + COGS_PER_PAGE] for i in range(0, len(fields), COGS_PER_PAGE)] or [[]]
+        pages = []
+        for number, chunk in enumerate(chunks, start=1):
+            embed = discord.Embed(title="Bot Commands", color=discord.Color.blue())
+            for name, value in chunk:
+                embed.add_field(name=name, value=value[:1024], inline=False)
+            footer = "Use !help <command> for more details about a command"
+            if len(chunks) > 1:
+                footer = f"Page {number}/{len(chunks)} • {footer}"
+            if tier > EVERYONE:
+                footer = f"{footer} • Showing {TIER_NAMES[tier]} commands"
+            embed.set_footer(text=footer)
+            pages.append(embed)
+        return pages
+
+    @staticmethod
+    def _build_cog_pages(cog_name: str, cog_commands: List[commands.Command]) -> List[discord.Embed]:
+        chunks = [cog_commands[i:i + COMMANDS_PER_PAGE] for i in range(0, len(cog_commands), COMMANDS_PER_PAGE)]
+        pages = []
+        for number, chunk in enumerate(chunks, start=1):
+            embed = discord.Embed(title=f"{cog_name} Commands", color=discord.Color.blue())
+            for command in chunk:
+                embed.add_field(name=f"!{command.name}", value=command.short_doc or "No description available", inline=False)
+            footer = "Use !help <command> for more details about a command"
+            if len(chunks) > 1:
+                footer = f"Page {number}/{len(chunks)} • {footer}"
+            embed.set_footer(text=footer)
+            pages.append(embed)
+        return pages
+
+    def pages_for(self, member) -> List[discord.Embed]:
+        self.ensure_cache()
+        return self._pages[member_tier(member)]
+
+    def cog_pages_for(self, cog_name: str, member) -> Optional[List[discord.Embed]]:
+        self.ensure_cache()
+        return self._cog_pages.get((cog_name, member_tier(member)))
+
+
+class HelpPaginator(discord.ui.View):
+    def __init__(self, author, pages: List[discord.Embed]):
+        super().__init__(timeout=120)
+        self.author = author
+        self.pages = pages
+        self.page = 0
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page == len(self.pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user != self.author:
+            await interaction.response.send_message("Run !help yourself to browse the commands.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+
+
 class CustomHelpCommand(commands.HelpCommand):
+    async def _send_pages(self, pages: List[discord.Embed]):
+        if len(pages) == 1:
+            await self.get_destination().send(embed=pages[0])
+        else:
+            await self.get_destination().send(embed=pages[0], view=HelpPaginator(self.context.author, pages))
+
     async def send_bot_help(self, mapping):
-        embed = discord.Embed(title="Bot Commands", color=discord.Color.blue())
-        
-        for cog, commands in mapping.items():
-            if cog and commands:
-                command_list = [f"`{c.name}`" for c in commands if not c.hidden]
-                if command_list:
-                    cog_name = cog.qualified_name
-                    embed.add_field(name=cog_name, value=", ".join(command_list), inline=False)
-
-        embed.set_footer(text="Use !help <command> for more details about a command")
-        await self.get_destination().send(embed=embed)
+        # The embeds are prebuilt per permission tier, so mapping is not walked here
+        await self._send_pages(self.cog.pages_for(self.context.author))
+
+    async def send_cog_help(self, cog):
+        pages = self.cog.cog_pages_for(cog.qualified_name, self.context.author)
+        if pages is None:
+            await self.get_destination().send(self.command_not_found(cog.qualified_name))
+            return
+        await self._send_pages(pages)
 
     async def send_command_help(self, command):
         embed = discord.Embed(title=f"Command: {command.name}", color=discord.Color.blue())
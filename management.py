@@ -23,7 +23,7 @@ class Management(commands.Cog):
                 return
             
             await ctx.send(f"Channel {channel.name} created successfully!")
-            logger.info(f"Channel {channel.name} created by {ctx.author.name}")
+            logger.info("Channel %s created by %s", channel.name, ctx.author.name)
         except discord.Forbidden:
             await ctx.send("I don't have permission to create channels!")
 
@@ -34,7 +34,7 @@ class Management(commands.Cog):
         try:
             role = await ctx.guild.create_role(name=role_name, color=color)
             await ctx.send(f"Role {role.name} created successfully!")
-            logger.info(f"Role {role.name} created by {ctx.author.name}")
+            logger.info("Role %s created by %s", role.name, ctx.author.name)
         except discord.Forbidden:
             await ctx.send("I don't have permission to create roles!")
 
@@ -45,7 +45,7 @@ class Management(commands.Cog):
         try:
             await member.add_roles(role)
             await ctx.send(f"Role {role.name} assigned to {member.name}")
-            logger.info(f"Role {role.name} assigned to {member.name} by {ctx.author.name}")
+            logger.info("Role %s assigned to %s by %s", role.name, member.name, ctx.author.name)
         except discord.Forbidden:
             await ctx.send("I don't have permission to assign roles!")
 
@@ -3,6 +3,7 @@ from discord.ext import commands
 import logging
 from datetime import timedelta
 from utils.permissions import has_bot_manager_role
+from utils.audit_log import audit_log
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +11,11 @@ class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def timeout_member(self, member: discord.Member, minutes: int, moderator_id: int, reason=None):
+        """Time a member out and log it; shared by !timeout and the anti-raid cog"""
+        await member.timeout(timedelta(minutes=minutes), reason=reason)
+        audit_log.record(member.guild.id, 'timeout', moderator_id, member.id, reason=reason, details=f'{minutes} minutes')
+
     @commands.command()
     @commands.has_permissions(kick_members=True)
     @has_bot_manager_role(require_full_perms=True)  # Only BotManager 1 can use this
@@ -17,12 +23,13 @@ class Moderation(commands.Cog):
         """Kick a member from the server"""
         try:
             await member.kick(reason=reason)
+            audit_log.record(ctx.guild.id, 'kick', ctx.author.id, member.id, reason=reason)
             await ctx.send(f'{member.name} has been kicked. Reason: {reason or "No reason provided"}')
-            logger.info(f'{ctx.author} kicked {member} for reason: {reason}')
+            logger.info('%s kicked %s for reason: %s', ctx.author, member, reason)
         except discord.Forbidden:
             await ctx.send("I don't have permission to kick this member!")
         except Exception as e:
-            logger.error(f'Error kicking member: {e}')
+            logger.error('Error kicking member: %s', e)
             await ctx.send("An error occurred while trying to kick the member.")
 
     @commands.command()
@@ -32,12 +39,13 @@ class Moderation(commands.Cog):
         """Ban a member from the server"""
         try:
             await member.ban(reason=reason)
+            audit_log.record(ctx.guild.id, 'ban', ctx.author.id, member.id, reason=reason)
             await ctx.send(f'{member.name} has been banned. Reason: {reason or "No reason provided"}')
-            logger.info(f'{ctx.author} banned {member} for reason: {reason}')
+            logger.info('%s banned %s for reason: %s', ctx.author, member, reason)
         except discord.Forbidden:
             await ctx.send("I don't have permission to ban this member!")
         except Exception as e:
-            logger.error(f'Error banning member: {e}')
+            logger.error('Error banning member: %s', e)
             await ctx.send("An error occurred while trying to ban the member.")
 
     @commands.command()
@@ -46,14 +54,13 @@ class Moderation(commands.Cog):
     async def timeout(self, ctx, member: discord.Member, minutes: int, *, reason=None):
         """Timeout a member for specified minutes"""
         try:
-            duration = timedelta(minutes=minutes)
-            await member.timeout(duration, reason=reason)
+            await self.timeout_member(member, minutes, ctx.author.id, reason)
             await ctx.send(f'{member.name} has been timed out for {minutes} minutes. Reason: {reason or "No reason provided"}')
-            logger.info(f'{ctx.author} timed out {member} for {minutes} minutes. Reason: {reason}')
+            logger.info('%s timed out %s for %s minutes. Reason: %s', ctx.author, member, minutes, reason)
         except discord.Forbidden:
             await ctx.send("I don't have permission to timeout this member!")
         except Exception as e:
-            logger.error(f'Error timing out member: {e}')
+            logger.error('Error timing out member: %s', e)
             await ctx.send("An error occurred while trying to timeout the member.")
 
 async def setup(bot):
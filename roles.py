@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 import logging
 from utils.permissions import has_bot_manager_role
+from utils.audit_log import audit_log
 
 logger = logging.getLogger(__name__)
 
@@ -16,11 +17,11 @@ class Roles(commands.Cog):
         try:
             role = await ctx.guild.create_role(name=role_name)
             await ctx.send(f'Role {role.name} has been created!')
-            logger.info(f'{ctx.author} created role {role_name}')
+            logger.info('%s created role %s', ctx.author, role_name)
         except discord.Forbidden:
             await ctx.send("I don't have permission to create roles!")
         except Exception as e:
-            logger.error(f'Error creating role: {e}')
+            logger.error('Error creating role: %s', e)
             await ctx.send("An error occurred while creating the role.")
 
     @commands.command()
@@ -35,12 +36,13 @@ class Roles(commands.Cog):
                 return
 
             await member.add_roles(role)
+            audit_log.record(ctx.guild.id, 'assign_role', ctx.author.id, member.id, details=f'role {role.id} ({role.name})')
             await ctx.send(f'Role {role.name} has been assigned to {member.name}!')
-            logger.info(f'{ctx.author} assigned role {role.name} to {member.name}')
+            logger.info('%s assigned role %s to %s', ctx.author, role.name, member.name)
         except discord.Forbidden:
             await ctx.send("I don't have permission to assign roles!")
         except Exception as e:
-            logger.error(f'Error assigning role: {e}')
+            logger.error('Error assigning role: %s', e)
             await ctx.send("An error occurred while assigning the role.")
 
     @commands.command()
@@ -55,12 +57,13 @@ class Roles(commands.Cog):
                 return
 
             await member.remove_roles(role)
+            audit_log.record(ctx.guild.id, 'remove_role', ctx.author.id, member.id, details=f'role {role.id} ({role.name})')
             await ctx.send(f'Role {role.name} has been removed from {member.name}!')
-            logger.info(f'{ctx.author} removed role {role.name} from {member.name}')
+            logger.info('%s removed role %s from %s', ctx.author, role.name, member.name)
         except discord.Forbidden:
             await ctx.send("I don't have permission to remove roles!")
         except Exception as e:
-            logger.error(f'Error removing role: {e}')
+            logger.error('Error removing role: %s', e)
             await ctx.send("An error occurred while removing the role.")
 
 async def setup(bot):
@@ -5,6 +5,7 @@ import logging
 from datetime import datetime
 from utils.permissions import has_bot_manager_role
 from utils.embeds import create_embed, create_error_embed
+from utils.cooldowns import cooldowns
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +24,9 @@ class TicketView(discord.ui.View):
             await interaction.response.send_message("🔒 Closing ticket in 5 seconds...")
             await channel.send("Ticket closed by " + interaction.user.mention)
             await channel.edit(archived=True)
-            logger.info(f'Ticket {channel.name} closed by {interaction.user}')
+            logger.info('Ticket %s closed by %s', channel.name, interaction.user)
         except Exception as e:
-            logger.error(f'Error closing ticket: {str(e)}')
+            logger.error('Error closing ticket: %s', e)
             await interaction.response.send_message("❌ An error occurred while closing the ticket.", ephemeral=True)
 
 class Tickets(commands.Cog):
@@ -37,6 +38,7 @@ class Tickets(commands.Cog):
     @app_commands.command(name="ticket", description="Create a support ticket")
     async def create_ticket(self, interaction: discord.Interaction, reason: str):
         """Create a support ticket"""
+        created = False
         try:
             # Get or create ticket category
             category = discord.utils.get(interaction.guild.categories, name="Tickets")
@@ -85,17 +87,22 @@ class Tickets(commands.Cog):
             embed.set_footer(text=f"User ID: {interaction.user.id}")
 
             await channel.send(embed=embed, view=self.ticket_view)
+            created = True
             await interaction.response.send_message(
                 f"✅ Ticket created! Check {channel.mention}",
                 ephemeral=True
             )
-            logger.info(f'Ticket created by {interaction.user} for reason: {reason}')
+            logger.info('Ticket created by %s for reason: %s', interaction.user, reason)
         except Exception as e:
-            logger.error(f'Error creating ticket: {str(e)}')
+            logger.error('Error creating ticket: %s', e)
             await interaction.response.send_message(
                 "❌ An error occurred while creating the ticket.",
                 ephemeral=True
             )
+        finally:
+            # Turned away or failed before a ticket existed; don't count it against the cooldown
+            if not created:
+                cooldowns.refund_interaction(interaction)
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
@@ -122,9 +129,9 @@ class Tickets(commands.Cog):
 
             category = await ctx.guild.create_category("Tickets", overwrites=overwrites)
             await ctx.send("✅ Tickets category created successfully!")
-            logger.info(f'Tickets category created by {ctx.author}')
+            logger.info('Tickets category created by %s', ctx.author)
         except Exception as e:
-            logger.error(f'Error setting up tickets: {str(e)}')
+            logger.error('Error setting up tickets: %s', e)
             await ctx.send("❌ An error occurred while setting up the ticket system.")
 
 async def setup(bot):
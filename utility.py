@@ -1,14 +1,325 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
 import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple, Union
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text, UniqueConstraint
+from utils.database import db
+from models import Base
 from utils.permissions import has_bot_manager_role
 from utils.embeds import create_embed, create_error_embed
 
 logger = logging.getLogger(__name__)
 
+EMBED_COLORS = {
+    'blue': discord.Color.blue(),
+    'red': discord.Color.red(),
+    'green': discord.Color.green(),
+    'gold': discord.Color.gold(),
+    'purple': discord.Color.purple()
+}
+
+# Sends in flight at once during a broadcast. Every channel has its own rate limit
+# bucket, which discord.py already waits on; this keeps a large fan-out well under
+# the global per-bot limit instead of firing every request at the same moment.
+BROADCAST_CONCURRENCY = 5
+MAX_BROADCAST_CHANNELS = 50
+MAX_SCHEDULES_PER_GUILD = 25
+MIN_REPEAT_INTERVAL = timedelta(minutes=10)
+SCHEDULE_POLL_SECONDS = 30
+TEMPLATE_PREFIX = 'template:'
+DURATION_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+BroadcastTarget = Union[discord.TextChannel, discord.CategoryChannel]
+
+class EmbedTemplate(Base):
+    __tablename__ = 'embed_templates'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    name = Column(String(32), nullable=False)
+    title = Column(String(256), nullable=False)
+    description = Column(Text, nullable=False)
+    color = Column(String(16), nullable=False, default='blue')
+    created_by = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('guild_id', 'name', name='uq_embed_templates_guild_name'),
+    )
+
+    def to_embed_dict(self) -> dict:
+        embed = discord.Embed(
+            title=self.title,
+            description=self.description,
+            color=EMBED_COLORS.get(self.color, discord.Color.blue())
+        )
+        return embed.to_dict()
+
+class ScheduledAnnouncement(Base):
+    __tablename__ = 'scheduled_announcements'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    # Comma-separated channel IDs, already expanded from any categories
+    channel_ids = Column(Text, nullable=False)
+    # Plain text, or "template:<name>" resolved when it is sent
+    message = Column(Text, nullable=False)
+    next_run_at = Column(DateTime, nullable=False)
+    interval_seconds = Column(Integer)
+    active = Column(Boolean, nullable=False, default=True)
+    created_by = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_scheduled_announcements_active_next_run', 'active', 'next_run_at'),
+        Index('ix_scheduled_announcements_guild_active', 'guild_id', 'active'),
+    )
+
+class Duration(commands.Converter):
+    """Parses durations like 30m, 2h, 1d or 1w into a timedelta"""
+
+    async def convert(self, ctx, argument: str) -> timedelta:
+        match = re.fullmatch(r'(\d+)([mhdw])', argument.lower())
+        if not match or int(match.group(1)) == 0:
+            raise commands.BadArgument(f"`{argument}` is not a duration. Use something like 30m, 2h, 1d or 1w.")
+        return timedelta(seconds=int(match.group(1)) * DURATION_UNITS[match.group(2)])
+
+def format_interval(seconds: int) -> str:
+    for unit in ('w', 'd', 'h', 'm'):
+        if seconds % DURATION_UNITS[unit] == 0:
+            return f"{seconds // DURATION_UNITS[unit]}{unit}"
+    return f"{seconds}s"
+
+def expand_targets(targets: List[BroadcastTarget]) -> List[discord.TextChannel]:
+    """Flatten channels and categories into a de-duplicated list of text channels, in order"""
+    channels: Dict[int, discord.TextChannel] = {}
+    for target in targets:
+        if isinstance(target, discord.CategoryChannel):
+            for channel in target.text_channels:
+                channels.setdefault(channel.id, channel)
+        else:
+            channels.setdefault(target.id, target)
+    return list(channels.values())
+
+def load_templates(guild_id: int) -> Dict[str, dict]:
+    session = db.get_session()
+    try:
+        templates = session.query(EmbedTemplate).filter_by(guild_id=str(guild_id)).all()
+        return {template.name: template.to_embed_dict() for template in templates}
+    finally:
+        session.close()
+
+def save_template(guild_id: int, name: str, title: str, description: str, color: str, author_id: int) -> dict:
+    session = db.get_session()
+    try:
+        template = session.query(EmbedTemplate).filter_by(guild_id=str(guild_id), name=name).first()
+        if template is None:
+            template = EmbedTemplate(guild_id=str(guild_id), name=name)
+            session.add(template)
+        template.title = title
+        template.description = description
+        template.color = color
+        template.created_by = str(author_id)
+        session.commit()
+        return template.to_embed_dict()
+    finally:
+        session.close()
+
+def delete_template(guild_id: int, name: str) -> bool:
+    session = db.get_session()
+    try:
+        deleted = session.query(EmbedTemplate).filter_by(guild_id=str(guild_id), name=name).delete()
+        session.commit()
+        return deleted > 0
+    finally:
+        session.close()
+
+def add_schedule(guild_id: int, channel_ids: List[int], message: str, first_run: datetime,
+                 interval: Optional[timedelta], author_id: int) -> Optional[int]:
+    """Store a new announcement; returns its ID, or None if the guild is at its limit"""
+    session = db.get_session()
+    try:
+        count = session.query(ScheduledAnnouncement).filter_by(guild_id=str(guild_id), active=True).count()
+        if count >= MAX_SCHEDULES_PER_GUILD:
+            return None
+        announcement = ScheduledAnnouncement(
+            guild_id=str(guild_id),
+            channel_ids=",".join(str(channel_id) for channel_id in channel_ids),
+            message=message,
+            next_run_at=first_run,
+            interval_seconds=int(interval.total_seconds()) if interval else None,
+            created_by=str(author_id)
+        )
+        session.add(announcement)
+        session.commit()
+        return announcement.id
+    finally:
+        session.close()
+
+def list_schedules(guild_id: int) -> List[Tuple[int, str, str, datetime, Optional[int]]]:
+    session = db.get_session()
+    try:
+        rows = session.query(ScheduledAnnouncement).filter_by(
+            guild_id=str(guild_id), active=True
+        ).order_by(ScheduledAnnouncement.next_run_at.asc()).all()
+        return [(a.id, a.channel_ids, a.message, a.next_run_at, a.interval_seconds) for a in rows]
+    finally:
+        session.close()
+
+def cancel_schedule(guild_id: int, announcement_id: int) -> bool:
+    session = db.get_session()
+    try:
+        updated = session.query(ScheduledAnnouncement).filter_by(
+            id=announcement_id, guild_id=str(guild_id), active=True
+        ).update({'active': False})
+        session.commit()
+        return updated > 0
+    finally:
+        session.close()
+
+def claim_due_announcements(now: datetime, guild_ids: Set[int]) -> List[Tuple[int, str, str, str]]:
+    """Return this process's due announcements and move them on before they are sent.
+
+    Only announcements for ``guild_ids`` (the guilds this process serves) are
+    claimed, so each cluster worker sends just its own. Each claim is a
+    conditional UPDATE on the ``next_run_at`` that was read, so if two
+    processes race for the same run only one of them gets it.
+
+    Advancing first means a crash mid-send skips that run instead of repeating
+    it on every restart. Recurring announcements that were missed while the bot
+    was down fire once and then continue on their interval.
+    """
+    session = db.get_session()
+    try:
+        due = session.query(
+            ScheduledAnnouncement.id, ScheduledAnnouncement.guild_id, ScheduledAnnouncement.channel_ids,
+            ScheduledAnnouncement.message, ScheduledAnnouncement.next_run_at, ScheduledAnnouncement.interval_seconds
+        ).filter(
+            ScheduledAnnouncement.active.is_(True),
+            ScheduledAnnouncement.next_run_at <= now
+        ).order_by(ScheduledAnnouncement.next_run_at.asc()).all()
+        claimed = []
+        for announcement_id, guild_id, channel_ids, message, next_run_at, interval_seconds in due:
+            if int(guild_id) not in guild_ids:
+                continue
+            if interval_seconds:
+                interval = timedelta(seconds=interval_seconds)
+                next_run = next_run_at
+                while next_run <= now:
+                    next_run += interval
+                changes = {ScheduledAnnouncement.next_run_at: next_run}
+            else:
+                changes = {ScheduledAnnouncement.active: False}
+            won = session.query(ScheduledAnnouncement).filter(
+                ScheduledAnnouncement.id == announcement_id,
+                ScheduledAnnouncement.active.is_(True),
+                ScheduledAnnouncement.next_run_at == next_run_at
+            ).update(changes, synchronize_session=False)
+            if won:
+                claimed.append((announcement_id, guild_id, channel_ids, message))
+        session.commit()
+        return claimed
+    finally:
+        session.close()
+
 class Utility(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # guild_id -> template name -> embed dict; filled from the database on first use
+        self.templates: Dict[int, Dict[str, dict]] = {}
+
+    async def cog_load(self):
+        try:
+            await asyncio.to_thread(
+                Base.metadata.create_all, db.engine,
+                tables=[EmbedTemplate.__table__, ScheduledAnnouncement.__table__]
+            )
+        except Exception as e:
+            logger.error('Error creating announcement tables: %s', e)
+        self.run_schedules.start()
+
+    async def cog_unload(self):
+        self.run_schedules.cancel()
+
+    async def get_templates(self, guild_id: int) -> Dict[str, dict]:
+        templates = self.templates.get(guild_id)
+        if templates is None:
+            templates = await asyncio.to_thread(load_templates, guild_id)
+            self.templates[guild_id] = templates
+        return templates
+
+    async def resolve_message(self, guild_id: int, message: str) -> Optional[Tuple[Optional[str], Optional[discord.Embed]]]:
+        """Turn a message argument into (content, embed); None if it names a missing template"""
+        if not message.lower().startswith(TEMPLATE_PREFIX):
+            return message, None
+        name = message[len(TEMPLATE_PREFIX):].strip().lower()
+        data = (await self.get_templates(guild_id)).get(name)
+        if data is None:
+            return None
+        return None, discord.Embed.from_dict(data)
+
+    async def fan_out(self, channels: List[discord.TextChannel], content: Optional[str] = None,
+                        embed: Optional[discord.Embed] = None) -> List[Tuple[discord.TextChannel, str]]:
+        """Send to every channel concurrently; returns the channels that failed and why"""
+        semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+
+        async def send(channel: discord.TextChannel) -> Optional[str]:
+            async with semaphore:
+                try:
+                    await channel.send(content=content, embed=embed)
+                    return None
+                except discord.Forbidden:
+                    return "missing permissions"
+                except discord.HTTPException as e:
+                    return f"HTTP {e.status}"
+
+        results = await asyncio.gather(*(send(channel) for channel in channels))
+        return [(channel, error) for channel, error in zip(channels, results) if error]
+
+    @tasks.loop(seconds=SCHEDULE_POLL_SECONDS)
+    async def run_schedules(self):
+        try:
+            guild_ids = {guild.id for guild in self.bot.guilds}
+            due = await asyncio.to_thread(claim_due_announcements, datetime.utcnow(), guild_ids)
+        except Exception as e:
+            logger.error('Error loading scheduled announcements: %s', e)
+            return
+        for announcement_id, guild_id, channel_ids, message in due:
+            try:
+                await self._deliver(announcement_id, int(guild_id), channel_ids, message)
+            except Exception as e:
+                logger.error('Error sending scheduled announcement %s: %s', announcement_id, e)
+
+    @run_schedules.before_loop
+    async def before_run_schedules(self):
+        await self.bot.wait_until_ready()
+
+    async def _deliver(self, announcement_id: int, guild_id: int, channel_ids: str, message: str):
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        channels = [guild.get_channel(int(channel_id)) for channel_id in channel_ids.split(",")]
+        channels = [channel for channel in channels if isinstance(channel, discord.TextChannel)]
+        resolved = await self.resolve_message(guild_id, message)
+        if resolved is None:
+            logger.warning('Scheduled announcement %s uses a template that no longer exists', announcement_id)
+            return
+        failed = await self.fan_out(channels, *resolved)
+        logger.info('Sent scheduled announcement %s to %s channels (%s failed)',
+                    announcement_id, len(channels) - len(failed), len(failed))
+
+    async def _check_targets(self, ctx, targets: List[BroadcastTarget]) -> Optional[List[discord.TextChannel]]:
+        channels = expand_targets(targets)
+        if not channels:
+            await ctx.send("❌ Mention at least one text channel or category!")
+            return None
+        if len(channels) > MAX_BROADCAST_CHANNELS:
+            await ctx.send(f"❌ You can only broadcast to {MAX_BROADCAST_CHANNELS} channels at once!")
+            return None
+        return channels
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
@@ -18,11 +329,11 @@ class Utility(commands.Cog):
         try:
             await channel.send(message)
             await ctx.message.add_reaction('✅')
-            logger.info(f'{ctx.author} used say command in {channel.name}')
+            logger.info('%s used say command in %s', ctx.author, channel.name)
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to send messages in that channel!")
         except Exception as e:
-            logger.error(f'Error in say command: {str(e)}')
+            logger.error('Error in say command: %s', e)
             await ctx.send("❌ An error occurred while sending the message.")
 
     @commands.command()
@@ -42,11 +353,11 @@ class Utility(commands.Cog):
             
             await channel.send(embed=embed)
             await ctx.message.add_reaction('✅')
-            logger.info(f'{ctx.author} created an embed in {channel.name}')
+            logger.info('%s created an embed in %s', ctx.author, channel.name)
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to send messages in that channel!")
         except Exception as e:
-            logger.error(f'Error creating embed: {str(e)}')
+            logger.error('Error creating embed: %s', e)
             await ctx.send("❌ An error occurred while creating the embed.")
 
     @commands.command()
@@ -57,16 +368,7 @@ class Utility(commands.Cog):
         Usage: !embedcolor #channel blue "Title" Description text here
         Available colors: blue, red, green, gold, purple"""
         try:
-            # Convert color string to discord.Color
-            colors = {
-                'blue': discord.Color.blue(),
-                'red': discord.Color.red(),
-                'green': discord.Color.green(),
-                'gold': discord.Color.gold(),
-                'purple': discord.Color.purple()
-            }
-            
-            embed_color = colors.get(color.lower(), discord.Color.blue())
+            embed_color = EMBED_COLORS.get(color.lower(), discord.Color.blue())
             
             # Create and send the embed
             embed = discord.Embed(
@@ -78,12 +380,199 @@ class Utility(commands.Cog):
             
             await channel.send(embed=embed)
             await ctx.message.add_reaction('✅')
-            logger.info(f'{ctx.author} created a {color} embed in {channel.name}')
+            logger.info('%s created a %s embed in %s', ctx.author, color, channel.name)
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to send messages in that channel!")
         except Exception as e:
-            logger.error(f'Error creating colored embed: {str(e)}')
+            logger.error('Error creating colored embed: %s', e)
             await ctx.send("❌ An error occurred while creating the embed.")
 
+    @commands.command(name="broadcast")
+    @commands.has_permissions(manage_messages=True)
+    @has_bot_manager_role(require_full_perms=True)  # Only BotManager 1 can use this
+    async def broadcast_message(self, ctx, targets: commands.Greedy[BroadcastTarget], *, message: str):
+        """Send a message or embed template to several channels or whole categories
+        Usage: !broadcast #news #general "Category Name" Message text here
+        Use template:<name> as the message to send a saved embed template"""
+        channels = await self._check_targets(ctx, targets)
+        if channels is None:
+            return
+        try:
+            resolved = await self.resolve_message(ctx.guild.id, message)
+            if resolved is None:
+                await ctx.send("❌ No embed template with that name! Use `!template list` to see them.")
+                return
+            failed = await self.fan_out(channels, *resolved)
+            if failed:
+                await ctx.send(
+                    embed=create_error_embed(
+                        "Broadcast Incomplete",
+                        f"Sent to {len(channels) - len(failed)}/{len(channels)} channels. Failed:\n" +
+                        "\n".join(f"{channel.mention}: {error}" for channel, error in failed)
+                    )
+                )
+            else:
+                await ctx.message.add_reaction('✅')
+            logger.info('%s broadcast to %s channels (%s failed)', ctx.author, len(channels), len(failed))
+        except Exception as e:
+            logger.error('Error broadcasting: %s', e)
+            await ctx.send("❌ An error occurred while broadcasting the message.")
+
+    @commands.group(invoke_without_command=True)
+    @commands.has_permissions(manage_messages=True)
+    @has_bot_manager_role(require_full_perms=True)  # Only BotManager 1 can use this
+    async def template(self, ctx):
+        """Manage reusable embed templates
+        Usage: !template save|list|show|delete"""
+        await ctx.send_help(ctx.command)
+
+    @template.command(name="save")
+    async def template_save(self, ctx, name: str, color: str, title: str, *, description: str):
+        """Save an embed template, replacing any with the same name
+        Usage: !template save welcome blue "Title" Description text here"""
+        name = name.lower()
+        color = color.lower()
+        if len(name) > 32:
+            await ctx.send("❌ Template names can be at most 32 characters!")
+            return
+        if color not in EMBED_COLORS:
+            await ctx.send(f"❌ Color must be one of: {', '.join(EMBED_COLORS)}")
+            return
+        try:
+            data = await asyncio.to_thread(save_template, ctx.guild.id, name, title, description, color, ctx.author.id)
+            templates = self.templates.get(ctx.guild.id)
+            if templates is not None:
+                templates[name] = data
+            await ctx.send(
+                embed=create_embed(
+                    "Template Saved",
+                    f"Send it with `!broadcast #channel {TEMPLATE_PREFIX}{name}`",
+                    discord.Color.green()
+                )
+            )
+            logger.info('%s saved embed template %s', ctx.author, name)
+        except Exception as e:
+            logger.error('Error saving embed template: %s', e)
+            await ctx.send("❌ An error occurred while saving the template.")
+
+    @template.command(name="list")
+    async def template_list(self, ctx):
+        """List this server's embed templates"""
+        try:
+            templates = await self.get_templates(ctx.guild.id)
+            description = "\n".join(f"`{name}` — {data.get('title', '')}" for name, data in sorted(templates.items()))
+            await ctx.send(embed=create_embed("Embed Templates", description or "No templates saved yet.", discord.Color.blue()))
+        except Exception as e:
+            logger.error('Error listing embed templates: %s', e)
+            await ctx.send("❌ An error occurred while listing the templates.")
+
+    @template.command(name="show")
+    async def template_show(self, ctx, name: str):
+        """Preview an embed template in this channel"""
+        data = (await self.get_templates(ctx.guild.id)).get(name.lower())
+        if data is None:
+            await ctx.send("❌ No embed template with that name!")
+            return
+        await ctx.send(embed=discord.Embed.from_dict(data))
+
+    @template.command(name="delete")
+    async def template_delete(self, ctx, name: str):
+        """Delete an embed template"""
+        name = name.lower()
+        try:
+            if not await asyncio.to_thread(delete_template, ctx.guild.id, name):
+                await ctx.send("❌ No embed template with that name!")
+                return
+            self.templates.get(ctx.guild.id, {}).pop(name, None)
+            await ctx.message.add_reaction('✅')
+            logger.info('%s deleted embed template %s', ctx.author, name)
+        except Exception as e:
+            logger.error('Error deleting embed template: %s', e)
+            await ctx.send("❌ An error occurred while deleting the template.")
+
+    @commands.group(invoke_without_command=True)
+    @commands.has_permissions(manage_messages=True)
+    @has_bot_manager_role(require_full_perms=True)  # Only BotManager 1 can use this
+    async def schedule(self, ctx):
+        """Schedule one-off or recurring announcements
+        Usage: !schedule once|every|list|cancel"""
+        await ctx.send_help(ctx.command)
+
+    async def _schedule(self, ctx, delay: timedelta, interval: Optional[timedelta],
+                        targets: List[BroadcastTarget], message: str):
+        channels = await self._check_targets(ctx, targets)
+        if channels is None:
+            return
+        if await self.resolve_message(ctx.guild.id, message) is None:
+            await ctx.send("❌ No embed template with that name! Use `!template list` to see them.")
+            return
+        try:
+            first_run = datetime.utcnow() + delay
+            announcement_id = await asyncio.to_thread(
+                add_schedule, ctx.guild.id, [channel.id for channel in channels], message, first_run, interval, ctx.author.id
+            )
+            if announcement_id is None:
+                await ctx.send(f"❌ This server already has {MAX_SCHEDULES_PER_GUILD} scheduled announcements!")
+                return
+            repeat = f", then every {format_interval(int(interval.total_seconds()))}" if interval else ""
+            await ctx.send(
+                embed=create_embed(
+                    "Announcement Scheduled",
+                    f"Announcement #{announcement_id} goes out to {len(channels)} channel(s) "
+                    f"{discord.utils.format_dt(first_run.replace(tzinfo=timezone.utc), 'R')}{repeat}.",
+                    discord.Color.green()
+                )
+            )
+            logger.info('%s scheduled announcement %s', ctx.author, announcement_id)
+        except Exception as e:
+            logger.error('Error scheduling announcement: %s', e)
+            await ctx.send("❌ An error occurred while scheduling the announcement.")
+
+    @schedule.command(name="once")
+    async def schedule_once(self, ctx, delay: Duration, targets: commands.Greedy[BroadcastTarget], *, message: str):
+        """Send an announcement once after a delay
+        Usage: !schedule once 2h #news Message text or template:<name>"""
+        await self._schedule(ctx, delay, None, targets, message)
+
+    @schedule.command(name="every")
+    async def schedule_every(self, ctx, interval: Duration, targets: commands.Greedy[BroadcastTarget], *, message: str):
+        """Repeat an announcement on an interval, starting one interval from now
+        Usage: !schedule every 1d #news Message text or template:<name>"""
+        if interval < MIN_REPEAT_INTERVAL:
+            await ctx.send(f"❌ Recurring announcements must be at least {format_interval(int(MIN_REPEAT_INTERVAL.total_seconds()))} apart!")
+            return
+        await self._schedule(ctx, interval, interval, targets, message)
+
+    @schedule.command(name="list")
+    async def schedule_list(self, ctx):
+        """List this server's upcoming announcements"""
+        try:
+            rows = await asyncio.to_thread(list_schedules, ctx.guild.id)
+            lines = []
+            for announcement_id, channel_ids, message, next_run_at, interval_seconds in rows:
+                repeat = f" every {format_interval(interval_seconds)}" if interval_seconds else ""
+                preview = message if len(message) <= 40 else message[:37] + "..."
+                lines.append(
+                    f"**#{announcement_id}** {next_run_at:%Y-%m-%d %H:%M} UTC{repeat} → "
+                    f"{len(channel_ids.split(','))} channel(s): {preview}"
+                )
+            await ctx.send(embed=create_embed("Scheduled Announcements", "\n".join(lines) or "Nothing scheduled.", discord.Color.blue()))
+        except Exception as e:
+            logger.error('Error listing scheduled announcements: %s', e)
+            await ctx.send("❌ An error occurred while listing the announcements.")
+
+    @schedule.command(name="cancel")
+    async def schedule_cancel(self, ctx, announcement_id: int):
+        """Cancel a scheduled announcement"""
+        try:
+            if not await asyncio.to_thread(cancel_schedule, ctx.guild.id, announcement_id):
+                await ctx.send("❌ No scheduled announcement with that ID!")
+                return
+            await ctx.message.add_reaction('✅')
+            logger.info('%s cancelled announcement %s', ctx.author, announcement_id)
+        except Exception as e:
+            logger.error('Error cancelling announcement: %s', e)
+            await ctx.send("❌ An error occurred while cancelling the announcement.")
+
 async def setup(bot):
     await bot.add_cog(Utility(bot))
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import Column, DateTime, Index, Integer, String, UniqueConstraint, func
+from utils.database import db
+from models import Base
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = 'messages'
+JOINS = 'joins'
+LEAVES = 'leaves'
+COMMANDS = 'commands'
+
+
+class ActivityRollup(Base):
+    """One row per guild, hour, kind and key (a channel ID, command name, or '' for joins/leaves)"""
+    __tablename__ = 'activity_rollups'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    bucket = Column(DateTime, nullable=False)
+    kind = Column(String(16), nullable=False)
+    key = Column(String(100), nullable=False, default='')
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('guild_id', 'bucket', 'kind', 'key', name='uq_activity_rollups_guild_bucket_kind_key'),
+        Index('ix_activity_rollups_guild_kind_bucket', 'guild_id', 'kind', 'bucket'),
+    )
+
+
+def _upsert_statement(dialect: str):
+    """An INSERT that adds to ``count`` on conflict, for dialects that support one"""
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    table = ActivityRollup.__table__
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=['guild_id', 'bucket', 'kind', 'key'],
+        set_={'count': table.c.count + stmt.excluded['count']}
+    )
+
+
+class ActivityTracker:
+    """Counts activity per guild and hour in memory and upserts it in batches.
+
+    Each event is a single Counter increment keyed by small tuples, so the
+    message hot path never touches the database. ``flush`` swaps the counter
+    out and writes one row per (guild, hour, kind, key) that changed.
+    """
+
+    def __init__(self, retention_days: int = 90):
+        self.retention_days = retention_days
+        # (guild_id, hour since epoch, kind, key) -> count
+        self._counts: Counter = Counter()
+        self._flush_lock = asyncio.Lock()
+
+    @staticmethod
+    def create_tables():
+        Base.metadata.create_all(db.engine, tables=[ActivityRollup.__table__])
+
+    @property
+    def pending(self) -> int:
+        return len(self._counts)
+
+    def incr(self, guild_id: int, kind: str, key: str = ''):
+        self._counts[(guild_id, int(time.time() // 3600), kind, key)] += 1
+
+    async def flush(self) -> int:
+        """Write the buffered counts; returns how many rollup rows were touched"""
+        async with self._flush_lock:
+            if not self._counts:
+                return 0
+            batch, self._counts = self._counts, Counter()
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                return len(batch)
+            except Exception as e:
+                # Fold the batch back in so the next flush retries it
+                self._counts.update(batch)
+                logger.error('Error writing %s activity rollups: %s', len(batch), e)
+                return 0
+
+    def _write_batch(self, batch: Counter):
+        rows = [
+            {'guild_id': str(guild_id), 'bucket': datetime.utcfromtimestamp(hour * 3600),
+             'kind': kind, 'key': key, 'count': count}
+            for (guild_id, hour, kind, key), count in batch.items()
+        ]
+        session = db.get_session()
+        try:
+            stmt = _upsert_statement(db.engine.dialect.name)
+            if stmt is not None:
+                session.execute(stmt, rows)
+            else:
+                self._merge_rows(session, rows)
+            session.commit()
+            logger.info('Wrote %s activity rollups', len(rows))
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _merge_rows(session, rows: List[dict]):
+        """Read-modify-write fallback for databases without ON CONFLICT"""
+        guild_ids = {row['guild_id'] for row in rows}
+        buckets = {row['bucket'] for row in rows}
+        existing = {
+            (r.guild_id, r.bucket, r.kind, r.key): r
+            for r in session.query(ActivityRollup).filter(
+                ActivityRollup.guild_id.in_(guild_ids), ActivityRollup.bucket.in_(buckets)
+            )
+        }
+        for row in rows:
+            current = existing.get((row['guild_id'], row['bucket'], row['kind'], row['key']))
+            if current is None:
+                session.add(ActivityRollup(**row))
+            else:
+                current.count += row['count']
+
+    def prune(self) -> int:
+        """Delete rollups older than ``retention_days``; run from a thread"""
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        session = db.get_session()
+        try:
+            deleted = session.query(ActivityRollup).filter(ActivityRollup.bucket < cutoff).delete()
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    async def summary(self, guild_id: int, days: int, top: int = 5) -> Dict[str, object]:
+        await self.flush()
+        return await asyncio.to_thread(self._query_summary, str(guild_id), days, top)
+
+    def _query_summary(self, guild_id: str, days: int, top: int) -> Dict[str, object]:
+        since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=days)
+        session = db.get_session()
+        try:
+            base = session.query(ActivityRollup).filter(
+                ActivityRollup.guild_id == guild_id, ActivityRollup.bucket >= since
+            )
+
+            def totals_by_key(kind: str) -> List[Tuple[str, int]]:
+                total = func.sum(ActivityRollup.count)
+                return [
+                    (key, int(count)) for key, count in
+                    base.filter(ActivityRollup.kind == kind).with_entities(ActivityRollup.key, total)
+                    .group_by(ActivityRollup.key).order_by(total.desc()).limit(top)
+                ]
+
+            hourly = [0] * 24
+            for bucket, count in base.filter(ActivityRollup.kind == MESSAGES).with_entities(
+                ActivityRollup.bucket, func.sum(ActivityRollup.count)
+            ).group_by(ActivityRollup.bucket):
+                hourly[bucket.hour] += int(count)
+
+            def total(kind: str) -> int:
+                return int(base.filter(ActivityRollup.kind == kind).with_entities(
+                    func.coalesce(func.sum(ActivityRollup.count), 0)
+                ).scalar())
+
+            return {
+                'messages': sum(hourly),
+                'hourly': hourly,
+                'channels': totals_by_key(MESSAGES),
+                'commands': totals_by_key(COMMANDS),
+                'joins': total(JOINS),
+                'leaves': total(LEAVES),
+            }
+        finally:
+            session.close()
+
+
+activity = ActivityTracker()
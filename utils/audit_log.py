@@ -0,0 +1,164 @@
+import asyncio
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import List, Optional, Set
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from utils.database import db
+from models import Base
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('kick', 'ban', 'timeout', 'lock', 'unlock', 'set_permissions', 'assign_role', 'remove_role',
+           'raid_start', 'raid_end')
+AUDIT_DROPPED = registry.counter(
+    'bot_audit_actions_dropped_total', 'Moderation actions discarded because the write buffer was full'
+)
+
+EXPORT_COLUMNS = ('id', 'created_at', 'action', 'moderator_id', 'target_type', 'target_id', 'reason', 'details')
+
+
+class ModerationAction(Base):
+    __tablename__ = 'moderation_actions'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    action = Column(String(32), nullable=False)
+    moderator_id = Column(String, nullable=False)
+    target_type = Column(String(16), nullable=False, default='member')
+    target_id = Column(String, nullable=False)
+    reason = Column(Text)
+    details = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_moderation_actions_guild_target_created', 'guild_id', 'target_id', 'created_at'),
+        Index('ix_moderation_actions_guild_moderator_created', 'guild_id', 'moderator_id', 'created_at'),
+        Index('ix_moderation_actions_guild_action_created', 'guild_id', 'action', 'created_at'),
+    )
+
+
+class AuditLog:
+    """Write-behind log of moderation actions.
+
+    ``record`` only appends to an in-memory buffer, so moderation commands
+    don't wait on the database. The buffer is written as one bulk insert when
+    it reaches ``batch_size``, when the owning cog's timer fires, and when the
+    cog unloads on shutdown. Reads flush first so they always see every action.
+    """
+
+    def __init__(self, batch_size: int = 100, page_size: int = 15, export_limit: int = 10000,
+                 max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.export_limit = export_limit
+        # Bounds the buffer while the database is unreachable; the oldest actions go first
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def create_tables():
+        Base.metadata.create_all(db.engine, tables=[ModerationAction.__table__])
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, guild_id: int, action: str, moderator_id: int, target_id: int, target_type: str = 'member',
+               reason: Optional[str] = None, details: Optional[str] = None):
+        """Buffer an action; starts a flush in the background once the batch is full"""
+        self._pending.append({
+            'guild_id': str(guild_id),
+            'action': action,
+            'moderator_id': str(moderator_id),
+            'target_type': target_type,
+            'target_id': str(target_id),
+            'reason': reason,
+            'details': details,
+            'created_at': datetime.utcnow(),
+        })
+        self._trim()
+        # One background flush at a time; while it runs, new actions wait for the next one
+        if len(self._pending) >= self.batch_size and not self._flush_tasks:
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    def _trim(self):
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            AUDIT_DROPPED.inc(amount=overflow)
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns how many actions were written"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                return len(batch)
+            except Exception as e:
+                # Put the batch back so the next flush retries it
+                self._pending[:0] = batch
+                self._trim()
+                logger.error('Error writing %s moderation actions: %s', len(batch), e)
+                return 0
+
+    def _write_batch(self, batch: List[dict]):
+        session = db.get_session()
+        try:
+            session.bulk_insert_mappings(ModerationAction, batch)
+            session.commit()
+            logger.info('Wrote %s moderation actions', len(batch))
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def search(self, guild_id: int, target_id: Optional[int] = None, moderator_id: Optional[int] = None,
+                     action: Optional[str] = None, limit: Optional[int] = None) -> List[ModerationAction]:
+        """Newest actions first, filtered on any of the indexed columns"""
+        await self.flush()
+        return await asyncio.to_thread(
+            self._query, str(guild_id), target_id, moderator_id, action, limit or self.page_size
+        )
+
+    def _query(self, guild_id: str, target_id: Optional[int], moderator_id: Optional[int],
+               action: Optional[str], limit: int) -> List[ModerationAction]:
+        session = db.get_session()
+        try:
+            query = session.query(ModerationAction).filter_by(guild_id=guild_id)
+            if target_id is not None:
+                query = query.filter_by(target_id=str(target_id))
+            if moderator_id is not None:
+                query = query.filter_by(moderator_id=str(moderator_id))
+            if action is not None:
+                query = query.filter_by(action=action)
+            rows = query.order_by(ModerationAction.created_at.desc()).limit(limit).all()
+            session.expunge_all()
+            return rows
+        finally:
+            session.close()
+
+    async def export_csv(self, guild_id: int, action: Optional[str] = None) -> bytes:
+        rows = await self.search(guild_id, action=action, limit=self.export_limit)
+        return await asyncio.to_thread(self._to_csv, rows)
+
+    @staticmethod
+    def _to_csv(rows: List[ModerationAction]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow([getattr(row, column) for column in EXPORT_COLUMNS])
+        return buffer.getvalue().encode('utf-8')
+
+
+audit_log = AuditLog()
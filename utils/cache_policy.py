@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import resource
+import sys
+from itertools import chain
+from typing import Dict, Iterable, Optional
+import discord
+
+logger = logging.getLogger(__name__)
+
+MEMBER_CACHE_POLICIES = ('all', 'joined', 'voice', 'none')
+DEFAULT_MAX_MESSAGES = 200
+SIZE_SAMPLE = 50
+
+_chunk_locks: Dict[int, asyncio.Lock] = {}
+
+
+def member_cache_flags(policy: str, intents: discord.Intents) -> discord.MemberCacheFlags:
+    """Which members stay cached:
+
+    all     everything the intents allow, chunked at startup (discord.py's default)
+    joined  the same flags, but guilds are only chunked when ``ensure_chunked`` asks
+            (anti-raid does, before timing out a burst of joiners it hasn't cached)
+    voice   only members currently in voice channels
+    none    nothing; members arrive with events and interactions as needed
+    """
+    if policy == 'all':
+        return discord.MemberCacheFlags.from_intents(intents)
+    flags = discord.MemberCacheFlags.none()
+    if policy in ('joined', 'voice') and intents.voice_states:
+        flags.voice = True
+    if policy == 'joined' and intents.members:
+        flags.joined = True
+    return flags
+
+
+def cache_options_from_env(intents: discord.Intents) -> dict:
+    """Bot keyword arguments from MEMBER_CACHE, CHUNK_GUILDS_AT_STARTUP and MAX_MESSAGES"""
+    policy = os.getenv('MEMBER_CACHE', 'joined').lower()
+    if policy not in MEMBER_CACHE_POLICIES:
+        logger.warning('Unknown MEMBER_CACHE %r, using "joined"', policy)
+        policy = 'joined'
+    max_messages = os.getenv('MAX_MESSAGES', str(DEFAULT_MAX_MESSAGES))
+    # Only "all" loads every member up front; otherwise guilds are chunked lazily by
+    # ensure_chunked when a feature needs the full list
+    chunk_default = 'true' if policy == 'all' else 'false'
+    return {
+        'member_cache_flags': member_cache_flags(policy, intents),
+        'chunk_guilds_at_startup': os.getenv('CHUNK_GUILDS_AT_STARTUP', chunk_default).lower() in ('1', 'true', 'yes'),
+        'max_messages': int(max_messages) if max_messages.isdigit() and int(max_messages) > 0 else None,
+    }
+
+
+async def ensure_chunked(guild: discord.Guild):
+    """Load the guild's full member list once, the first time something needs it"""
+    if guild.chunked:
+        return
+    lock = _chunk_locks.setdefault(guild.id, asyncio.Lock())
+    try:
+        async with lock:
+            if not guild.chunked:
+                await guild.chunk(cache=True)
+                logger.info('Chunked %s members for guild %s on demand', guild.member_count, guild.id)
+    finally:
+        # The lock only matters while a chunk is in flight; callers already waiting hold their own reference
+        if _chunk_locks.get(guild.id) is lock and not lock.locked():
+            del _chunk_locks[guild.id]
+
+
+async def get_or_fetch_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Cached member if there is one, otherwise one REST lookup"""
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
+
+
+def _approx_size(objects: Iterable, count: int) -> int:
+    """Estimate the bytes held by ``count`` objects from a sample of their direct attributes"""
+    total = sampled = 0
+    for obj in objects:
+        size = sys.getsizeof(obj)
+        slots = [slot for cls in type(obj).__mro__ for slot in getattr(cls, '__slots__', ())]
+        for name in slots:
+            value = getattr(obj, name, None)
+            if value is not None and not isinstance(value, (int, bool, float)):
+                size += sys.getsizeof(value)
+        if hasattr(obj, '__dict__'):
+            size += sys.getsizeof(obj.__dict__)
+        total += size
+        sampled += 1
+        if sampled >= SIZE_SAMPLE:
+            break
+    return total * count // sampled if sampled else 0
+
+
+def current_rss() -> int:
+    """Resident set size in bytes; falls back to the peak where /proc isn't available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def memory_report(bot) -> Dict[str, tuple]:
+    """cache name -> (object count, approximate bytes); only a sample of each cache is walked"""
+    guilds = bot.guilds
+    per_guild = {
+        'members': lambda guild: guild.members,
+        'channels': lambda guild: guild.channels,
+        'roles': lambda guild: guild.roles,
+    }
+    report = {'guilds': (len(guilds), _approx_size(guilds, len(guilds)))}
+    for name, items in per_guild.items():
+        count = sum(len(items(guild)) for guild in guilds)
+        report[name] = (count, _approx_size(chain.from_iterable(items(guild) for guild in guilds), count))
+    messages = bot.cached_messages
+    report.update({
+        'users': (len(bot.users), _approx_size(bot.users, len(bot.users))),
+        'emojis': (len(bot.emojis), _approx_size(bot.emojis, len(bot.emojis))),
+        'messages': (len(messages), _approx_size(messages, len(messages))),
+        'views': (len(bot.persistent_views), 0),
+    })
+    return report
@@ -0,0 +1,280 @@
+import json
+import logging
+import time
+from typing import Dict, Hashable, Optional, Tuple
+import discord
+from discord import app_commands
+from discord.ext import commands
+from utils import metrics
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+COOLDOWN_DECISIONS = registry.counter(
+    'bot_cooldown_decisions_total', 'Commands checked by the cooldown engine, by outcome', ('command', 'outcome')
+)
+
+USER = 'user'
+GUILD = 'guild'
+SCOPES = (USER, GUILD)
+
+# Outcomes counted in COOLDOWN_DECISIONS
+ALLOWED = 'allowed'
+LIMITED = 'limited'
+DUPLICATE = 'duplicate'
+REFUNDED = 'refunded'
+
+# Commands are keyed by how they're invoked, since !stats and /stats are different commands
+PREFIX = '!'
+SLASH = '/'
+
+# Identical invocations from the same user inside this window are dropped
+DEDUP_SECONDS = 3.0
+# Commands that only read, or are meant to be repeated, skip duplicate suppression; their rules alone apply
+NO_DEDUP = frozenset({
+    '!help', '!ping', '!shards', '!memory', '!stats', '/stats', '!flip', '/leaderboard', '!gamestats',
+    '!cooldown', '!antiraid',
+})
+# Expired entries are swept once a table doubles in size since the last sweep
+MIN_SWEEP_SIZE = 1024
+
+
+class Rule:
+    """``rate`` uses per ``per`` seconds; a rate of 0 turns the limit off"""
+
+    __slots__ = ('rate', 'per', 'interval', 'tolerance')
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self.interval = per / rate if rate else 0.0
+        # How far ahead of "now" a bucket may be booked and still accept a use
+        self.tolerance = per - self.interval
+
+    def __repr__(self):
+        return f'{self.rate}/{self.per:g}s' if self.rate else 'off'
+
+
+# Built-in limits; guilds can override any of these or add their own with !cooldown
+DEFAULT_RULES: Dict[Tuple[str, str], Rule] = {
+    ('/ticket', USER): Rule(1, 60),
+    ('/ticket', GUILD): Rule(20, 60),
+    ('/apply', USER): Rule(1, 300),
+    ('!tictactoe', USER): Rule(2, 30),
+    ('!connectfour', USER): Rule(2, 30),
+    ('!grid', USER): Rule(2, 30),
+    ('!flip', USER): Rule(5, 10),
+    ('/leaderboard', USER): Rule(3, 30),
+    ('/leaderboard', GUILD): Rule(10, 60),
+    ('!gamestats', USER): Rule(3, 30),
+    ('/stats', USER): Rule(3, 30),
+    ('!broadcast', GUILD): Rule(2, 60),
+    ('!kick', USER): Rule(10, 60),
+    ('!ban', USER): Rule(10, 60),
+    ('!timeout', USER): Rule(20, 60),
+}
+
+
+class ExpiringTable:
+    """key -> float deadline, where a passed deadline means the entry is gone.
+
+    Entries are never expired individually: readers treat a past deadline as
+    absent, and the whole table is swept only when it has doubled in size
+    since the previous sweep, so upkeep is amortised O(1) per write and memory
+    stays proportional to the keys active within the longest window.
+    """
+
+    __slots__ = ('entries', 'next_sweep')
+
+    def __init__(self):
+        self.entries: Dict[Hashable, float] = {}
+        self.next_sweep = MIN_SWEEP_SIZE
+
+    def get(self, key: Hashable, now: float) -> float:
+        deadline = self.entries.get(key, 0.0)
+        return deadline if deadline > now else 0.0
+
+    def set(self, key: Hashable, deadline: float, now: float):
+        self.entries[key] = deadline
+        if len(self.entries) >= self.next_sweep:
+            self.entries = {key: value for key, value in self.entries.items() if value > now}
+            self.next_sweep = max(MIN_SWEEP_SIZE, 2 * len(self.entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class CommandRateLimited(commands.CheckFailure, app_commands.CheckFailure):
+    def __init__(self, command: str, scope: str, retry_after: float):
+        self.command = command
+        self.scope = scope
+        self.retry_after = retry_after
+        who = 'this server is' if scope == GUILD else "you're"
+        super().__init__(f'`{command}` is on cooldown; {who} limited. Try again in {retry_after:.0f}s.')
+
+
+class DuplicateCommand(commands.CheckFailure, app_commands.CheckFailure):
+    pass
+
+
+class CooldownEngine:
+    """Token buckets for commands, per user and per guild, plus duplicate suppression.
+
+    Each bucket is a single float using the generic cell rate algorithm: the
+    time at which the bucket would be full again. That is equivalent to a
+    token bucket of ``rate`` tokens refilling over ``per`` seconds, but needs
+    no refill bookkeeping, and a bucket whose time has passed is the same as
+    one that was never used, which is what lets ``ExpiringTable`` drop it.
+    """
+
+    def __init__(self, dedup_seconds: float = DEDUP_SECONDS):
+        self.dedup_seconds = dedup_seconds
+        self.rules: Dict[Tuple[str, str], Rule] = dict(DEFAULT_RULES)
+        # guild_id -> {(command, scope): rule}
+        self.overrides: Dict[int, Dict[Tuple[str, str], Rule]] = {}
+        self._buckets: Dict[Tuple[str, str], ExpiringTable] = {}
+        self._recent = ExpiringTable()
+        registry.gauge('bot_cooldown_tracked_keys', 'Buckets and dedup entries held by the cooldown engine',
+                       function=self.tracked)
+
+    def tracked(self) -> int:
+        return len(self._recent) + sum(len(table) for table in self._buckets.values())
+
+    def rule_for(self, guild_id: Optional[int], command: str, scope: str) -> Optional[Rule]:
+        key = (command, scope)
+        rule = self.overrides.get(guild_id, {}).get(key) if guild_id else None
+        return rule if rule is not None else self.rules.get(key)
+
+    def set_override(self, guild_id: int, command: str, scope: str, rule: Optional[Rule]):
+        guild_rules = self.overrides.setdefault(guild_id, {})
+        if rule is None:
+            guild_rules.pop((command, scope), None)
+        else:
+            guild_rules[(command, scope)] = rule
+
+    def _table(self, command: str, scope: str) -> ExpiringTable:
+        table = self._buckets.get((command, scope))
+        if table is None:
+            table = self._buckets[(command, scope)] = ExpiringTable()
+        return table
+
+    def _buckets_for(self, command: str, user_id: int, guild_id: Optional[int]):
+        """(scope, key, rule) for each bucket a use of ``command`` draws from, user first.
+
+        User buckets are per server, since each server can set its own rule for them.
+        """
+        for scope, key in ((USER, (guild_id, user_id)), (GUILD, guild_id)):
+            if key is None:
+                continue
+            rule = self.rule_for(guild_id, command, scope)
+            if rule is not None and rule.rate:
+                yield scope, key, rule
+
+    def hit(self, command: str, user_id: int, guild_id: Optional[int], fingerprint: str = '',
+            now: Optional[float] = None):
+        """Record one use of ``command``, raising if it is limited or a duplicate.
+
+        ``command`` is the name with its prefix, e.g. ``!tictactoe`` or
+        ``/ticket``. ``fingerprint`` identifies the invocation's arguments; the
+        same user sending the same command with the same fingerprint within the
+        dedup window is rejected with ``DuplicateCommand``, unless the command
+        is in ``NO_DEDUP``. A use rejected by the guild bucket doesn't cost the
+        user anything.
+        """
+        now = time.monotonic() if now is None else now
+        if self.dedup_seconds and command not in NO_DEDUP:
+            dedup_key = hash((user_id, guild_id, command, fingerprint))
+            if self._recent.get(dedup_key, now):
+                COOLDOWN_DECISIONS.inc(command, DUPLICATE)
+                raise DuplicateCommand(f'Ignoring a repeat of `{command}` sent moments ago')
+            self._recent.set(dedup_key, now + self.dedup_seconds, now)
+
+        # Check the shared guild bucket last, so one user's spam can't drain it
+        taken = []
+        for scope, key, rule in self._buckets_for(command, user_id, guild_id):
+            table = self._table(command, scope)
+            previous = table.get(key, now)
+            booked = max(previous, now)
+            if booked - now > rule.tolerance:
+                for table, key, previous in taken:
+                    table.set(key, previous, now)
+                COOLDOWN_DECISIONS.inc(command, LIMITED)
+                raise CommandRateLimited(command, scope, booked - now - rule.tolerance)
+            table.set(key, booked + rule.interval, now)
+            taken.append((table, key, previous))
+        COOLDOWN_DECISIONS.inc(command, ALLOWED)
+
+    def refund(self, command: str, user_id: int, guild_id: Optional[int], fingerprint: str = '',
+               now: Optional[float] = None):
+        """Give back the use ``hit`` took, for an invocation that was turned away or failed.
+
+        The dedup entry goes too, so retrying straight away isn't dropped as a repeat.
+        """
+        now = time.monotonic() if now is None else now
+        self._recent.entries.pop(hash((user_id, guild_id, command, fingerprint)), None)
+        for scope, key, rule in self._buckets_for(command, user_id, guild_id):
+            table = self._buckets.get((command, scope))
+            booked = table.get(key, now) if table is not None else 0.0
+            if booked:
+                table.set(key, booked - rule.interval, now)
+        COOLDOWN_DECISIONS.inc(command, REFUNDED)
+
+    def reset(self, command: str, guild_id: int, user_id: Optional[int] = None):
+        """Clear one member's bucket for ``command`` in a server, or the server's own bucket"""
+        scope, key = (USER, (guild_id, user_id)) if user_id is not None else (GUILD, guild_id)
+        table = self._buckets.get((command, scope))
+        if table is not None:
+            table.entries.pop(key, None)
+
+    async def check_context(self, ctx) -> bool:
+        """Global ``check_once`` for prefix commands"""
+        if ctx.command is None:
+            return True
+        self.hit(PREFIX + ctx.command.qualified_name, ctx.author.id, ctx.guild.id if ctx.guild else None,
+                 f'{ctx.channel.id}:{ctx.message.content}')
+        return True
+
+    def refund_context(self, ctx):
+        """Refund a prefix command that errored after ``check_context`` let it through"""
+        if ctx.command is not None:
+            self.refund(PREFIX + ctx.command.qualified_name, ctx.author.id, ctx.guild.id if ctx.guild else None,
+                        f'{ctx.channel.id}:{ctx.message.content}')
+
+    def check_interaction(self, interaction: discord.Interaction):
+        command = interaction.command
+        if command is None or interaction.type is not discord.InteractionType.application_command:
+            return
+        name = SLASH + command.qualified_name
+        options = json.dumps(interaction.data.get('options', []), sort_keys=True)
+        fingerprint = f'{interaction.channel_id}:{options}'
+        self.hit(name, interaction.user.id, interaction.guild_id, fingerprint)
+        interaction.extras['cooldown'] = (name, fingerprint)
+
+    def refund_interaction(self, interaction: discord.Interaction):
+        """Refund an app command that didn't go through; only the first call for an interaction counts"""
+        charged = interaction.extras.pop('cooldown', None)
+        if charged is not None:
+            name, fingerprint = charged
+            self.refund(name, interaction.user.id, interaction.guild_id, fingerprint)
+
+
+cooldowns = CooldownEngine()
+
+
+class CooldownCommandTree(metrics.MetricsCommandTree):
+    """Metrics tree that also runs every app command through ``cooldowns``"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        await super().interaction_check(interaction)
+        cooldowns.check_interaction(interaction)
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        if isinstance(error, (CommandRateLimited, DuplicateCommand)):
+            metrics.app_command_finished(interaction, interaction.command, type(error).__name__)
+            if not interaction.response.is_done():
+                # Slash commands can't fail silently; Discord shows "did not respond" otherwise
+                await interaction.response.send_message(f"⏳ {error}", ephemeral=True)
+            return
+        cooldowns.refund_interaction(interaction)
+        await super().on_error(interaction, error)
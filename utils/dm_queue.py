@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set, Tuple
+import discord
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DM_DELIVERIES = registry.counter(
+    'bot_dm_deliveries_total', 'Direct messages by final outcome', ('status',)
+)
+DM_RETRIES = registry.counter(
+    'bot_dm_retries_total', 'Direct message sends retried after a transient error'
+)
+DM_DELIVERY_LATENCY = registry.histogram(
+    'bot_dm_delivery_seconds', 'Time from enqueue to delivered direct message',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+# Outcomes returned by DMQueue.enqueue
+QUEUED = 'queued'
+DUPLICATE = 'duplicate'
+DMS_CLOSED = 'dms_closed'
+QUEUE_FULL = 'queue_full'
+
+
+class DMJob:
+    __slots__ = ('user', 'content', 'embed', 'key', 'attempts', 'enqueued_at')
+
+    def __init__(self, user: discord.abc.User, content: Optional[str], embed: Optional[discord.Embed], key: Tuple):
+        self.user = user
+        self.content = content
+        self.embed = embed
+        self.key = key
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+
+
+class DMQueue:
+    """Background delivery of direct messages.
+
+    Handlers call ``enqueue`` and return; a few worker tasks do the sending.
+    The queue is bounded, so a mass action can't grow it without limit, and an
+    identical message already waiting for the same user is not queued twice.
+    Transient failures (rate limits and 5xx) are retried with exponential
+    backoff. Users whose DMs are closed are remembered for ``closed_ttl``
+    seconds so later messages to them fail fast without a REST call.
+    """
+
+    def __init__(self, maxsize: int = 1000, workers: int = 2, max_attempts: int = 4,
+                 base_delay: float = 2.0, closed_ttl: float = 6 * 3600, closed_cache_size: int = 10000):
+        self.maxsize = maxsize
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.closed_ttl = closed_ttl
+        self.closed_cache_size = closed_cache_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: Set[asyncio.Task] = set()
+        # Retry sleeps in progress, so drain() can send their jobs right away
+        self._retries: Dict[asyncio.Task, DMJob] = {}
+        self._draining = False
+        self._pending: Dict[Tuple, DMJob] = {}
+        # user_id -> monotonic time the entry expires, oldest first
+        self._closed: 'OrderedDict[int, float]' = OrderedDict()
+        registry.gauge('bot_dm_queue_depth', 'Direct messages waiting to be sent', function=self.depth)
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def dms_closed(self, user_id: int) -> bool:
+        expires = self._closed.get(user_id)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del self._closed[user_id]
+            return False
+        return True
+
+    def enqueue(self, user: discord.abc.User, content: Optional[str] = None,
+                embed: Optional[discord.Embed] = None, dedup_key: Optional[Hashable] = None) -> str:
+        """Queue a DM and return at once; the result is one of the module's outcome constants.
+
+        ``dedup_key`` identifies the message for de-duplication; by default the
+        content and embed title/description are used.
+        """
+        if self.dms_closed(user.id):
+            DM_DELIVERIES.inc(DMS_CLOSED)
+            return DMS_CLOSED
+        if dedup_key is None:
+            dedup_key = (content, embed.title if embed else None, embed.description if embed else None)
+        key = (user.id, dedup_key)
+        if key in self._pending:
+            DM_DELIVERIES.inc(DUPLICATE)
+            return DUPLICATE
+
+        self._ensure_workers()
+        job = DMJob(user, content, embed, key)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            DM_DELIVERIES.inc(QUEUE_FULL)
+            logger.warning('DM queue full, dropping message to %s', user)
+            return QUEUE_FULL
+        self._pending[key] = job
+        return QUEUED
+
+    def _ensure_workers(self):
+        # Started lazily, and restarted with a fresh queue if the loop that ran
+        # the old workers has gone away
+        if not self._workers:
+            self._queue = asyncio.Queue(self.maxsize)
+            self._pending.clear()
+            for _ in range(self.worker_count):
+                task = asyncio.create_task(self._worker())
+                self._workers.add(task)
+                task.add_done_callback(self._workers.discard)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except Exception as e:
+                self._finish(job, 'failed')
+                logger.error('Unexpected error delivering DM to %s: %s', job.user, e)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: DMJob):
+        job.attempts += 1
+        try:
+            await job.user.send(content=job.content, embed=job.embed)
+        except discord.Forbidden:
+            self._remember_closed(job.user.id)
+            self._finish(job, 'forbidden')
+            logger.warning("Could not send DM to %s", job.user)
+            return
+        except discord.HTTPException as e:
+            transient = e.status == 429 or e.status >= 500
+            if transient and job.attempts < self.max_attempts:
+                DM_RETRIES.inc()
+                self._retry_later(job, self.base_delay * 2 ** (job.attempts - 1))
+                return
+            self._finish(job, 'failed')
+            logger.warning('Giving up on DM to %s after %s attempt(s): HTTP %s', job.user, job.attempts, e.status)
+            return
+        self._finish(job, 'sent')
+        DM_DELIVERY_LATENCY.observe(time.monotonic() - job.enqueued_at)
+
+    def _requeue(self, job: DMJob):
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._finish(job, QUEUE_FULL)
+
+    def _retry_later(self, job: DMJob, delay: float):
+        if self._draining:
+            # Shutting down: one more immediate attempt rather than a sleep that outlives the drain
+            self._requeue(job)
+            return
+
+        async def requeue():
+            await asyncio.sleep(delay)
+            self._requeue(job)
+
+        task = asyncio.create_task(requeue())
+        self._retries[task] = job
+        task.add_done_callback(lambda done: self._retries.pop(done, None))
+
+    def _finish(self, job: DMJob, status: str):
+        self._pending.pop(job.key, None)
+        DM_DELIVERIES.inc(status)
+
+    def _remember_closed(self, user_id: int):
+        self._closed[user_id] = time.monotonic() + self.closed_ttl
+        self._closed.move_to_end(user_id)
+        while len(self._closed) > self.closed_cache_size:
+            self._closed.popitem(last=False)
+
+    async def drain(self, timeout: float = 10.0):
+        """Wait up to ``timeout`` seconds for every pending message, including
+        ones waiting to be retried, to go out; then stop the workers"""
+        self._draining = True
+        try:
+            for task, job in list(self._retries.items()):
+                task.cancel()
+                self._requeue(job)
+            self._retries.clear()
+            deadline = time.monotonic() + timeout
+            while self._pending and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            if self._pending:
+                logger.warning('Stopped with %s DM(s) still queued', self.depth())
+            for task in list(self._workers):
+                task.cancel()
+        finally:
+            self._draining = False
+
+
+dm_queue = DMQueue()
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, UniqueConstraint
+from utils.database import db
+from models import Base
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+STARTING_RATING = 1000.0
+K_FACTOR = 32
+
+RESULTS_DROPPED = registry.counter(
+    'bot_game_results_dropped_total', 'Game results discarded because the write buffer was full'
+)
+
+
+class GameResult(Base):
+    __tablename__ = 'game_results'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    game = Column(String(32), nullable=False)
+    player1_id = Column(String, nullable=False)
+    player2_id = Column(String)
+    winner_id = Column(String)
+    outcome = Column(String(16), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_game_results_guild_created', 'guild_id', 'created_at'),
+    )
+
+
+class PlayerRating(Base):
+    """Running per-guild aggregate, updated as results are flushed"""
+    __tablename__ = 'player_ratings'
+
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String, nullable=False)
+    user_id = Column(String, nullable=False)
+    rating = Column(Float, nullable=False, default=STARTING_RATING)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    ties = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('guild_id', 'user_id', name='uq_player_ratings_guild_user'),
+        Index('ix_player_ratings_guild_rating', 'guild_id', 'rating'),
+    )
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+class GameResultRecorder:
+    """Buffers game results in memory and writes them in batches.
+
+    Ratings are folded into ``PlayerRating`` in the same transaction as each
+    batch, so leaderboards read a small indexed table instead of the results.
+    """
+
+    def __init__(self, batch_size: int = 50, leaderboard_size: int = 10, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.leaderboard_size = leaderboard_size
+        # Bounds the buffer while the database is unreachable; the oldest results go first
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._flush_lock = asyncio.Lock()
+
+    @staticmethod
+    def create_tables():
+        Base.metadata.create_all(db.engine, tables=[GameResult.__table__, PlayerRating.__table__])
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, guild_id: int, game: str, player1_id: int, player2_id: Optional[int] = None,
+               winner_id: Optional[int] = None, outcome: str = 'win', rated: bool = False) -> bool:
+        """Queue a result; returns True once the buffer is big enough to flush"""
+        self._pending.append({
+            'guild_id': str(guild_id),
+            'game': game,
+            'player1_id': str(player1_id),
+            'player2_id': str(player2_id) if player2_id is not None else None,
+            'winner_id': str(winner_id) if winner_id is not None else None,
+            'outcome': outcome,
+            'rated': rated,
+            'created_at': datetime.utcnow(),
+        })
+        self._trim()
+        return len(self._pending) >= self.batch_size
+
+    def _trim(self):
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            RESULTS_DROPPED.inc(amount=overflow)
+
+    async def flush(self) -> Set[str]:
+        """Write everything buffered so far; returns the guild ids whose ratings changed"""
+        async with self._flush_lock:
+            if not self._pending:
+                return set()
+            batch, self._pending = self._pending, []
+            try:
+                return await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                # Put the batch back so the next flush retries it
+                self._pending[:0] = batch
+                self._trim()
+                logger.error('Error writing %s game results: %s', len(batch), e)
+                return set()
+
+    def _write_batch(self, batch: List[dict]) -> Set[str]:
+        session = db.get_session()
+        try:
+            session.bulk_insert_mappings(GameResult, [
+                {key: value for key, value in row.items() if key != 'rated'} for row in batch
+            ])
+
+            rated = [row for row in batch if row['rated']]
+            touched: Set[str] = set()
+            if rated:
+                guild_ids = {row['guild_id'] for row in rated}
+                user_ids = {row['player1_id'] for row in rated} | {row['player2_id'] for row in rated}
+                ratings: Dict[Tuple[str, str], PlayerRating] = {
+                    (r.guild_id, r.user_id): r
+                    for r in session.query(PlayerRating).filter(
+                        PlayerRating.guild_id.in_(guild_ids),
+                        PlayerRating.user_id.in_(user_ids)
+                    )
+                }
+
+                def get_rating(guild_id: str, user_id: str) -> PlayerRating:
+                    key = (guild_id, user_id)
+                    if key not in ratings:
+                        ratings[key] = PlayerRating(
+                            guild_id=guild_id, user_id=user_id, rating=STARTING_RATING, wins=0, losses=0, ties=0
+                        )
+                        session.add(ratings[key])
+                    return ratings[key]
+
+                for row in rated:
+                    first = get_rating(row['guild_id'], row['player1_id'])
+                    second = get_rating(row['guild_id'], row['player2_id'])
+                    if row['winner_id'] is None:
+                        score = 0.5
+                        first.ties += 1
+                        second.ties += 1
+                    elif row['winner_id'] == row['player1_id']:
+                        score = 1.0
+                        first.wins += 1
+                        second.losses += 1
+                    else:
+                        score = 0.0
+                        first.losses += 1
+                        second.wins += 1
+                    delta = K_FACTOR * (score - expected_score(first.rating, second.rating))
+                    first.rating += delta
+                    second.rating -= delta
+                    first.updated_at = second.updated_at = row['created_at']
+                    touched.add(row['guild_id'])
+
+            session.commit()
+            logger.info('Wrote %s game results (%s rated)', len(batch), len(rated))
+            return touched
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def top_players(self, guild_id: int) -> List[Tuple[str, float, int, int, int]]:
+        return await asyncio.to_thread(self._query_top, str(guild_id))
+
+    def _query_top(self, guild_id: str) -> List[Tuple[str, float, int, int, int]]:
+        session = db.get_session()
+        try:
+            rows = session.query(PlayerRating).filter_by(guild_id=guild_id).order_by(
+                PlayerRating.rating.desc()
+            ).limit(self.leaderboard_size).all()
+            return [(r.user_id, r.rating, r.wins, r.losses, r.ties) for r in rows]
+        finally:
+            session.close()
@@ -0,0 +1,131 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class GameSession:
+    """Compact bookkeeping for one running game.
+
+    Only ids and timestamps are kept here; the view is dropped as soon as the
+    session closes so finished games don't pin their state in memory.
+    """
+
+    __slots__ = ('key', 'kind', 'guild_id', 'channel_id', 'player_ids', 'started_at', 'last_active', 'view', 'manager')
+
+    def __init__(self, key: int, kind: str, guild_id: int, channel_id: int, player_ids: tuple, view, manager):
+        self.key = key
+        self.kind = kind
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.player_ids = player_ids
+        self.started_at = self.last_active = time.monotonic()
+        self.view = view
+        self.manager = manager
+
+    def touch(self):
+        """Mark the session active; call on every move"""
+        if self.manager is not None:
+            self.manager._touch(self)
+
+
+class GameSessionManager:
+    """Bounded registry of live games with per-channel and global caps.
+
+    Sessions are kept in least-recently-active order, so idle sweeps and
+    capacity evictions only ever look at the front of the queue.
+    """
+
+    def __init__(self, per_channel_limit: int = 1, global_limit: int = 5000, idle_timeout: float = 300.0):
+        self.per_channel_limit = per_channel_limit
+        self.global_limit = global_limit
+        self.idle_timeout = idle_timeout
+        self._sessions: 'OrderedDict[int, GameSession]' = OrderedDict()
+        self._by_channel: Dict[int, Set[int]] = {}
+        self._next_key = 0
+        self.counters = {
+            'opened': 0,
+            'finished': 0,
+            'evicted_idle': 0,
+            'evicted_capacity': 0,
+            'rejected_channel_full': 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def channel_full(self, channel_id: int) -> bool:
+        return len(self._by_channel.get(channel_id, ())) >= self.per_channel_limit
+
+    def open(self, kind: str, guild_id: int, channel_id: int, player_ids: tuple, view) -> Optional[GameSession]:
+        """Register a new game, or return None if its channel is already at capacity"""
+        self.sweep()
+        if self.channel_full(channel_id):
+            self.counters['rejected_channel_full'] += 1
+            return None
+
+        while len(self._sessions) >= self.global_limit:
+            _, oldest = next(iter(self._sessions.items()))
+            self._evict(oldest, 'evicted_capacity')
+
+        self._next_key += 1
+        session = GameSession(self._next_key, kind, guild_id, channel_id, player_ids, view, self)
+        self._sessions[session.key] = session
+        self._by_channel.setdefault(channel_id, set()).add(session.key)
+        self.counters['opened'] += 1
+        return session
+
+    def close(self, session: GameSession):
+        """Forget a session; safe to call more than once"""
+        if self._sessions.pop(session.key, None) is None:
+            return
+        keys = self._by_channel.get(session.channel_id)
+        if keys is not None:
+            keys.discard(session.key)
+            if not keys:
+                del self._by_channel[session.channel_id]
+        session.view = None
+        session.manager = None
+        self.counters['finished'] += 1
+
+    def sweep(self) -> int:
+        """Evict sessions idle for longer than ``idle_timeout``; returns how many were evicted"""
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        while self._sessions:
+            _, oldest = next(iter(self._sessions.items()))
+            if oldest.last_active > cutoff:
+                break
+            self._evict(oldest, 'evicted_idle')
+            evicted += 1
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        live_by_kind: Dict[str, int] = {}
+        for session in self._sessions.values():
+            live_by_kind[session.kind] = live_by_kind.get(session.kind, 0) + 1
+        return {
+            'live': len(self._sessions),
+            'channels': len(self._by_channel),
+            **{f'live_{kind}': count for kind, count in live_by_kind.items()},
+            **self.counters,
+        }
+
+    def _touch(self, session: GameSession):
+        if session.key in self._sessions:
+            session.last_active = time.monotonic()
+            self._sessions.move_to_end(session.key)
+
+    def _evict(self, session: GameSession, reason: str):
+        view = session.view
+        self.close(session)
+        # close() counted it as finished; re-book it under the eviction reason
+        self.counters['finished'] -= 1
+        self.counters[reason] += 1
+        if view is not None:
+            for child in view.children:
+                child.disabled = True
+            view.stop()
+        logger.info('Evicted %s game in channel %s (%s)', session.kind, session.channel_id, reason)
@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import sys
+import warnings
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.exc import SAWarning
+
+logger = logging.getLogger(__name__)
+
+# extension name -> source mtime when it was last (re)loaded
+_loaded_mtimes: Dict[str, Optional[float]] = {}
+
+CommandKey = Tuple[int, str]
+
+# A reloaded cog declares its models again while the old classes are still registered; they are
+# disposed right after, so the duplicate-class warning is expected from cog modules only
+warnings.filterwarnings('ignore', 'This declarative base already contains a class', SAWarning, module=r'cogs\.')
+
+
+def source_mtime(name: str) -> Optional[float]:
+    path = getattr(sys.modules.get(name), '__file__', None)
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+def remember(name: str):
+    """Record an extension's source mtime; call after every successful load"""
+    _loaded_mtimes[name] = source_mtime(name)
+
+
+def changed_extensions(bot, names: Iterable[str]) -> List[str]:
+    """Loaded extensions whose source file changed since they were loaded"""
+    return [name for name in names if name in bot.extensions and source_mtime(name) != _loaded_mtimes.get(name)]
+
+
+def forget_models(name: str) -> list:
+    """Take the tables an extension declared out of ``Base.metadata`` so reloading it can declare them again.
+
+    Returns the class managers of the old models. The old mappers keep working
+    until ``dispose_models`` is called, so a reload that fails and rolls back to
+    the old module still has its models.
+    """
+    from models import Base
+    mappers = [mapper for mapper in Base.registry.mappers if mapper.class_.__module__ == name]
+    for table in {mapper.local_table for mapper in mappers}:
+        Base.metadata.remove(table)
+    return [mapper.class_manager for mapper in mappers]
+
+
+def dispose_models(managers: Iterable):
+    """Drop replaced model classes from ``Base.registry``, the way ``registry.dispose()`` does for all of them"""
+    from models import Base
+    for manager in managers:
+        Base.registry._managers.pop(manager, None)
+        Base.registry._dispose_manager_and_mapper(manager)
+
+
+def command_payloads(tree) -> Dict[CommandKey, dict]:
+    """Global app commands as the JSON Discord would receive, keyed by (type, name)"""
+    payloads = {}
+    for command in tree.get_commands():
+        payload = command.to_dict(tree)
+        payloads[(payload.get('type', 1), payload['name'])] = payload
+    return payloads
+
+
+class ReloadResult:
+    __slots__ = ('reloaded', 'failed', 'upserted', 'deleted', 'duration')
+
+    def __init__(self):
+        self.reloaded: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.upserted: List[str] = []
+        self.deleted: List[str] = []
+        self.duration = 0.0
+
+
+async def sync_changed_commands(bot, before: Dict[CommandKey, dict], after: Dict[CommandKey, dict],
+                                result: ReloadResult):
+    """Push only the app commands that differ, instead of overwriting the whole tree"""
+    changed = [key for key, payload in after.items() if json.dumps(before.get(key), sort_keys=True) != json.dumps(payload, sort_keys=True)]
+    removed = [key for key in before if key not in after]
+    for key in changed:
+        await bot.http.upsert_global_command(bot.application_id, after[key])
+        result.upserted.append(key[1])
+    if removed:
+        for command in await bot.tree.fetch_commands():
+            if (command.type.value, command.name) in removed:
+                await bot.http.delete_global_command(bot.application_id, command.id)
+                result.deleted.append(command.name)
+
+
+async def reload_extensions(bot, names: Iterable[str]) -> ReloadResult:
+    """Reload extensions in place and resync only the app commands they changed.
+
+    ``reload_extension`` rolls an extension back to its old module if the new
+    one fails to load, so a bad edit leaves the running version in place.
+    Persistent views are re-registered by the cogs themselves as they load,
+    and the old registrations stay live until they are replaced.
+    """
+    result = ReloadResult()
+    started = perf_counter()
+    before = command_payloads(bot.tree)
+    for name in names:
+        try:
+            old_models = forget_models(name)
+            await bot.reload_extension(name)
+            dispose_models(old_models)
+            remember(name)
+            result.reloaded.append(name)
+        except Exception as e:
+            result.failed[name] = f'{type(e).__name__}: {e}'
+            logger.error('Failed to reload extension %s: %s', name, e)
+
+    if result.reloaded:
+        try:
+            await sync_changed_commands(bot, before, command_payloads(bot.tree), result)
+        except Exception as e:
+            result.failed['app command sync'] = f'{type(e).__name__}: {e}'
+            logger.error('Error syncing changed app commands: %s', e)
+    result.duration = perf_counter() - started
+    logger.info('Reloaded %s in %.1fms (%s app commands upserted, %s deleted)',
+                ', '.join(result.reloaded) or 'nothing', result.duration * 1000,
+                len(result.upserted), len(result.deleted))
+    return result
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG = registry.histogram(
+    'bot_event_loop_lag_seconds', 'Delay between when a loop tick was due and when it ran',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+SLOW_CALLBACKS = registry.counter(
+    'bot_slow_callbacks_total', 'Times the event loop was blocked past the threshold', ('cog', 'command')
+)
+
+
+class SlowCallback:
+    __slots__ = ('started', 'duration', 'cog', 'command', 'stack')
+
+    def __init__(self, started: float, duration: float, cog: str, command: str, stack: str):
+        self.started = started
+        self.duration = duration
+        self.cog = cog
+        self.command = command
+        self.stack = stack
+
+
+class LoopMonitor:
+    """Measures event-loop lag and profiles callbacks that block it.
+
+    A ticker task on the loop records how late each tick runs. A watchdog
+    thread watches the ticker's heartbeat; once the loop has been stuck for
+    longer than ``threshold`` it samples the loop thread's stack until the loop
+    recovers, then blames the innermost frame that belongs to a command.
+    """
+
+    def __init__(self, bot, interval: float = 0.25, threshold: float = 0.2, window: int = 2400,
+                 sample_interval: float = 0.01, report_every: float = 60.0):
+        self.bot = bot
+        self.interval = interval
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        # Seconds between lag summaries in the log; 0 turns them off
+        self.report_every = report_every
+        self.lags: Deque[float] = deque(maxlen=window)
+        self.slow_callbacks: Deque[SlowCallback] = deque(maxlen=20)
+        self.offenders: Counter = Counter()
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._code_index: Dict[object, Tuple[str, str]] = {}
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def refresh_commands(self):
+        """Index command callbacks by code object; call after extensions (re)load"""
+        index = {}
+        for command in self.bot.walk_commands():
+            cog = command.cog_name or 'Bot'
+            index[command.callback.__code__] = (cog, command.qualified_name)
+        for command in self.bot.tree.walk_commands():
+            callback = getattr(command, 'callback', None)
+            if callback is not None:
+                binding = getattr(command, 'binding', None)
+                cog = binding.qualified_name if binding is not None else 'Bot'
+                index[callback.__code__] = (cog, f'/{command.qualified_name}')
+        self._code_index = index
+
+    def percentiles(self, *quantiles: float) -> List[float]:
+        samples = sorted(self.lags)
+        if not samples:
+            return [0.0 for _ in quantiles]
+        return [samples[min(len(samples) - 1, int(q * len(samples)))] for q in quantiles]
+
+    async def _tick(self):
+        next_report = time.monotonic() + self.report_every
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self.lags.append(lag)
+            EVENT_LOOP_LAG.observe(lag)
+            if self.report_every and now >= next_report:
+                next_report = now + self.report_every
+                p50, p95, p99 = self.percentiles(0.5, 0.95, 0.99)
+                logger.info('Event loop lag over the last %s ticks: p50 %.1fms, p95 %.1fms, p99 %.1fms',
+                            len(self.lags), p50 * 1000, p95 * 1000, p99 * 1000)
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_since = heartbeat + self.interval
+            if time.monotonic() - blocked_since < self.threshold:
+                continue
+
+            samples: List[traceback.StackSummary] = []
+            attribution: Counter = Counter()
+            while not self._stop.is_set() and self._heartbeat == heartbeat:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    break
+                attribution[self._attribute(frame)] += 1
+                if len(samples) < 5:
+                    samples.append(traceback.extract_stack(frame, limit=15))
+                del frame
+                time.sleep(self.sample_interval)
+
+            if samples:
+                self._report(blocked_since, attribution, samples)
+
+    def _attribute(self, frame) -> Tuple[str, str]:
+        index = self._code_index
+        while frame is not None:
+            owner = index.get(frame.f_code)
+            if owner is not None:
+                return owner
+            frame = frame.f_back
+        return ('unknown', 'unknown')
+
+    def _report(self, blocked_since: float, attribution: Counter, samples: List[traceback.StackSummary]):
+        duration = time.monotonic() - blocked_since
+        (cog, command), _ = attribution.most_common(1)[0]
+        stack = ''.join(traceback.format_list(samples[len(samples) // 2]))
+        self.slow_callbacks.append(SlowCallback(blocked_since, duration, cog, command, stack))
+        self.offenders[(cog, command)] += 1
+        SLOW_CALLBACKS.inc(cog, command)
+        logger.warning('Event loop blocked for %.0fms by %s.%s\n%s', duration * 1000, cog, command, stack)
@@ -0,0 +1,289 @@
+import logging
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+import discord
+from aiohttp import web
+from discord import app_commands
+from sqlalchemy import event
+from utils.structured_logging import bind_command_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Gauge:
+    """A value that goes up and down; pass ``function`` to read it at scrape time instead"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 function: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.function = function
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def get(self, *labels: str) -> float:
+        if self.function is not None and not labels:
+            return self.function()
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        if self.function is not None:
+            lines.append(f'{self.name} {self.function()}')
+            return lines
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is a bisect plus two additions"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above the last bucket, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels: str) -> '_Timer':
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(perf_counter() - self.start, *self.labels)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+              function: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._metrics.setdefault(name, Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+COMMAND_LATENCY = registry.histogram(
+    'bot_command_duration_seconds', 'Time spent handling a command', ('command', 'type')
+)
+COMMAND_TOTAL = registry.counter(
+    'bot_commands_total', 'Commands handled, by outcome', ('command', 'type', 'guild', 'status')
+)
+DB_QUERY_LATENCY = registry.histogram(
+    'bot_db_query_duration_seconds', 'Time spent in database queries', ('operation',)
+)
+REST_LATENCY = registry.histogram(
+    'bot_rest_request_duration_seconds', 'Time spent in Discord REST calls', ('method', 'route')
+)
+REST_ERRORS = registry.counter(
+    'bot_rest_errors_total', 'Discord REST calls that raised', ('method', 'route', 'status')
+)
+
+
+def _guild_label(guild: Optional[discord.Guild]) -> str:
+    return str(guild.id) if guild else 'dm'
+
+
+def command_started(ctx):
+    ctx.metrics_started = perf_counter()
+
+
+def command_finished(ctx, status: str = 'ok') -> Optional[float]:
+    """Record a prefix command; call from on_command_completion and on_command_error.
+
+    Returns the command's latency in seconds, if it was timed.
+    """
+    name = ctx.command.qualified_name if ctx.command else 'unknown'
+    started = getattr(ctx, 'metrics_started', None)
+    latency = None
+    if started is not None:
+        latency = perf_counter() - started
+        COMMAND_LATENCY.observe(latency, name, 'prefix')
+    COMMAND_TOTAL.inc(name, 'prefix', _guild_label(ctx.guild), status)
+    return latency
+
+
+def app_command_finished(interaction: discord.Interaction, command, status: str = 'ok') -> Optional[float]:
+    name = command.qualified_name if command else 'unknown'
+    started = interaction.extras.get('metrics_started')
+    latency = None
+    if started is not None:
+        latency = perf_counter() - started
+        COMMAND_LATENCY.observe(latency, name, 'app')
+    COMMAND_TOTAL.inc(name, 'app', _guild_label(interaction.guild), status)
+    return latency
+
+
+class MetricsCommandTree(app_commands.CommandTree):
+    """Command tree that stamps every app command with a start time and counts failures"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras['metrics_started'] = perf_counter()
+        if interaction.command is not None:
+            bind_command_context(interaction.guild, interaction.user, f'/{interaction.command.qualified_name}')
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        app_command_finished(interaction, interaction.command, type(error).__name__)
+        await super().on_error(interaction, error)
+
+
+def instrument_engine(engine):
+    """Time every SQL statement run through ``engine``"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['metrics_query_start'].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+        DB_QUERY_LATENCY.observe(perf_counter() - started, operation)
+
+    @event.listens_for(engine, 'handle_error')
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('metrics_query_start'):
+            conn.info['metrics_query_start'].pop()
+
+
+def instrument_http(http):
+    """Wrap ``HTTPClient.request`` so every REST call is timed by route template"""
+    original = http.request
+
+    async def request(route, **kwargs):
+        started = perf_counter()
+        try:
+            return await original(route, **kwargs)
+        except discord.HTTPException as e:
+            REST_ERRORS.inc(route.method, route.path, str(e.status))
+            raise
+        finally:
+            REST_LATENCY.observe(perf_counter() - started, route.method, route.path)
+
+    http.request = request
+
+
+async def start_metrics_server(host: str = '127.0.0.1', port: int = 9100,
+                               health: Optional[Callable[[], dict]] = None) -> web.AppRunner:
+    """Serve ``registry`` in Prometheus text format on http://host:port/metrics
+
+    If ``health`` is given, its result is also served as JSON on /health, with
+    status 503 until it reports ``ready``.
+    """
+
+    async def handle_metrics(request):
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+    async def handle_health(request):
+        report = health()
+        return web.json_response(report, status=200 if report.get('ready') else 503)
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    if health is not None:
+        app.router.add_get('/health', handle_health)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info('Metrics endpoint listening on http://%s:%s/metrics', host, port)
+    return runner
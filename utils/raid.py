@@ -0,0 +1,238 @@
+import time
+import unicodedata
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from utils.metrics import registry
+
+RAID_JOINS = registry.counter(
+    'bot_raid_joins_total', 'Member joins seen by the raid detector', ('flagged',)
+)
+RAID_TRIGGERS = registry.counter(
+    'bot_raid_triggers_total', 'Times a join burst switched a guild into raid mode'
+)
+
+# The ring buffer covers at most this many one-second slots
+MAX_WINDOW_SECONDS = 120
+# How many recent names each guild compares new joins against
+NAME_HISTORY = 64
+# Recent joiners kept per guild so a raid can be acted on after the fact
+RECENT_JOINERS = 500
+
+
+def name_skeleton(name: str) -> str:
+    """Reduce a username to the part raid bots don't vary.
+
+    "Raider_123", "raider-456" and "𝐫𝐚𝐢𝐝𝐞𝐫7" all become "raider", so a wave of
+    generated accounts lands on the same skeleton while real names rarely do.
+    """
+    folded = unicodedata.normalize('NFKD', name).casefold()
+    return ''.join(char for char in folded if char.isalpha())[:16]
+
+
+class JoinWindow:
+    """Join counts over the last ``seconds`` seconds in a fixed ring of one-second slots.
+
+    Each join touches one slot; moving forward only clears the slots that
+    fell out of the window, so memory is fixed and the work per join is O(1)
+    no matter how fast members arrive.
+    """
+
+    __slots__ = ('seconds', 'joins', 'flagged', 'total_joins', 'total_flagged', 'head')
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.joins = [0] * seconds
+        self.flagged = [0] * seconds
+        self.total_joins = 0
+        self.total_flagged = 0
+        self.head = 0
+
+    def _advance(self, now: int):
+        if now <= self.head:
+            return
+        if now - self.head >= self.seconds:
+            self.joins = [0] * self.seconds
+            self.flagged = [0] * self.seconds
+            self.total_joins = self.total_flagged = 0
+        else:
+            for second in range(self.head + 1, now + 1):
+                slot = second % self.seconds
+                self.total_joins -= self.joins[slot]
+                self.total_flagged -= self.flagged[slot]
+                self.joins[slot] = self.flagged[slot] = 0
+        self.head = now
+
+    def add(self, now: int, flagged: bool):
+        self._advance(now)
+        slot = now % self.seconds
+        self.joins[slot] += 1
+        self.total_joins += 1
+        if flagged:
+            self.flagged[slot] += 1
+            self.total_flagged += 1
+
+    def counts(self, now: int) -> Tuple[int, int]:
+        self._advance(now)
+        return self.total_joins, self.total_flagged
+
+
+class NameHistory:
+    """The last ``size`` name skeletons with a running count of each"""
+
+    __slots__ = ('ring', 'index', 'counts')
+
+    def __init__(self, size: int = NAME_HISTORY):
+        self.ring: List[Optional[str]] = [None] * size
+        self.index = 0
+        self.counts: Dict[str, int] = {}
+
+    def add(self, skeleton: str) -> int:
+        """Remember a skeleton; returns how many recent joins share it, including this one"""
+        old = self.ring[self.index]
+        if old is not None:
+            remaining = self.counts[old] - 1
+            if remaining:
+                self.counts[old] = remaining
+            else:
+                del self.counts[old]
+        self.ring[self.index] = skeleton
+        self.index = (self.index + 1) % len(self.ring)
+        count = self.counts.get(skeleton, 0) + 1
+        self.counts[skeleton] = count
+        return count
+
+
+class RaidThresholds:
+    """The thresholds a guild's detector runs with"""
+
+    __slots__ = ('join_threshold', 'flagged_threshold', 'window_seconds', 'min_account_age', 'similar_names')
+
+    def __init__(self, join_threshold: int = 15, flagged_threshold: int = 6, window_seconds: int = 10,
+                 min_account_age_days: int = 7, similar_names: int = 4):
+        self.join_threshold = join_threshold
+        self.flagged_threshold = flagged_threshold
+        self.window_seconds = max(1, min(window_seconds, MAX_WINDOW_SECONDS))
+        self.min_account_age = min_account_age_days * 86400
+        self.similar_names = similar_names
+
+
+class JoinVerdict:
+    __slots__ = ('flagged', 'reasons', 'joins', 'flagged_joins', 'triggered')
+
+    def __init__(self, flagged: bool, reasons: Tuple[str, ...], joins: int, flagged_joins: int, triggered: bool):
+        self.flagged = flagged
+        self.reasons = reasons
+        self.joins = joins
+        self.flagged_joins = flagged_joins
+        self.triggered = triggered
+
+
+class GuildJoins:
+    __slots__ = ('thresholds', 'window', 'names', 'recent', 'raid_since', 'last_burst')
+
+    def __init__(self, thresholds: RaidThresholds):
+        self.thresholds = thresholds
+        self.window = JoinWindow(thresholds.window_seconds)
+        self.names = NameHistory()
+        # (join time, member id) for the newest joiners, oldest first
+        self.recent: Deque[Tuple[float, int]] = deque(maxlen=RECENT_JOINERS)
+        self.raid_since: Optional[float] = None
+        self.last_burst = 0.0
+
+
+class RaidDetector:
+    """Per-guild join burst detection.
+
+    A join is flagged when the account is younger than the guild's minimum
+    age or its name skeleton matches several other recent joins. A guild
+    enters raid mode when either all joins or flagged joins within the window
+    reach their threshold. Everything a guild holds is fixed in size, and
+    ``record_join`` does a constant amount of work per member.
+    """
+
+    def __init__(self):
+        self._guilds: Dict[int, GuildJoins] = {}
+
+    def configure(self, guild_id: int, thresholds: RaidThresholds):
+        state = self._guilds.get(guild_id)
+        if state is None:
+            self._guilds[guild_id] = GuildJoins(thresholds)
+            return
+        if thresholds.window_seconds != state.thresholds.window_seconds:
+            state.window = JoinWindow(thresholds.window_seconds)
+        state.thresholds = thresholds
+
+    def state(self, guild_id: int) -> GuildJoins:
+        state = self._guilds.get(guild_id)
+        if state is None:
+            state = self._guilds[guild_id] = GuildJoins(RaidThresholds())
+        return state
+
+    def record_join(self, guild_id: int, member_id: int, name: str, account_age: float,
+                    now: Optional[float] = None) -> JoinVerdict:
+        now = time.monotonic() if now is None else now
+        state = self.state(guild_id)
+        thresholds = state.thresholds
+
+        reasons = []
+        if account_age < thresholds.min_account_age:
+            reasons.append('new account')
+        skeleton = name_skeleton(name)
+        if skeleton and state.names.add(skeleton) >= thresholds.similar_names:
+            reasons.append('similar name')
+        flagged = bool(reasons)
+
+        state.window.add(int(now), flagged)
+        state.recent.append((now, member_id))
+        joins, flagged_joins = state.window.total_joins, state.window.total_flagged
+        burst = joins >= thresholds.join_threshold or flagged_joins >= thresholds.flagged_threshold
+        if burst:
+            state.last_burst = now
+        triggered = burst and state.raid_since is None
+        if triggered:
+            state.raid_since = now
+            RAID_TRIGGERS.inc()
+        RAID_JOINS.inc('true' if flagged else 'false')
+        return JoinVerdict(flagged, tuple(reasons), joins, flagged_joins, triggered)
+
+    def in_raid(self, guild_id: int) -> bool:
+        state = self._guilds.get(guild_id)
+        return state is not None and state.raid_since is not None
+
+    def start_raid(self, guild_id: int, now: Optional[float] = None) -> bool:
+        """Enter raid mode by hand; False if the guild is already in it"""
+        state = self.state(guild_id)
+        if state.raid_since is not None:
+            return False
+        state.raid_since = state.last_burst = time.monotonic() if now is None else now
+        return True
+
+    def end_raid(self, guild_id: int) -> bool:
+        state = self._guilds.get(guild_id)
+        if state is None or state.raid_since is None:
+            return False
+        state.raid_since = None
+        return True
+
+    def quiet_raids(self, quiet_seconds: float, now: Optional[float] = None) -> List[int]:
+        """Guilds in raid mode that haven't seen a burst for ``quiet_seconds``"""
+        now = time.monotonic() if now is None else now
+        return [
+            guild_id for guild_id, state in self._guilds.items()
+            if state.raid_since is not None and now - state.last_burst >= quiet_seconds
+        ]
+
+    def joiners_since(self, guild_id: int, since: float) -> List[int]:
+        state = self._guilds.get(guild_id)
+        if state is None:
+            return []
+        return [member_id for joined_at, member_id in state.recent if joined_at >= since]
+
+    def window_counts(self, guild_id: int, now: Optional[float] = None) -> Tuple[int, int]:
+        state = self._guilds.get(guild_id)
+        if state is None:
+            return 0, 0
+        return state.window.counts(int(time.monotonic() if now is None else now))
+
+
+raid_detector = RaidDetector()
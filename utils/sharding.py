@@ -0,0 +1,99 @@
+import logging
+import os
+from typing import Dict, List, Optional
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SHARD_LATENCY = registry.gauge(
+    'bot_shard_latency_seconds', 'Gateway heartbeat latency per shard', ('shard',)
+)
+SHARD_UP = registry.gauge(
+    'bot_shard_up', '1 while the shard is connected to the gateway', ('shard',)
+)
+
+
+def parse_shard_ids(text: str) -> List[int]:
+    """Parse "0-3,8,10-11" into [0, 1, 2, 3, 8, 10, 11]"""
+    shard_ids = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids))
+
+
+def format_shard_ids(shard_ids: List[int]) -> str:
+    """The inverse of ``parse_shard_ids`` for contiguous runs"""
+    runs = []
+    for shard_id in sorted(shard_ids):
+        if runs and shard_id == runs[-1][1] + 1:
+            runs[-1][1] = shard_id
+        else:
+            runs.append([shard_id, shard_id])
+    return ','.join(str(first) if first == last else f'{first}-{last}' for first, last in runs)
+
+
+def split_shards(shard_count: int, clusters: int) -> List[List[int]]:
+    """Split shards 0..shard_count-1 into ``clusters`` contiguous, near-equal ranges"""
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    ranges, start = [], 0
+    for cluster in range(clusters):
+        end = start + size + (1 if cluster < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+def shard_options_from_env() -> Optional[dict]:
+    """Keyword arguments for ``AutoShardedBot``, or None to run unsharded.
+
+    SHARD_COUNT=auto lets discord.py ask Discord for the recommended count;
+    a number together with SHARD_IDS runs just that slice of the shards, which
+    is how cluster.py hands each worker process its range.
+    """
+    shard_count = os.getenv('SHARD_COUNT')
+    if not shard_count:
+        return None
+    if shard_count.lower() == 'auto':
+        return {}
+    options = {'shard_count': int(shard_count)}
+    shard_ids = os.getenv('SHARD_IDS')
+    if shard_ids:
+        options['shard_ids'] = parse_shard_ids(shard_ids)
+    return options
+
+
+def shard_health(bot) -> Dict[str, object]:
+    """Snapshot of this process's shards, served on /health for the cluster launcher"""
+    shards = getattr(bot, 'shards', None)
+    if shards is None:
+        latencies = {bot.shard_id or 0: (bot.latency, bot.is_closed())}
+    else:
+        latencies = {shard_id: (shard.latency, shard.is_closed()) for shard_id, shard in shards.items()}
+    return {
+        'cluster': os.getenv('CLUSTER_ID'),
+        'ready': bot.is_ready(),
+        'guilds': len(bot.guilds),
+        'shard_count': bot.shard_count or 1,
+        'shards': {
+            str(shard_id): {
+                'latency': None if latency != latency or latency == float('inf') else round(latency, 4),
+                'connected': not closed,
+            }
+            for shard_id, (latency, closed) in sorted(latencies.items())
+        },
+    }
+
+
+def update_shard_metrics(bot):
+    for shard_id, shard in shard_health(bot)['shards'].items():
+        SHARD_UP.set(1 if shard['connected'] else 0, shard_id)
+        if shard['latency'] is not None:
+            SHARD_LATENCY.set(shard['latency'], shard_id)
@@ -0,0 +1,158 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Set by the command hooks so every record logged while a command runs carries its context
+log_context: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar('log_context', default=None)
+
+CONTEXT_FIELDS = ('guild', 'user', 'command', 'latency_ms')
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def bind_command_context(guild, user, command: str):
+    log_context.set({
+        'guild': str(guild.id) if guild else None,
+        'user': str(user.id) if user else None,
+        'command': command,
+    })
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current command context onto the record (runs on the calling thread)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = log_context.get()
+        if context:
+            for key, value in context.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of sub-WARNING records from noisy loggers.
+
+    ``rates`` maps logger-name prefixes to the fraction of records to keep.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate, matched = 1.0, ''
+            for prefix, prefix_rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + '.')) and len(prefix) > len(matched):
+                    rate, matched = prefix_rate, prefix
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers message formatting to the listener thread.
+
+    The stock handler merges ``msg % args`` on the caller's thread; here only the
+    traceback is rendered eagerly, since it references live frames.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse ``"discord.gateway=0.1,games=0.5"`` into a rate map"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, rate = item.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_async_logger(name: str = 'bot') -> logging.Logger:
+    """Route all logging through a queue drained by a background thread.
+
+    The event loop only builds a record and enqueues it; formatting, console
+    output and the size-rotated JSON log file are handled by the listener.
+    Configured from LOG_LEVEL, LOG_FILE, LOG_MAX_BYTES, LOG_BACKUPS and
+    LOG_SAMPLE (e.g. ``discord.gateway=0.1``).
+    """
+    global _listener
+    if _listener is not None:
+        return logging.getLogger(name)
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    handlers = [console]
+
+    log_file = os.getenv('LOG_FILE', 'logs/bot.log')
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+            backupCount=int(os.getenv('LOG_BACKUPS', '5')),
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(JSONFormatter())
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(_parse_sample_rates(os.getenv('LOG_SAMPLE', ''))))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_async_logger)
+    return logging.getLogger(name)
+
+
+def stop_async_logger():
+    """Drain the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -3,6 +3,7 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 from utils.database import db
+from utils.dm_queue import dm_queue
 from utils.embeds import create_warning_embed, create_error_embed, create_success_embed
 from models import Warning, Guild
 from datetime import datetime
@@ -46,17 +47,14 @@ class Warnings(commands.Cog):
             embed = create_warning_embed(member, reason, interaction.user, warning_count)
             await interaction.response.send_message(embed=embed)
             
-            # DM the warned user
-            try:
-                dm_embed = create_error_embed(
-                    "You have been warned",
-                    f"You received a warning in {interaction.guild.name}\nReason: {reason or 'No reason provided'}"
-                )
-                await member.send(embed=dm_embed)
-            except discord.Forbidden:
-                logger.warning(f"Could not send DM to {member}")
+            # DM the warned user in the background
+            dm_embed = create_error_embed(
+                "You have been warned",
+                f"You received a warning in {interaction.guild.name}\nReason: {reason or 'No reason provided'}"
+            )
+            dm_queue.enqueue(member, embed=dm_embed)
 
-            logger.info(f'{interaction.user} warned {member} for reason: {reason}')
+            logger.info('%s warned %s for reason: %s', interaction.user, member, reason)
         except Exception as e:
-            logger.error(f'Error warning member: {str(e)}')
+            logger.error('Error warning member: %s', e)
             await interaction.response.send_message(